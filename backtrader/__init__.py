@@ -56,6 +56,7 @@ from .sizers import SizerFix  # old sizer for compatibility
 from .strategy import *
 
 from .writer import *
+from .retention import *
 
 from .signal import *
 
@@ -38,6 +38,7 @@ from .returns import *
 from .vwr import *
 
 from .logreturnsrolling import *
+from .rolling import *
 
 from .calmar import *
 from .periodstats import *
@@ -34,7 +34,11 @@ class AnnualReturn(Analyzer):
 
     Params:
 
-      - (None)
+      - ``streaming`` (default: ``False``)
+
+        Calculate the returns bar by bar from the broker value (rather than
+        at the end from the values recorded by the ``Broker`` observer) with
+        the return of the current year up to date during the run
 
     Member Attributes:
 
@@ -47,7 +51,43 @@ class AnnualReturn(Analyzer):
       - Returns a dictionary of annual returns (key: year)
     '''
 
+    params = (
+        ('streaming', False),
+    )
+
+    def start(self):
+        super(AnnualReturn, self).start()
+        if self.p.streaming:
+            self.rets = list()
+            self.ret = OrderedDict()
+            self._year = -1
+            self._value_start = self._value_end = 0.0
+
+    def next(self):
+        if not self.p.streaming:
+            return
+
+        dt = self.data.datetime.date(0)
+        if dt.year > self._year:
+            if self._year >= 0:
+                # the last year is over. the last value is the new start
+                self.rets.append(self.ret[self._year])
+                self._value_start = self._value_end
+            else:
+                # No value set whatsoever, use the current value
+                self._value_start = self.strategy.broker.getvalue()
+
+            self._year = dt.year
+
+        self._value_end = value = self.strategy.broker.getvalue()
+        self.ret[self._year] = (value / self._value_start) - 1.0
+
     def stop(self):
+        if self.p.streaming:
+            if self._year >= 0:
+                self.rets.append(self.ret[self._year])  # the pending year
+            return
+
         # Must have stats.broker
         cur_year = -1
 
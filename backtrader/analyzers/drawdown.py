@@ -192,6 +192,10 @@ class TimeDrawDown(bt.TimeFrameAnalyzerBase):
         self.maxdd = max(self.maxdd, dd)
         self.maxddlen = max(self.maxddlen, self.ddlen)
 
+        # keep the analysis up to date during the run
+        self.rets['maxdrawdown'] = self.maxdd
+        self.rets['maxdrawdownperiod'] = self.maxddlen
+
     def stop(self):
         self.rets['maxdrawdown'] = self.maxdd
         self.rets['maxdrawdownperiod'] = self.maxddlen
@@ -29,36 +29,44 @@ class LatestBar(bt.Analyzer):
     '''This analyzer reports the latest value of datas lines and indicator lines
     used in a Strategy.
 
-    Params:
+    The lines to report are resolved once at ``start`` and the values are
+    only collected at the end of the run (or when ``get_analysis`` is called
+    during the run)
 
-      - timeframe (default: ``None``)
-        If ``None`` then the timeframe of the 1st data of the system will be
-        used
+    Params:
 
-      - compression (default: ``None``)
+      - prev (default: ``True``)
+        Include the value of the previous bar as ``prev_xxx`` as well as the
+        value of the latest bar
 
-        Only used for sub-day timeframes to for example work on an hourly
-        timeframe by specifying "TimeFrame.Minutes" and 60 as compression
+      - scanner (default: ``False``)
 
-        If ``None`` then the compression of the 1st data of the system will be
-        used
+        Report one flat row per data (with the data lines and the lines of
+        the indicators calculated on it) instead of the lines of the 1st
+        data and all indicators and observers. Meant to scan many symbols
+        with the same set of indicators
 
     Methods:
 
       - get_analysis
 
-        Returns a dictionary with returns as values and the datetime points for
-        each return as keys
+        Returns a dictionary with the names of the lines as keys and their
+        latest values as values.
+
+        With ``scanner`` the dictionary has the keys ``columns`` (the names
+        of the columns, starting with ``data`` for the name of the data) and
+        ``rows`` (a list with one row of values per data)
     '''
     params = (
         ('prev', True), # include previous bar as well as latest bar
+        ('scanner', False),
     )
 
     @staticmethod
     def yield_latest_bar(data, prev=True):
         yield ("datetime", data.datetime.datetime())
         for field_name in data.lines.getlinealiases():
-            if field_name is "datetime":
+            if field_name == "datetime":
                 continue
             line = getattr(data.lines, field_name)
             yield (field_name, line[0])
@@ -69,29 +77,126 @@ class LatestBar(bt.Analyzer):
     def nickname(typename):
         return "".join([c for c in typename if c.upper() == c]).lower()
 
-    def next(self):
-        for fn, fv in LatestBar.yield_latest_bar(self.data0, self.p.prev):
-            self.rets[fn] = fv
-
-        for li_i in self.strategy._lineiterators:
-            for obj in self.strategy._lineiterators[li_i]:
-                obj_name = LatestBar.nickname(type(obj).__name__)
-                if obj_name.startswith("_"):
-                    continue
-                try:
-                    line_aliases = obj.lines.getlinealiases()
-                except AttributeError:
-                    # this is usually intermediate values we're not intereseted
-                    continue
-                for field_name in line_aliases:
-                    full_name = "_".join([obj_name, field_name])
-                    line = getattr(obj.lines, field_name)
+    @staticmethod
+    def _datafeed(obj):
+        # the data feed on which an indicator is (ultimately) calculated
+        while obj is not None and not isinstance(obj, bt.AbstractDataBase):
+            if isinstance(obj, bt.LineIterator):
+                obj = getattr(obj, 'data', None)
+            else:
+                obj = getattr(obj, '_owner', None)  # line of a data
+
+        return obj
+
+    def _data_bindings(self, data):
+        # entries: (name, getter, ago, observer)
+        bindings = [("datetime", data.datetime.datetime, 0, None)]
+        for field_name in data.lines.getlinealiases():
+            if field_name == "datetime":
+                continue
+            line = getattr(data.lines, field_name)
+            bindings.append((field_name, line.__getitem__, 0, None))
+            if self.p.prev:
+                bindings.append(("prev_" + field_name, line.__getitem__, -1,
+                                 None))
+
+        return bindings
+
+    def _obj_bindings(self, obj, observer=False):
+        obj_name = LatestBar.nickname(type(obj).__name__)
+        if obj_name.startswith("_"):
+            return []
+        try:
+            line_aliases = obj.lines.getlinealiases()
+        except AttributeError:
+            # this is usually intermediate values we're not intereseted
+            return []
+
+        observer = obj if observer else None
+        bindings = []
+        for field_name in line_aliases:
+            full_name = "_".join([obj_name, field_name])
+            line = getattr(obj.lines, field_name)
+            bindings.append((full_name, line.__getitem__, 0, observer))
+            # previous value always reported for indicators and observers
+            bindings.append(("prev_" + full_name, line.__getitem__, -1,
+                             observer))
+
+        return bindings
+
+    def __init__(self):
+        self._started = False  # until the strategy has reached next
+
+    def start(self):
+        indtype = bt.LineIterator.IndType
+        obstype = bt.LineIterator.ObsType
+
+        if not self.p.scanner:
+            self._table = self._data_bindings(self.data0)
+            for li_i in self.strategy._lineiterators:
+                for obj in self.strategy._lineiterators[li_i]:
+                    self._table.extend(
+                        self._obj_bindings(obj, observer=li_i == obstype))
+            return
+
+        # scanner: one row per data with the columns of all datas
+        datas = self.strategy.datas
+        bindings = dict((id(data), self._data_bindings(data))
+                        for data in datas)
+        for ind in self.strategy._lineiterators[indtype]:
+            data = self._datafeed(ind)
+            if data is not None and id(data) in bindings:
+                bindings[id(data)].extend(self._obj_bindings(ind))
+
+        columns = ["data"]
+        colidx = dict()
+        self._scan = []
+        for data in datas:
+            entries = []
+            for name, getter, ago, _ in bindings[id(data)]:
+                if name not in colidx:
+                    colidx[name] = len(columns)
+                    columns.append(name)
+                entries.append((colidx[name], getter, ago))
+
+            self._scan.append(entries)
+
+        self.rets["columns"] = columns
+        self.rets["rows"] = [[data._name] + [float("NaN")] * (len(columns) - 1)
+                             for data in datas]
+
+    def nextstart(self):
+        self._started = True
+
+    def stop(self):
+        self.snapshot()
+
+    def get_analysis(self):
+        self.snapshot()
+
+        return self.rets
+
+    def snapshot(self):
+        '''Collects the latest values of the lines'''
+        if not self._started:
+            return
+
+        if self.p.scanner:
+            for row, entries in zip(self.rets["rows"], self._scan):
+                for col, getter, ago in entries:
                     try:
-                        self.rets[full_name] = line[0]
+                        row[col] = getter(ago)
                     except IndexError:
                         pass
-                    prev_name = "prev_" + full_name
-                    try:
-                        self.rets[prev_name] = line[-1]
-                    except IndexError:
-                        pass
\ No newline at end of file
+            return
+
+        slen = len(self.strategy)
+        rets = self.rets
+        for name, getter, ago, observer in self._table:
+            # observers run after the analyzers, report their value before
+            if observer is not None and len(observer) >= slen:
+                ago -= 1
+            try:
+                rets[name] = getter(ago)
+            except IndexError:
+                pass
@@ -22,6 +22,7 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 import backtrader as bt
+from backtrader.utils import ColumnBuffer, num2date
 
 
 class GrossLeverage(bt.Analyzer):
@@ -39,6 +40,11 @@ class GrossLeverage(bt.Analyzer):
 
         Set it to ``True`` or ``False`` for a specific behavior
 
+    The values are recorded in a ``ColumnBuffer`` (attribute ``values``)
+    with the columns ``datetime`` (as a float) and ``gross_lev``, which is
+    turned into the dictionary of results at the end of the run (and by
+    ``get_analysis`` during it)
+
     Methods:
 
       - get_analysis
@@ -57,6 +63,13 @@ class GrossLeverage(bt.Analyzer):
         else:
             self._fundmode = self.p.fund
 
+        self.values = ColumnBuffer(['datetime', 'gross_lev'],
+                                   size=self.data0.buflen())
+        self._key = None  # datetime of the last row
+        self._nrets = 0  # rows already in rets
+        # kept: the data is gone after an optimization with optreturn
+        self._tz = self.data0.datetime._tz
+
     def notify_fund(self, cash, value, fundvalue, shares):
         self._cash = cash
         if not self._fundmode:
@@ -68,4 +81,21 @@ class GrossLeverage(bt.Analyzer):
         # Updates the leverage for "dtkey" (see base class) for each cycle
         # 0.0 if 100% in cash, 1.0 if no short selling and fully invested
         lev = (self._value - self._cash) / self._value
-        self.rets[self.data0.datetime.datetime()] = lev
+        dtnum = self.data0.datetime[0]
+        if dtnum == self._key:  # same key, the last row is updated
+            i = len(self.values) - 1
+            self.values.set(i, (dtnum, lev))
+            self._nrets = min(self._nrets, i)
+        else:
+            self.values.add((dtnum, lev))
+            self._key = dtnum
+
+    def stop(self):
+        self.get_analysis()  # the results are ready after the run
+
+    def get_analysis(self):
+        for dtnum, lev in self.values.rows(self._nrets):
+            self.rets[num2date(dtnum, tz=self._tz)] = lev
+
+        self._nrets = len(self.values)
+        return self.rets
@@ -24,7 +24,7 @@ from __future__ import (absolute_import, division, print_function,
 
 import backtrader as bt
 from backtrader.utils.py3 import itervalues
-from backtrader.mathsupport import average, standarddev
+from backtrader.mathsupport import average, standarddev, RunningStats
 from . import TimeReturn
 
 
@@ -60,6 +60,13 @@ class PeriodStats(bt.Analyzer):
 
         Set it to ``True`` or ``False`` for a specific behavior
 
+      - ``streaming`` (default: ``False``)
+
+        Accumulate the returns of the periods as they are produced, with
+        constant memory, rather than keeping all of them until the end. The
+        statistics (including the current period) are then available at any
+        time during the run
+
 
     ``get_analysis`` returns a dictionary containing the keys:
 
@@ -80,13 +87,69 @@ class PeriodStats(bt.Analyzer):
         ('compression', 1),
         ('zeroispos', False),
         ('fund', None),
+        ('streaming', False),
     )
 
     def __init__(self):
         self._tr = TimeReturn(timeframe=self.p.timeframe,
-                              compression=self.p.compression, fund=self.p.fund)
+                              compression=self.p.compression, fund=self.p.fund,
+                              streaming=self.p.streaming)
+
+    def start(self):
+        super(PeriodStats, self).start()
+        if self.p.streaming:
+            # accumulated stats of the closed periods
+            self._stats = RunningStats()
+            self._counts = [0, 0, 0]  # positive, negative, nochange
+            self._best, self._worst = float('-inf'), float('inf')
+            self._nclosed = 0
+
+    def _count(self, tret, counts):
+        if tret > 0.0:
+            counts[0] += 1
+        elif tret < 0.0:
+            counts[1] += 1
+        else:
+            if self.p.zeroispos:
+                counts[0] += tret == 0.0
+            else:
+                counts[2] += tret == 0.0
+
+    def next(self):
+        if not self.p.streaming:
+            return
+
+        tr = self._tr
+        if tr.nclosed > self._nclosed:  # a period is over: accumulate it
+            self._nclosed = tr.nclosed
+            tret = tr.closedret
+            self._stats.add(tret)
+            self._count(tret, self._counts)
+            self._best = max(self._best, tret)
+            self._worst = min(self._worst, tret)
+
+        tret = tr.ret
+        if tret is None:
+            return
+
+        # stats with the current period as if it were over now
+        stats, counts = self._stats.copy(), list(self._counts)
+        stats.add(tret)
+        self._count(tret, counts)
+
+        self.rets['average'] = stats.mean
+        self.rets['stddev'] = stats.stddev()
+
+        self.rets['positive'], self.rets['negative'], \
+            self.rets['nochange'] = counts
+
+        self.rets['best'] = max(self._best, tret)
+        self.rets['worst'] = min(self._worst, tret)
 
     def stop(self):
+        if self.p.streaming:
+            return  # the last calculation is final
+
         trets = self._tr.get_analysis()  # dict key = date, value = ret
         pos = nul = neg = 0
         trets = list(itervalues(trets))
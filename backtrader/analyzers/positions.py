@@ -23,6 +23,7 @@ from __future__ import (absolute_import, division, print_function,
 
 
 import backtrader as bt
+from backtrader.utils import ColumnBuffer, num2date
 
 
 class PositionsValue(bt.Analyzer):
@@ -53,6 +54,11 @@ class PositionsValue(bt.Analyzer):
         Include the actual cash as an extra position (for the header 'cash'
         will be used as name)
 
+    The values are recorded in a ``ColumnBuffer`` (attribute ``values``)
+    with the columns ``datetime`` (as a float), ``data0`` ... ``dataN`` and
+    ``cash`` (if requested), which is turned into the dictionary of results
+    at the end of the run (and by ``get_analysis`` during it)
+
     Methods:
 
       - get_analysis
@@ -74,12 +80,38 @@ class PositionsValue(bt.Analyzer):
         tf = min(d._timeframe for d in self.datas)
         self._usedate = tf >= bt.TimeFrame.Days
 
+        names = ['data%d' % i for i in range(len(self.datas))]
+        names += ['cash'] * self.p.cash
+        self.values = ColumnBuffer(['datetime'] + names,
+                                   size=max(d.buflen() for d in self.datas))
+        self._key = None  # key of the last row
+        self._nrets = 0  # rows already in rets
+        # kept: the strategy is gone after an optimization with optreturn
+        self._tz = self.strategy.datetime._tz
+
     def next(self):
-        pvals = [self.strategy.broker.get_value([d]) for d in self.datas]
+        dt = self.strategy.datetime
+        pvals = [dt[0]]
+        pvals.extend(self.strategy.broker.get_value([d]) for d in self.datas)
         if self.p.cash:
             pvals.append(self.strategy.broker.get_cash())
 
-        if self._usedate:
-            self.rets[self.strategy.datetime.date()] = pvals
+        key = dt.date() if self._usedate else dt[0]
+        if key == self._key:  # same key, the last row is updated
+            i = len(self.values) - 1
+            self.values.set(i, pvals)
+            self._nrets = min(self._nrets, i)
         else:
-            self.rets[self.strategy.datetime.datetime()] = pvals
+            self.values.add(pvals)
+            self._key = key
+
+    def stop(self):
+        self.get_analysis()  # the results are ready after the run
+
+    def get_analysis(self):
+        for row in self.values.rows(self._nrets):
+            dt = num2date(row[0], tz=self._tz)
+            self.rets[dt.date() if self._usedate else dt] = list(row[1:])
+
+        self._nrets = len(self.values)
+        return self.rets
@@ -25,7 +25,7 @@ from __future__ import (absolute_import, division, print_function,
 import collections
 
 import backtrader as bt
-from backtrader.utils.py3 import items, iteritems
+from backtrader.utils.py3 import iteritems
 
 from . import TimeReturn, PositionsValue, Transactions, GrossLeverage
 
@@ -92,12 +92,12 @@ class PyFolio(bt.Analyzer):
         self._transactions = Transactions(headers=True)
         self._gross_lev = GrossLeverage()
 
-    def stop(self):
-        super(PyFolio, self).stop()
+    def get_analysis(self):
         self.rets['returns'] = self._returns.get_analysis()
         self.rets['positions'] = self._positions.get_analysis()
         self.rets['transactions'] = self._transactions.get_analysis()
         self.rets['gross_lev'] = self._gross_lev.get_analysis()
+        return self.rets
 
     def get_pf_items(self):
         '''Returns a tuple of 4 elements which can be used for further processing with
@@ -110,54 +110,59 @@ class PyFolio(bt.Analyzer):
         *backtrader* results to *pandas DataFrames* which is the expected input
         by, for example, ``pyfolio.create_full_tear_sheet``
 
+        The positions, transactions and gross leverage are taken directly
+        from the columns recorded by the children analyzers (without
+        building the dictionaries returned by ``get_analysis``)
+
         The method will break if ``pandas`` is not installed
         '''
         # keep import local to avoid disturbing installations with no pandas
+        import numpy as np
         import pandas
         from pandas import DataFrame as DF
 
         #
         # Returns
         cols = ['index', 'return']
-        returns = DF.from_records(iteritems(self.rets['returns']),
+        returns = DF.from_records(iteritems(self._returns.get_analysis()),
                                   index=cols[0], columns=cols)
         returns.index = pandas.to_datetime(returns.index)
         returns.index = returns.index.tz_localize('UTC')
         rets = returns['return']
+
         #
-        # Positions
-        pss = self.rets['positions']
-        ps = [[k] + v[-2:] for k, v in iteritems(pss)]
-        cols = ps.pop(0)  # headers are in the first entry
-        positions = DF.from_records(ps, index=cols[0], columns=cols)
-        positions.index = pandas.to_datetime(positions.index)
+        # Positions: (as before) only the last data and the cash
+        pvs = self._positions
+        cols = pvs.rets['Datetime'][-2:]  # headers
+        index = pvs.values.asdatetimes('datetime', tz=pvs._tz,
+                                       dates=pvs._usedate)
+        positions = pvs.values.todataframe(pvs.values.names[-2:], index=index)
+        positions.columns = cols
+        positions.index.name = 'Datetime'
         positions.index = positions.index.tz_localize('UTC')
 
         #
         # Transactions
-        txss = self.rets['transactions']
-        txs = list()
-        # The transactions have a common key (date) and can potentially happend
-        # for several assets. The dictionary has a single key and a list of
-        # lists. Each sublist contains the fields of a transaction
-        # Hence the double loop to undo the list indirection
-        for k, v in iteritems(txss):
-            for v2 in v:
-                txs.append([k] + v2)
-
-        cols = txs.pop(0)  # headers are in the first entry
-        transactions = DF.from_records(txs, index=cols[0], columns=cols)
-        transactions.index = pandas.to_datetime(transactions.index)
+        txs = self._transactions
+        index = txs.values.asdatetimes('datetime', tz=txs._tz)
+        transactions = txs.values.todataframe(
+            ['amount', 'price', 'sid', 'value'], index=index)
+        amount = transactions['amount']
+        if (amount == np.floor(amount)).all():
+            transactions['amount'] = amount.astype(np.int64)
+        transactions['sid'] = transactions['sid'].astype(np.int64)
+        names = np.asarray([name for _, name in txs._idnames], dtype=object)
+        transactions.insert(3, 'symbol', names[transactions['sid'].values])
+        transactions.index.name = 'date'
         transactions.index = transactions.index.tz_localize('UTC')
 
         # Gross Leverage
-        cols = ['index', 'gross_lev']
-        gross_lev = DF.from_records(iteritems(self.rets['gross_lev']),
-                                    index=cols[0], columns=cols)
-
-        gross_lev.index = pandas.to_datetime(gross_lev.index)
-        gross_lev.index = gross_lev.index.tz_localize('UTC')
-        glev = gross_lev['gross_lev']
+        glvs = self._gross_lev
+        index = glvs.values.asdatetimes('datetime', tz=glvs._tz)
+        glev = pandas.Series(glvs.values.asarray('gross_lev'), index=index,
+                             name='gross_lev', copy=False)
+        glev.index.name = 'index'
+        glev.index = glev.index.tz_localize('UTC')
 
         # Return all together
         return rets, positions, transactions, glev
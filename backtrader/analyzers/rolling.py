@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from array import array
+import math
+
+import backtrader as bt
+from backtrader.mathsupport import RunningStats
+
+
+__all__ = ['RollingStats']
+
+
+class RollingStats(bt.TimeFrameAnalyzerBase):
+    '''This analyzer calculates rolling (windowed) statistics of the returns
+    of the portfolio (or of a ``data``) for a given timeframe and compression.
+
+    The value at the end of each period is kept in a ring buffer of
+    ``window + 1`` values and all statistics are calculated in a single pass
+    over it when the period is over, so that the memory used for the
+    calculation does not depend on the length of the run.
+
+    Params:
+
+      - ``timeframe`` (default: ``None``)
+        If ``None`` the ``timeframe`` of the 1st data in the system will be
+        used
+
+      - ``compression`` (default: ``None``)
+
+        Only used for sub-day timeframes to for example work on an hourly
+        timeframe by specifying "TimeFrame.Minutes" and 60 as compression
+
+        If ``None`` then the compression of the 1st data of the system will be
+        used
+
+      - ``window`` (default: ``20``)
+
+        Number of periods (returns) taken into account for each calculation.
+        The statistics are ``NaN`` until ``window`` periods have been seen
+
+      - ``riskfreerate`` (default: ``0.0``)
+
+        Risk free rate per period, subtracted from the average return for the
+        calculation of the sharpe ratio
+
+      - ``factor`` (default: ``None``)
+
+        If not ``None`` the volatility is multiplied by the square root of
+        ``factor`` and so is the sharpe ratio, to for example annualize the
+        values of daily returns with ``252``
+
+      - ``stddev_sample`` (default: ``False``)
+
+        If this is set to ``True`` the *standard deviation* will be calculated
+        decreasing the denominator in the mean by ``1``
+
+      - ``data`` (default: ``None``)
+
+        Reference asset to track instead of the portfolio value.
+
+        .. note:: this data must have been added to a ``cerebro`` instance with
+                  ``addata``, ``resampledata`` or ``replaydata``
+
+      - ``firstopen`` (default: ``True``)
+
+        When tracking a ``data`` the opening price of the 1st bar is used as
+        the reference for the 1st return. Else the initial close will be used
+
+      - ``fund`` (default: ``None``)
+
+        If ``None`` the actual mode of the broker (fundmode - True/False) will
+        be autodetected to decide if the returns are based on the total net
+        asset value or on the fund value. See ``set_fundmode`` in the broker
+        documentation
+
+        Set it to ``True`` or ``False`` for a specific behavior
+
+      - ``numpy`` (default: ``False``)
+
+        Instead of calculating the statistics during the run, keep the values
+        at the end of each period and calculate all statistics at once with
+        ``numpy`` during ``stop``. The columns of the analysis are then
+        ``numpy`` arrays
+
+    Methods:
+
+      - get_analysis
+
+        Returns a dictionary of columns (``array.array('d')``) with a row for
+        each period:
+
+          - ``datetime``: the end of the period (as a float, see
+            ``backtrader.num2date``)
+          - ``return``: the return of the period
+          - ``logreturn``: the logarithmic return over the window
+          - ``mean``: the average of the returns in the window
+          - ``volatility``: the standard deviation of the returns in the
+            window
+          - ``sharpe``: the sharpe ratio of the returns in the window
+          - ``maxdrawdown``: the maximum drawdown (in percent) of the values in
+            the window
+    '''
+
+    params = (
+        ('window', 20),
+        ('riskfreerate', 0.0),
+        ('factor', None),
+        ('stddev_sample', False),
+        ('data', None),
+        ('firstopen', True),
+        ('fund', None),
+        ('numpy', False),
+    )
+
+    Columns = ('datetime', 'return', 'logreturn', 'mean', 'volatility',
+               'sharpe', 'maxdrawdown')
+
+    def start(self):
+        super(RollingStats, self).start()
+        if self.p.fund is None:
+            self._fundmode = self.strategy.broker.fundmode
+        else:
+            self._fundmode = self.p.fund
+
+        for column in self.Columns:
+            self.rets[column] = array(str('d'))
+
+        # ring of values at the end of the periods: idx points to the oldest
+        self._ring = [float('NaN')] * (self.p.window + 1)
+        self._idx = 0
+        self._count = 0  # values in the ring
+        self._values = array(str('d'))  # all values (only with numpy)
+        self._lastvalue = None
+
+        if self.p.data is None:
+            # keep the initial portfolio value if not tracing a data
+            if not self._fundmode:
+                self._push(self.strategy.broker.getvalue())
+            else:
+                self._push(self.strategy.broker.fundvalue)
+
+    def notify_fund(self, cash, value, fundvalue, shares):
+        if self.p.data is not None:
+            self._value = self.p.data[0]
+        elif not self._fundmode:
+            self._value = value
+        else:
+            self._value = fundvalue
+
+    def on_dt_over(self):
+        if self._lastvalue is not None:
+            self._period(self.dtkey1, self._lastvalue)  # previous is over
+
+        elif self.p.data is not None:
+            # The 1st tick has no previous reference, use the opening price
+            if self.p.firstopen:
+                self._push(self.p.data.open[0])
+            else:
+                self._push(self.p.data[0])
+
+    def next(self):
+        super(RollingStats, self).next()
+        self._lastvalue = self._value
+
+    def stop(self):
+        if self._lastvalue is not None:
+            self._period(self.dtkey, self._lastvalue)  # last period is over
+
+        if self.p.numpy:
+            self._calc_numpy()
+
+    def _push(self, value):
+        if self.p.numpy:
+            self._values.append(value)
+
+        self._ring[self._idx] = value
+        self._idx = (self._idx + 1) % len(self._ring)
+        self._count = min(self._count + 1, len(self._ring))
+
+    def _period(self, dtkey, value):
+        self._push(value)
+        self.rets['datetime'].append(bt.date2num(dtkey))
+        if self.p.numpy:
+            return
+
+        # the period return is calculated with the 2 latest values
+        ring, idx, nring = self._ring, self._idx, len(self._ring)
+        self.rets['return'].append(value / ring[(idx - 2) % nring] - 1.0)
+
+        if self._count < nring:  # window not yet complete
+            for column in self.Columns[2:]:
+                self.rets[column].append(float('NaN'))
+            return
+
+        # one pass from oldest to newest
+        stats = RunningStats()
+        prev = peak = ring[idx]
+        maxdd = 0.0
+        for i in range(1, nring):
+            v = ring[(idx + i) % nring]
+            stats.add(v / prev - 1.0)
+            prev = v
+            if v > peak:
+                peak = v
+            else:
+                maxdd = max(maxdd, (peak - v) / peak)
+
+        self._append_stats(math.log(value / ring[idx]), stats.mean,
+                           stats.stddev(bessel=self.p.stddev_sample),
+                           100.0 * maxdd)
+
+    def _append_stats(self, logreturn, mean, stddev, maxdd):
+        factor = math.sqrt(self.p.factor) if self.p.factor else 1.0
+        try:
+            sharpe = (mean - self.p.riskfreerate) / stddev * factor
+        except ZeroDivisionError:
+            sharpe = float('NaN')
+
+        self.rets['logreturn'].append(logreturn)
+        self.rets['mean'].append(mean)
+        self.rets['volatility'].append(stddev * factor)
+        self.rets['sharpe'].append(sharpe)
+        self.rets['maxdrawdown'].append(maxdd)
+
+    def _calc_numpy(self):
+        import numpy as np
+        from numpy.lib.stride_tricks import sliding_window_view
+
+        window = self.p.window
+        values = np.asarray(self._values)
+        rets = values[1:] / values[:-1] - 1.0
+
+        nan = np.full(min(window - 1, len(rets)), np.nan)
+        logreturn = mean = stddev = maxdd = nan
+        if len(rets) >= window:
+            wrets = sliding_window_view(rets, window, axis=0)
+            mean = wrets.mean(axis=1)
+            stddev = wrets.std(axis=1, ddof=int(self.p.stddev_sample))
+
+            wvalues = sliding_window_view(values, window + 1, axis=0)
+            peaks = np.maximum.accumulate(wvalues, axis=1)
+            maxdd = 100.0 * ((peaks - wvalues) / peaks).max(axis=1)
+            logreturn = np.log(values[window:] / values[:-window])
+
+            logreturn, mean, stddev, maxdd = [
+                np.concatenate([nan, x])
+                for x in (logreturn, mean, stddev, maxdd)]
+
+        factor = math.sqrt(self.p.factor) if self.p.factor else 1.0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sharpe = (mean - self.p.riskfreerate) / stddev * factor
+
+        sharpe[stddev == 0.0] = np.nan
+        self.rets['datetime'] = np.asarray(self.rets['datetime'])
+        self.rets['return'] = rets
+        self.rets['logreturn'] = logreturn
+        self.rets['mean'] = mean
+        self.rets['volatility'] = stddev * factor
+        self.rets['sharpe'] = sharpe
+        self.rets['maxdrawdown'] = maxdd
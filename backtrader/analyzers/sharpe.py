@@ -26,7 +26,7 @@ import math
 from backtrader.utils.py3 import itervalues
 
 from backtrader import Analyzer, TimeFrame
-from backtrader.mathsupport import average, standarddev
+from backtrader.mathsupport import average, standarddev, RunningStats
 from backtrader.analyzers import TimeReturn, AnnualReturn
 
 
@@ -102,6 +102,14 @@ class SharpeRatio(Analyzer):
 
         Set it to ``True`` or ``False`` for a specific behavior
 
+      - ``streaming`` (default: ``False``)
+
+        Accumulate the returns of the periods as they are produced, with
+        constant memory, rather than keeping all of them until the end. The
+        ratio (including the current period) is then available at any time
+        during the run. The result matches the standard calculation up to
+        floating point rounding
+
     Methods:
 
       - get_analysis
@@ -122,6 +130,7 @@ class SharpeRatio(Analyzer):
         ('daysfactor', None),
         ('legacyannual', False),
         ('fund', None),
+        ('streaming', False),
     )
 
     RATEFACTORS = {
@@ -133,16 +142,90 @@ class SharpeRatio(Analyzer):
 
     def __init__(self):
         if self.p.legacyannual:
-            self.anret = AnnualReturn()
+            self.anret = AnnualReturn(streaming=self.p.streaming)
         else:
             self.timereturn = TimeReturn(
                 timeframe=self.p.timeframe,
                 compression=self.p.compression,
-                fund=self.p.fund)
+                fund=self.p.fund,
+                streaming=self.p.streaming)
+
+    def start(self):
+        super(SharpeRatio, self).start()
+        self.ratio = None
+        self._stream = self.p.streaming and not self.p.legacyannual
+        if self._stream:
+            self._rate, self._factor = self._get_rate_factor()
+            self._stats = RunningStats()  # excess returns of closed periods
+            self._nclosed = 0
+
+    def _get_rate_factor(self):
+        rate = self.p.riskfreerate
+
+        factor = None
+
+        # Hack to identify old code
+        if self.p.timeframe == TimeFrame.Days and \
+           self.p.daysfactor is not None:
+
+            factor = self.p.daysfactor
+
+        else:
+            if self.p.factor is not None:
+                factor = self.p.factor  # user specified factor
+            elif self.p.timeframe in self.RATEFACTORS:
+                # Get the conversion factor from the default table
+                factor = self.RATEFACTORS[self.p.timeframe]
+
+        if factor is not None and self.p.convertrate:
+            # Standard: downgrade annual returns to timeframe factor
+            rate = pow(1.0 + rate, 1.0 / factor) - 1.0
+
+        return rate, factor
+
+    def _excess(self, ret):
+        if self._factor is not None and not self.p.convertrate:
+            # upgrade returns to yearly returns
+            ret = pow(1.0 + ret, self._factor) - 1.0
+
+        return ret - self._rate
+
+    def next(self):
+        if not self._stream:
+            return
+
+        tr = self.timereturn
+        if tr.nclosed > self._nclosed:  # a period is over: accumulate it
+            self._nclosed = tr.nclosed
+            self._stats.add(self._excess(tr.closedret))
+
+        if tr.ret is None:
+            return
+
+        # ratio with the current period as if it were over now
+        stats = self._stats.copy()
+        stats.add(self._excess(tr.ret))
+        if stats.count - self.p.stddev_sample:
+            try:
+                ratio = stats.mean / stats.stddev(bessel=self.p.stddev_sample)
+
+                if self._factor is not None and \
+                   self.p.convertrate and self.p.annualize:
+
+                    ratio = math.sqrt(self._factor) * ratio
+            except (ValueError, TypeError, ZeroDivisionError):
+                ratio = None
+        else:
+            ratio = None
+
+        self.rets['sharperatio'] = self.ratio = ratio
 
     def stop(self):
         super(SharpeRatio, self).stop()
-        if self.p.legacyannual:
+        if self._stream:
+            self.rets['sharperatio'] = self.ratio  # the last one is final
+
+        elif self.p.legacyannual:
             rate = self.p.riskfreerate
             retavg = average([r - rate for r in self.anret.rets])
             retdev = standarddev(self.anret.rets)
@@ -152,32 +235,10 @@ class SharpeRatio(Analyzer):
             # Get the returns from the subanalyzer
             returns = list(itervalues(self.timereturn.get_analysis()))
 
-            rate = self.p.riskfreerate  #
-
-            factor = None
-
-            # Hack to identify old code
-            if self.p.timeframe == TimeFrame.Days and \
-               self.p.daysfactor is not None:
-
-                factor = self.p.daysfactor
-
-            else:
-                if self.p.factor is not None:
-                    factor = self.p.factor  # user specified factor
-                elif self.p.timeframe in self.RATEFACTORS:
-                    # Get the conversion factor from the default table
-                    factor = self.RATEFACTORS[self.p.timeframe]
-
-            if factor is not None:
-                # A factor was found
-
-                if self.p.convertrate:
-                    # Standard: downgrade annual returns to timeframe factor
-                    rate = pow(1.0 + rate, 1.0 / factor) - 1.0
-                else:
-                    # Else upgrade returns to yearly returns
-                    returns = [pow(1.0 + x, factor) - 1.0 for x in returns]
+            rate, factor = self._get_rate_factor()
+            if factor is not None and not self.p.convertrate:
+                # upgrade returns to yearly returns
+                returns = [pow(1.0 + x, factor) - 1.0 for x in returns]
 
             lrets = len(returns) - self.p.stddev_sample
             # Check if the ratio can be calculated
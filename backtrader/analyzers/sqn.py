@@ -24,7 +24,7 @@ from __future__ import (absolute_import, division, print_function,
 import math
 
 from backtrader import Analyzer
-from backtrader.mathsupport import average, standarddev
+from backtrader.mathsupport import average, standarddev, RunningStats
 from backtrader.utils import AutoOrderedDict
 
 
@@ -45,6 +45,16 @@ class SQN(Analyzer):
 
     The sqn value should be deemed reliable when the number of trades >= 30
 
+    Params:
+
+      - ``streaming`` (default: ``False``)
+
+        Accumulate the profits of the trades as they are closed, with
+        constant memory, rather than keeping all of them until the end. The
+        values of the analysis are then up to date after each closed trade.
+        The result matches the standard calculation up to floating point
+        rounding
+
     Methods:
 
       - get_analysis
@@ -55,6 +65,10 @@ class SQN(Analyzer):
     '''
     alias = ('SystemQualityNumber',)
 
+    params = (
+        ('streaming', False),
+    )
+
     def create_analysis(self):
         '''Replace default implementation to instantiate an AutoOrdereDict
         rather than an OrderedDict'''
@@ -64,13 +78,35 @@ class SQN(Analyzer):
         super(SQN, self).start()
         self.pnl = list()
         self.count = 0
+        if self.p.streaming:
+            self._stats = RunningStats()
+            self.rets.sqn = 0
+            self.rets.trades = 0
 
     def notify_trade(self, trade):
         if trade.status == trade.Closed:
-            self.pnl.append(trade.pnlcomm)
             self.count += 1
+            if not self.p.streaming:
+                self.pnl.append(trade.pnlcomm)
+                return
+
+            stats = self._stats
+            stats.add(trade.pnlcomm)
+            if self.count > 1:
+                try:
+                    sqn = math.sqrt(self.count) * stats.mean / stats.stddev()
+                except ZeroDivisionError:
+                    sqn = None
+            else:
+                sqn = 0
+
+            self.rets.sqn = sqn
+            self.rets.trades = self.count
 
     def stop(self):
+        if self.p.streaming:
+            return  # up to date with the last trade
+
         if self.count > 1:
             pnl_av = average(self.pnl)
             pnl_stddev = standarddev(self.pnl)
@@ -79,18 +79,31 @@ class TimeReturn(TimeFrameAnalyzerBase):
 
         Set it to ``True`` or ``False`` for a specific behavior
 
+      - ``streaming`` (default: ``False``)
+
+        Keep only the return of the current period in memory. The return of
+        the last finished period is available as ``closedret`` and the number
+        of finished periods as ``nclosed``, for analyzers which accumulate
+        the returns as they are produced
+
+    Member Attributes:
+
+      - ``ret``: return of the current period (``None`` until the first
+        calculation)
+
     Methods:
 
       - get_analysis
 
         Returns a dictionary with returns as values and the datetime points for
-        each return as keys
+        each return as keys (only the current period if ``streaming``)
     '''
 
     params = (
         ('data', None),
         ('firstopen', True),
         ('fund', None),
+        ('streaming', False),
     )
 
     def start(self):
@@ -102,6 +115,8 @@ class TimeReturn(TimeFrameAnalyzerBase):
 
         self._value_start = 0.0
         self._lastvalue = None
+        self.ret = self.closedret = None
+        self.nclosed = 0
         if self.p.data is None:
             # keep the initial portfolio value if not tracing a data
             if not self._fundmode:
@@ -123,6 +138,11 @@ class TimeReturn(TimeFrameAnalyzerBase):
                 self._value = self.p.data[0]  # the data value if tracking data
 
     def on_dt_over(self):
+        if self.p.streaming and self.rets:
+            # the current period is over. forget it after annotating it
+            _, self.closedret = self.rets.popitem()
+            self.nclosed += 1
+
         # next is called in a new timeframe period
         # if self.p.data is None or len(self.p.data) > 1:
         if self.p.data is None or self._lastvalue is not None:
@@ -138,5 +158,6 @@ class TimeReturn(TimeFrameAnalyzerBase):
     def next(self):
         # Calculate the return
         super(TimeReturn, self).next()
-        self.rets[self.dtkey] = (self._value / self._value_start) - 1.0
+        self.rets[self.dtkey] = self.ret = \
+            (self._value / self._value_start) - 1.0
         self._lastvalue = self._value  # keep last value
@@ -26,6 +26,7 @@ import collections
 
 import backtrader as bt
 from backtrader import Order, Position
+from backtrader.utils import ColumnBuffer, num2date
 
 
 class Transactions(bt.Analyzer):
@@ -50,6 +51,12 @@ class Transactions(bt.Analyzer):
 
           'date', 'amount', 'price', 'sid', 'symbol', 'value'
 
+    The transactions are recorded in a ``ColumnBuffer`` (attribute
+    ``values``) with the columns ``datetime`` (as a float), ``amount``,
+    ``price``, ``sid`` (index of the data) and ``value``, which is turned
+    into the dictionary of results at the end of the run (and by
+    ``get_analysis`` during it)
+
     Methods:
 
       - get_analysis
@@ -70,6 +77,15 @@ class Transactions(bt.Analyzer):
         self._positions = collections.defaultdict(Position)
         self._idnames = list(enumerate(self.strategy.getdatanames()))
 
+        # a row per transaction, the symbol is the name of data "sid"
+        self.values = ColumnBuffer(
+            ['datetime', 'amount', 'price', 'sid', 'value'])
+        self._key = None  # datetime of the last transactions
+        self._start = 0  # row of the 1st transaction of the last datetime
+        self._nrets = 0  # rows already in rets
+        # kept: the strategy is gone after an optimization with optreturn
+        self._tz = self.strategy.datetime._tz
+
     def notify_order(self, order):
         # An order could have several partial executions per cycle (unlikely
         # but possible) and therefore: collect each new execution notification
@@ -89,15 +105,42 @@ class Transactions(bt.Analyzer):
 
     def next(self):
         # super(Transactions, self).next()  # let dtkey update
+        dtnum = self.strategy.datetime[0]
         entries = []
         for i, dname in self._idnames:
             pos = self._positions.get(dname, None)
             if pos is not None:
                 size, price = pos.size, pos.price
                 if size:
-                    entries.append([size, price, i, dname, -size * price])
+                    entries.append((dtnum, size, price, i, -size * price))
 
         if entries:
-            self.rets[self.strategy.datetime.datetime()] = entries
+            if dtnum == self._key:  # same datetime again, replace entries
+                self.values.truncate(self._start)
+                self._nrets = min(self._nrets, self._start)
+
+            self._key, self._start = dtnum, len(self.values)
+            for entry in entries:
+                self.values.add(entry)
 
         self._positions.clear()
+
+    def stop(self):
+        self.get_analysis()  # the results are ready after the run
+
+    def get_analysis(self):
+        tz = self._tz
+        names = dict(self._idnames)
+        dtlast = None
+        for dtnum, size, price, sid, value in self.values.rows(self._nrets):
+            if dtnum != dtlast:
+                dtlast = dtnum
+                entries = self.rets[num2date(dtnum, tz=tz)] = list()
+
+            if size.is_integer():
+                size = int(size)  # sizes are usually integers
+            sid = int(sid)
+            entries.append([size, price, sid, names[sid], value])
+
+        self._nrets = len(self.values)
+        return self.rets
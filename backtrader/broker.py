@@ -53,6 +53,7 @@ class BrokerBase(with_metaclass(MetaBroker, object)):
 
     def __init__(self):
         self.comminfo = dict()
+        self.retention = None
         self.init()
 
     def init(self):
@@ -60,12 +61,22 @@ class BrokerBase(with_metaclass(MetaBroker, object)):
         if None not in self.comminfo:
             self.comminfo = dict({None: self.p.commission})
 
+        self._commchanged()
+
+    def _commchanged(self):
+        # called when the commission schemes change
+        self._datacomm = dict()  # data -> resolved comminfo
+
     def start(self):
         self.init()
 
     def stop(self):
         pass
 
+    def set_retention(self, retention):
+        '''Sets the ``Retention`` policy for the orders kept by the broker'''
+        self.retention = retention
+
     def add_order_history(self, orders, notify=False):
         '''Add order history. See cerebro for details'''
         raise NotImplementedError
@@ -77,10 +88,17 @@ class BrokerBase(with_metaclass(MetaBroker, object)):
     def getcommissioninfo(self, data):
         '''Retrieves the ``CommissionInfo`` scheme associated with the given
         ``data``'''
-        if data._name in self.comminfo:
-            return self.comminfo[data._name]
+        try:
+            return self._datacomm[data]
+        except KeyError:
+            pass
+
+        comminfo = self.comminfo.get(data._name, None)
+        if comminfo is None:
+            comminfo = self.comminfo[None]
 
-        return self.comminfo[None]
+        self._datacomm[data] = comminfo
+        return comminfo
 
     def setcommission(self,
                       commission=0.0, margin=None, mult=1.0,
@@ -103,11 +121,13 @@ class BrokerBase(with_metaclass(MetaBroker, object)):
                             interest=interest, interest_long=interest_long,
                             leverage=leverage, automargin=automargin)
         self.comminfo[name] = comm
+        self._commchanged()
 
     def addcommissioninfo(self, comminfo, name=None):
         '''Adds a ``CommissionInfo`` object that will be the default for all assets if
         ``name`` is ``None``'''
         self.comminfo[name] = comminfo
+        self._commchanged()
 
     def getcash(self):
         raise NotImplementedError
@@ -148,6 +168,16 @@ class BrokerBase(with_metaclass(MetaBroker, object)):
     def cancel(self, order):
         raise NotImplementedError
 
+    def amend(self, order, price=None, pricelimit=None,
+              trailamount=None, trailpercent=None):
+        '''Changes in place the prices of a pending order (see
+        ``Order.amend``). Returns ``True`` if the order has been amended
+
+        Brokers which cannot amend orders return ``False``: the order has to
+        be cancelled and a new one submitted
+        '''
+        return False
+
     def buy(self, owner, data, size, price=None, plimit=None,
             exectype=None, valid=None, tradeid=0, oco=None,
             trailamount=None, trailpercent=None,
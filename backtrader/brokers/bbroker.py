@@ -21,8 +21,11 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import bisect
 import collections
 import datetime
+import heapq
+import itertools
 
 import backtrader as bt
 from backtrader.comminfo import CommInfoBase
@@ -32,6 +35,193 @@ from backtrader.utils.py3 import string_types, integer_types
 
 __all__ = ['BackBroker', 'BrokerBack']
 
+_INF = float('inf')
+
+
+class OrderBook(object):
+    '''Pending orders of the broker, indexed by data and execution type
+
+    The orders are kept in acceptance order (which is the order in which the
+    broker evaluates them) and spread over buckets per data:
+
+      - ``Low``: orders which can only be executed if the price reaches down
+        to a trigger price (buy limit, sell stop and untriggered sell
+        stop-limit orders and triggered buy stop-limit orders). Kept sorted by
+        trigger price
+
+      - ``High``: the counterparts which need the price reaching up to the
+        trigger price. Kept sorted by trigger price
+
+      - ``Trail``: trailing stop orders, kept in ``Low`` and ``High`` at the
+        same time. With the trigger price like a stop order and with the price
+        which set the current stop in the other direction: the stop can only
+        move if the price goes beyond it
+
+      - ``Always``: orders which have to be evaluated with each bar (market,
+        close and historical orders and orders with no usable trigger price)
+
+      - ``Idle``: orders which are not yet active (children of brackets)
+
+    Orders with a validity are additionally kept in a heap to be evaluated
+    for expiration only when the data goes past the validity.
+
+    ``due`` returns the orders which have to be evaluated for the current
+    bars. The rest of the orders would not do anything if evaluated
+    '''
+    Always, Low, High, Idle, Trail = range(5)
+
+    def __init__(self):
+        self._seq = itertools.count()
+        self._entries = dict()  # order ref -> [seq, order, bucket, key]
+        self._books = dict()  # data -> [dict(seq->order), list, list]
+        self._expiries = dict()  # data -> heap of (valid, seq, order)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, order):
+        return order is not None and order.ref in self._entries
+
+    def __iter__(self):
+        '''Iterates over the pending orders in acceptance order'''
+        return (entry[1] for entry in sorted(self._entries.values(),
+                                             key=lambda x: x[0]))
+
+    def get(self, ref, default=None):
+        entry = self._entries.get(ref)
+        return default if entry is None else entry[1]
+
+    def _getbucket(self, order):
+        if not order.active():
+            return self.Idle, None
+
+        exectype = order.exectype
+        if exectype == Order.Limit:
+            key, low = order.created.price, order.isbuy()
+        elif exectype == Order.Stop:
+            key, low = order.created.price, not order.isbuy()
+        elif exectype == Order.StopLimit or (exectype == Order.StopTrailLimit
+                                             and order.triggered):
+            if order.triggered:  # acts as a limit order with pricelimit
+                key, low = order.created.pricelimit, order.isbuy()
+            else:
+                key, low = order.created.price, not order.isbuy()
+        elif exectype in [Order.StopTrail, Order.StopTrailLimit]:
+            key, ref = order.created.price, order._trailref
+            if key is None or key != key or ref is None or ref != ref:
+                return self.Always, None
+
+            # sell: trigger going down, trailing going up. buy: the opposite
+            if order.isbuy():
+                return self.Trail, (ref, key)
+            return self.Trail, (key, ref)
+        else:
+            return self.Always, None
+
+        if key is None or key != key:  # no trigger price or NaN
+            return self.Always, None
+
+        return (self.Low if low else self.High), key
+
+    def append(self, order, seq=None):
+        '''Adds an order. A ``seq`` from ``remove`` keeps the original
+        position in the acceptance order'''
+        data = order.data
+        if seq is None:
+            seq = next(self._seq)
+            if order.valid and order.exectype != Order.Market:
+                heap = self._expiries.setdefault(data, [])
+                heapq.heappush(heap, (order.valid, seq, order))
+
+        bucket, key = self._getbucket(order)
+        self._entries[order.ref] = [seq, order, bucket, key]
+
+        if bucket == self.Idle:
+            return
+
+        book = self._books.get(data)
+        if book is None:
+            self._books[data] = book = [dict(), [], []]
+
+        if bucket == self.Always:
+            book[0][seq] = order
+        elif bucket == self.Trail:
+            lowkey, highkey = key
+            bisect.insort(book[self.Low], (lowkey, seq, order))
+            bisect.insort(book[self.High], (highkey, seq, order))
+        else:
+            bisect.insort(book[bucket], (key, seq, order))
+
+    def remove(self, order):
+        '''Removes an order returning its position in the acceptance order.
+        Raises ``ValueError`` if the order is not pending'''
+        entry = self._entries.pop(getattr(order, 'ref', None), None)
+        if entry is None:
+            raise ValueError('order not pending')
+
+        seq, order, bucket, key = entry
+        if bucket == self.Idle:
+            return seq
+
+        data = order.data
+        book = self._books[data]
+        if bucket == self.Always:
+            del book[0][seq]
+        elif bucket == self.Trail:
+            lowkey, highkey = key
+            lst = book[self.Low]
+            del lst[bisect.bisect_left(lst, (lowkey, seq))]
+            lst = book[self.High]
+            del lst[bisect.bisect_left(lst, (highkey, seq))]
+        else:
+            lst = book[bucket]
+            del lst[bisect.bisect_left(lst, (key, seq))]
+
+        if not book[0] and not book[1] and not book[2]:
+            del self._books[data]
+
+        return seq
+
+    def reindex(self, order):
+        '''Puts the order in the right bucket after changes in its activation
+        status or trigger prices'''
+        if order in self:
+            self.append(order, seq=self.remove(order))
+
+    def due(self, prices):
+        '''Returns, in acceptance order, the orders which have to be evaluated
+        with the current bars. ``prices`` is a callable returning ``(open,
+        high, low, close)`` for a data'''
+        due = dict()
+        for data, (always, lows, highs) in self._books.items():
+            due.update(always)
+            if not lows and not highs:
+                continue
+
+            popen, phigh, plow, pclose = prices(data)
+            pmin = min(popen, plow, pclose)
+            pmax = max(popen, phigh, pclose)
+            if pmin == pmin:  # not NaN
+                lows = lows[bisect.bisect_left(lows, (pmin,)):]
+            if pmax == pmax:
+                highs = highs[:bisect.bisect_right(highs, (pmax, _INF))]
+
+            due.update((seq, o) for _, seq, o in lows)
+            due.update((seq, o) for _, seq, o in highs)
+
+        for data, heap in list(self._expiries.items()):
+            dt0 = data.datetime[0]
+            while heap and heap[0][0] < dt0:
+                _, seq, o = heapq.heappop(heap)
+                entry = self._entries.get(o.ref)
+                if entry is not None and entry[0] == seq:
+                    due[seq] = o
+
+            if not heap:
+                del self._expiries[data]
+
+        return [due[seq] for seq in sorted(due)]
+
 
 class BackBroker(bt.BrokerBase):
     '''Broker Simulator
@@ -88,6 +278,20 @@ class BackBroker(bt.BrokerBase):
         - ``checksubmit`` (default: ``True``)
           check margin/cash before accepting an order into the system
 
+        - ``checkpolicy`` (default: ``None``)
+          order in which the orders submitted during a cycle are checked (and
+          accepted) with ``checksubmit``:
+
+            - ``None``: submission order
+            - ``'sellsfirst'``: sell orders before buy orders
+            - ``'reducefirst'``: orders reducing a position before those
+              opening/increasing one
+            - a callable: ``key(order)`` to sort the orders
+
+          The cash released by the orders checked first is available for the
+          later ones. Children of bracket orders are always checked right
+          after their parent
+
         - ``eosbar`` (default: ``False``):
           With intraday bars consider a bar with the same ``time`` as the end
           of session to be the end of the session. This is not usually the
@@ -231,6 +435,7 @@ class BackBroker(bt.BrokerBase):
     params = (
         ('cash', 10000.0),
         ('checksubmit', True),
+        ('checkpolicy', None),
         ('eosbar', False),
         ('filler', None),
         # slippage options
@@ -257,6 +462,7 @@ class BackBroker(bt.BrokerBase):
 
     def init(self):
         super(BackBroker, self).init()
+        self._checkpolicy(self.p.checkpolicy)
         self.startingcash = self.cash = self.p.cash
         self._value = self.cash
         self._valuemkt = 0.0  # no open position
@@ -267,11 +473,14 @@ class BackBroker(bt.BrokerBase):
         self._leverage = 1.0  # initially nothing is open
         self._unrealized = 0.0  # no open position
 
-        self.orders = list()  # will only be appending
-        self.pending = collections.deque()  # popleft and append(right)
+        self.orders = list()  # finished orders trimmed if retention
+        self._orefs = dict()  # order ref -> order
+        self.pending = OrderBook()  # indexed by data and exectype
         self._toactivate = collections.deque()  # to activate in next cycle
 
         self.positions = collections.defaultdict(Position)
+        self._openpos = dict()  # data -> position for non-flat positions
+        self._openview = None  # open positions grouped by comminfo
         self.d_credit = collections.defaultdict(float)  # credit per data
         self.notifs = collections.deque()
 
@@ -287,6 +496,11 @@ class BackBroker(bt.BrokerBase):
         self._fundshares = self.p.cash / self._fundval
         self._cash_addition = collections.deque()
 
+        # values of the current bar of each data, shared by all the orders
+        # evaluated during a cycle
+        self._barprices = dict()
+        self._bardts = dict()
+
     def get_notification(self):
         try:
             return self.notifs.popleft()
@@ -356,9 +570,22 @@ class BackBroker(bt.BrokerBase):
         '''Sets a volume filler for volume filling execution'''
         self.p.filler = filler
 
-    def set_checksubmit(self, checksubmit):
-        '''Sets the checksubmit parameter'''
+    def set_checksubmit(self, checksubmit, checkpolicy=None):
+        '''Sets the checksubmit (and checkpolicy) parameter'''
+        self._checkpolicy(checkpolicy)
         self.p.checksubmit = checksubmit
+        self.p.checkpolicy = checkpolicy
+
+    CheckPolicies = ('sellsfirst', 'reducefirst')
+
+    def _checkpolicy(self, policy):
+        '''Raises ``ValueError`` if ``policy`` is not a valid checkpolicy'''
+        if policy is None or callable(policy) or policy in self.CheckPolicies:
+            return
+
+        raise ValueError(
+            'checkpolicy must be None, a callable or one of %s, not %r' %
+            (', '.join(map(repr, self.CheckPolicies)), policy))
 
     def set_eosbar(self, eosbar):
         '''Sets the eosbar parameter (alias: ``seteosbar``'''
@@ -409,6 +636,26 @@ class BackBroker(bt.BrokerBase):
             self._bracketize(order, cancel=True)
         return True
 
+    def amend(self, order, price=None, pricelimit=None,
+              trailamount=None, trailpercent=None):
+        # the live order (the given one may be a notification)
+        live = self.pending.get(order.ref)
+        pending = live is not None
+        if not pending:  # may be awaiting the submission check
+            live = next((o for o in self.submitted if o.ref == order.ref),
+                        None)
+            if live is None:
+                return False
+
+        if not live.amend(price=price, pricelimit=pricelimit,
+                          trailamount=trailamount, trailpercent=trailpercent):
+            return False
+
+        if pending:
+            self.pending.reindex(live)  # new trigger prices
+
+        return True
+
     def get_value(self, datas=None, mkt=False, lever=False):
         '''Returns the portfolio value of the given datas (if datas is ``None``, then
         the total portfolio value will be returned (alias: ``getvalue``)
@@ -436,23 +683,33 @@ class BackBroker(bt.BrokerBase):
             self._fundshares += c / self._fundval
             self.cash += c
 
-        for data in datas or self.positions:
-            comminfo = self.getcommissioninfo(data)
-            position = self.positions[data]
-            # use valuesize:  returns raw value, rather than negative adj val
-            if not self.p.shortcash:
-                dvalue = comminfo.getvalue(position, data.close[0])
-            else:
-                dvalue = comminfo.getvaluesize(position.size, data.close[0])
-
-            dunrealized = comminfo.profitandloss(position.size, position.price,
-                                                 data.close[0])
-            if datas and len(datas) == 1:
-                if lever and dvalue > 0:
-                    dvalue -= dunrealized
-                    return (dvalue / comminfo.get_leverage()) + dunrealized
-                return dvalue  # raw data value requested, short selling is neg
+        if datas:
+            dvalues = []
+            for data in datas:
+                comminfo = self.getcommissioninfo(data)
+                position = self.positions[data]
+                # use valuesize: returns raw value, rather than neg adj val
+                if not self.p.shortcash:
+                    dvalue = comminfo.getvalue(position, data.close[0])
+                else:
+                    dvalue = comminfo.getvaluesize(position.size,
+                                                   data.close[0])
+
+                dunrealized = comminfo.profitandloss(position.size,
+                                                     position.price,
+                                                     data.close[0])
+                if len(datas) == 1:
+                    if lever and dvalue > 0:
+                        dvalue -= dunrealized
+                        return (dvalue / comminfo.get_leverage()) + dunrealized
+                    return dvalue  # raw data value requested, short is neg
+
+                dvalues.append((dvalue, dunrealized, comminfo.get_leverage()))
+        else:
+            # flat positions have no value and no unrealized profit and loss
+            dvalues = self._opencalc(self._calcvalues)
 
+        for dvalue, dunrealized, leverage in dvalues:
             if not self.p.shortcash:
                 dvalue = abs(dvalue)  # short selling adds value in this case
 
@@ -461,7 +718,7 @@ class BackBroker(bt.BrokerBase):
 
             if dvalue > 0:  # long position - unlever
                 dvalue -= dunrealized
-                pos_value_unlever += (dvalue / comminfo.get_leverage())
+                pos_value_unlever += (dvalue / leverage)
                 pos_value_unlever += dunrealized
             else:
                 pos_value_unlever += dvalue
@@ -517,11 +774,7 @@ class BackBroker(bt.BrokerBase):
         return self.positions[data]
 
     def orderstatus(self, order):
-        try:
-            o = self.orders.index(order)
-        except ValueError:
-            o = order
-
+        o = self._orefs.get(order.ref, order)
         return o.status
 
     def _take_children(self, order):
@@ -556,26 +809,50 @@ class BackBroker(bt.BrokerBase):
             order.submit()
             self.submitted.append(order)
             self.orders.append(order)
+            self._orefs[order.ref] = order
             self.notify(order)
         else:
             self.submit_accept(order)
 
         return order
 
+    def _checkkey(self):
+        policy = self.p.checkpolicy
+        if policy is None:
+            return None
+
+        if policy == 'sellsfirst':
+            return lambda order: order.isbuy()
+
+        if policy == 'reducefirst':
+            positions = self.positions
+            return lambda order: positions[order.data].size * order.size >= 0
+
+        return policy
+
     def check_submitted(self):
-        cash = self.cash
-        positions = dict()
+        if not self.submitted:
+            return
 
-        while self.submitted:
-            order = self.submitted.popleft()
+        # the set of orders submitted during the cycle is checked at once
+        orders = list(self.submitted)
+        self.submitted.clear()
 
+        key = self._checkkey()
+        if key is not None:
+            # stable sort, with the children sharing the key of the parent
+            orders.sort(key=lambda o: key(o if o.parent is None else o.parent))
+
+        cash = self.cash
+        positions = dict()  # pseudo-executed positions
+        for order in orders:
             if self._take_children(order) is None:  # children not taken
                 continue
 
-            comminfo = self.getcommissioninfo(order.data)
-
-            position = positions.setdefault(
-                order.data, self.positions[order.data].clone())
+            position = positions.get(order.data)
+            if position is None:
+                positions[order.data] = position = \
+                    self.positions[order.data].clone()
 
             # pseudo-execute the order to get the remaining cash after exec
             cash = self._execute(order, cash=cash, position=position)
@@ -593,6 +870,7 @@ class BackBroker(bt.BrokerBase):
         order.pannotated = None
         order.submit()
         order.accept()
+        self._orefs.setdefault(order.ref, order)
         self.pending.append(order)
         self.notify(order)
 
@@ -613,18 +891,26 @@ class BackBroker(bt.BrokerBase):
             for o in pc:  # activate childnre
                 self._toactivate.append(o)
 
+            if not pc and self.retention is not None:
+                del self._pchildren[pref]  # finished, cannot take children
+
     def _ococheck(self, order):
         # ocoref = self._ocos[order.ref] or order.ref  # a parent or self
-        parentref = self._ocos[order.ref]
+        parentref = self._ocos.get(order.ref, None)  # None: group gone
         ocoref = self._ocos.get(parentref, None)
         ocol = self._ocol.pop(ocoref, None)
         if ocol:
-            for i in range(len(self.pending) - 1, -1, -1):
-                o = self.pending[i]
-                if o is not None and o.ref in ocol:
-                    del self.pending[i]
-                    o.cancel()
-                    self.notify(o)
+            if self.retention is not None:
+                for ref in ocol:  # group is done, forget about its members
+                    self._ocos.pop(ref, None)
+
+            pending = self.pending
+            ocos = [pending.get(ref) for ref in ocol]
+            ocos = [(pending.remove(o), o) for o in ocos if o is not None]
+            # cancel in reverse acceptance order
+            for _, o in sorted(ocos, key=lambda x: x[0], reverse=True):
+                o.cancel()
+                self.notify(o)
 
     def _ocoize(self, order, oco):
         oref = order.ref
@@ -632,7 +918,8 @@ class BackBroker(bt.BrokerBase):
             self._ocos[oref] = oref  # current order is parent
             self._ocol[oref].append(oref)  # create ocogroup
         else:
-            ocoref = self._ocos[oco.ref]  # ref to group leader
+            # ref to group leader (oco itself if its group is already done)
+            ocoref = self._ocos.setdefault(oco.ref, oco.ref)
             self._ocos[oref] = ocoref  # ref to group leader
             self._ocol[ocoref].append(oref)  # add to group
 
@@ -826,7 +1113,13 @@ class BackBroker(bt.BrokerBase):
             comminfo.confirmexec(execsize, price)
 
             # do a real position update if something was executed
-            position.update(execsize, price, data.datetime.datetime())
+            position.update(execsize, price, self._getdatetime(data))
+            if position:
+                self._openpos[data] = position
+            else:
+                self._openpos.pop(data, None)
+
+            self._openview = None
 
             if closed and self.p.int2pnl:  # Assign accumulated interest data
                 closedcomm += self.d_credit.pop(data, 0.0)
@@ -852,7 +1145,16 @@ class BackBroker(bt.BrokerBase):
             self._bracketize(order, cancel=True)
 
     def notify(self, order):
-        self.notifs.append(order.clone())
+        snapshot = order.snapshot()
+        self.notifs.append(snapshot)
+        if self.retention is not None and not order.alive():
+            self._orefs.pop(order.ref, None)  # status is in the order itself
+            self.retention.logorder(snapshot)
+            self.retention.trim(self.orders, finished=self._orderdone)
+
+    @staticmethod
+    def _orderdone(order):
+        return not order.alive()
 
     def _try_exec_historical(self, order):
         self._execute(order, ago=0, price=order.created.price)
@@ -1044,8 +1346,77 @@ class BackBroker(bt.BrokerBase):
 
         return None  # no price can be returned
 
-    def _try_exec(self, order):
-        data = order.data
+    def _commchanged(self):
+        super(BackBroker, self)._commchanged()
+        self._openview = None
+
+    def _getopenview(self):
+        # open datas, positions and groups of (comminfo, indices) of them
+        view = self._openview
+        if view is None:
+            datas, positions = list(self._openpos), list(self._openpos.values())
+            groups = collections.OrderedDict()
+            getcomm = self.getcommissioninfo
+            for i, data in enumerate(datas):
+                groups.setdefault(getcomm(data), []).append(i)
+
+            self._openview = view = datas, positions, list(groups.items())
+
+        return view
+
+    def _opencalc(self, calc):
+        '''Calls ``calc(comminfo, datas, positions)`` once per commission
+        scheme with the open positions using it and returns the list of
+        results in the order of the open positions'''
+        datas, positions, groups = self._getopenview()
+        if len(groups) == 1:
+            return calc(groups[0][0], datas, positions)
+
+        results = [None] * len(datas)
+        for comminfo, idxs in groups:
+            gresults = calc(comminfo,
+                            [datas[i] for i in idxs],
+                            [positions[i] for i in idxs])
+            for i, result in zip(idxs, gresults):
+                results[i] = result
+
+        return results
+
+    def _calcvalues(self, comminfo, datas, positions):
+        # (value, unrealized pnl, leverage) for each position
+        prices = [data.close[0] for data in datas]
+        sizes = [pos.size for pos in positions]
+        if not self.p.shortcash:
+            dvalues = comminfo.getvalues(positions, prices)
+        else:
+            dvalues = comminfo.getvaluesizes(sizes, prices)
+
+        dunrealized = comminfo.profitandlosses(
+            sizes, [pos.price for pos in positions], prices)
+
+        leverage = comminfo.get_leverage()
+        return [(dvalue, dunreal, leverage)
+                for dvalue, dunreal in zip(dvalues, dunrealized)]
+
+    def _calccredits(self, comminfo, datas, positions):
+        # (data, position, datetime, credit interest) for each position
+        dts = [self._getdatetime(data) for data in datas]
+        credits = comminfo.get_credit_interests(datas, positions, dts)
+        return list(zip(datas, positions, dts, credits))
+
+    def _calcadjusts(self, comminfo, datas, positions):
+        # (position, cash adjustment, close) for each position
+        closes = [data.close[0] for data in datas]
+        adjusts = comminfo.cashadjusts([pos.size for pos in positions],
+                                       [pos.adjbase for pos in positions],
+                                       closes)
+        return list(zip(positions, adjusts, closes))
+
+    def _getprices(self, data):
+        # current open, high, low, close (tick values take precedence)
+        prices = self._barprices.get(data)
+        if prices is not None:
+            return prices
 
         popen = getattr(data, 'tick_open', None)
         if popen is None:
@@ -1060,6 +1431,20 @@ class BackBroker(bt.BrokerBase):
         if pclose is None:
             pclose = data.close[0]
 
+        self._barprices[data] = prices = (popen, phigh, plow, pclose)
+        return prices
+
+    def _getdatetime(self, data):
+        # current datetime.datetime of data
+        dt = self._bardts.get(data)
+        if dt is None:
+            self._bardts[data] = dt = data.datetime.datetime()
+
+        return dt
+
+    def _try_exec(self, order):
+        popen, phigh, plow, pclose = self._getprices(order.data)
+
         pcreated = order.created.price
         plimit = order.created.pricelimit
 
@@ -1181,64 +1566,67 @@ class BackBroker(bt.BrokerBase):
                 uhist[0] = uhorder = next(uhorders, None)
 
     def next(self):
+        # new bars: forget the values of the previous cycle
+        self._barprices.clear()
+        self._bardts.clear()
+
         while self._toactivate:
-            self._toactivate.popleft().activate()
+            order = self._toactivate.popleft()
+            order.activate()
+            self.pending.reindex(order)
 
         if self.p.checksubmit:
             self.check_submitted()
 
         # Discount any cash for positions hold
         credit = 0.0
-        for data, pos in self.positions.items():
-            if pos:
-                comminfo = self.getcommissioninfo(data)
-                dt0 = data.datetime.datetime()
-                dcredit = comminfo.get_credit_interest(data, pos, dt0)
+        for data, pos, dt0, dcredit in self._opencalc(self._calccredits):
+            if dcredit:
                 self.d_credit[data] += dcredit
                 credit += dcredit
-                pos.datetime = dt0  # mark last credit operation
+            pos.datetime = dt0  # mark last credit operation
 
         self.cash -= credit
 
         self._process_order_history()
 
-        # Iterate once over all elements of the pending queue
-        self.pending.append(None)
-        while True:
-            order = self.pending.popleft()
-            if order is None:
-                break
+        # Evaluate (in acceptance order) the pending orders which can be
+        # affected by the current bars. The rest would see no action
+        pending = self.pending
+        for order in pending.due(self._getprices):
+            if order not in pending:
+                continue  # cancelled by the execution of a previous order
 
+            seq = pending.remove(order)
             if order.expire():
                 self.notify(order)
                 self._ococheck(order)
                 self._bracketize(order, cancel=True)
 
             elif not order.active():
-                self.pending.append(order)  # cannot yet be processed
+                pending.append(order, seq=seq)  # cannot yet be processed
 
             else:
                 self._try_exec(order)
                 if order.alive():
-                    self.pending.append(order)
+                    pending.append(order, seq=seq)  # trigger may have moved
 
                 elif order.status == Order.Completed:
                     # a bracket parent order may have been executed
                     self._bracketize(order)
 
         # Operations have been executed ... adjust cash end of bar
-        for data, pos in self.positions.items():
+        for pos, adjust, close in self._opencalc(self._calcadjusts):
             # futures change cash every bar
-            if pos:
-                comminfo = self.getcommissioninfo(data)
-                self.cash += comminfo.cashadjust(pos.size,
-                                                 pos.adjbase,
-                                                 data.close[0])
-                # record the last adjustment price
-                pos.adjbase = data.close[0]
+            self.cash += adjust
+            # record the last adjustment price
+            pos.adjbase = close
 
         self._get_value()  # update value
 
+        self._barprices.clear()
+        self._bardts.clear()
+
 
 # Alias
 BrokerBack = BackBroker
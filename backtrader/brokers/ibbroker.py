@@ -391,7 +391,7 @@ class IBBroker(with_metaclass(MetaIBBroker, BrokerBase)):
         return self.submit(order)
 
     def notify(self, order):
-        self.notifs.put(order.clone())
+        self.notifs.put(order.snapshot())
 
     def get_notification(self):
         try:
@@ -345,7 +345,7 @@ class OandaBroker(with_metaclass(MetaOandaBroker, BrokerBase)):
         return self.o.order_cancel(order)
 
     def notify(self, order):
-        self.notifs.append(order.clone())
+        self.notifs.append(order.snapshot())
 
     def get_notification(self):
         if not self.notifs:
@@ -198,7 +198,7 @@ class VCBroker(with_metaclass(MetaVCBroker, BrokerBase)):
         return self.notifs.popleft()  # at leat a None is present
 
     def notify(self, order):
-        self.notifs.append(order.clone())
+        self.notifs.append(order.snapshot())
 
     def next(self):
         self.notifs.append(None)  # mark notificatino boundary
@@ -21,10 +21,16 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+from array import array
 import datetime
+import hashlib
+import heapq
 import collections
+import csv
+import io
 import itertools
 import multiprocessing
+import operator
 
 import backtrader as bt
 from .utils.py3 import (map, range, zip, with_metaclass, string_types,
@@ -36,6 +42,7 @@ from .brokers import BackBroker
 from .metabase import MetaParams
 from . import observers
 from .writer import WriterFile
+from .retention import Retention
 from .utils import OrderedDict, tzparse, num2date, date2num
 from .strategy import Strategy, SignalStrategy
 from .tradingcal import (TradingCalendarBase, TradingCalendar,
@@ -52,6 +59,117 @@ class OptReturn(object):
             setattr(self, k, v)
 
 
+class ScanResult(object):
+    '''Result of the run of a symbol during a ``Cerebro.scan``
+
+    Attributes:
+
+      - ``symbol``: the symbol
+      - ``analyses``: a list with one entry per strategy, a dictionary with
+        the analysis (``get_analysis``) of each analyzer by name
+      - ``error``: ``None`` or the description of the exception which
+        prevented the run of the symbol
+    '''
+    def __init__(self, symbol, analyses=None, error=None):
+        self.symbol = symbol
+        self.analyses = analyses or []
+        self.error = error
+
+
+# state of a scan worker process, set once by the pool initializer
+_scanstate = dict()
+
+
+def _scan_init(cerebro, datafactory, datakwargs):
+    _scanstate.update(cerebro=cerebro, datafactory=datafactory,
+                      datakwargs=datakwargs)
+
+
+def _scan_worker(symbol):
+    return _scanstate['cerebro']._scanone(
+        symbol, _scanstate['datafactory'], _scanstate['datakwargs'])
+
+
+class Timeline(object):
+    '''Global timeline of a set of preloaded datas, calculated once per run
+    (or once for all the runs of an optimization with ``optdatas``)
+
+    Each step of the timeline has the datetime ``dt0`` and the indices (in the
+    given list of datas) of the datas which deliver a bar at ``dt0``, just like
+    the peek/advance logic of ``runonce`` would do it. The timeline is
+    pickable and can be shared with optimization workers
+
+    Attributes:
+
+      - ``key``: identifies the datas (name, position, length and a digest
+        of the pending datetimes) the timeline was calculated for
+
+      - ``dts``: array with the ``dt0`` of each step
+
+      - ``offsets``/``didx``: the indices of the datas delivering at step
+        ``i`` are ``didx[offsets[i]:offsets[i + 1]]``
+    '''
+    def __init__(self, datas):
+        self.key = self.getkey(datas)
+        self.dts = dts = array(str('d'))
+        self.offsets = offsets = array(str('l'), [0])
+        self.didx = didx = array(str('l'))
+
+        # datetime arrays and current positions of the datas
+        dtarrays = [d.lines.datetime.array for d in datas]
+        pos = [len(d) for d in datas]
+        ends = [d.buflen() for d in datas]
+
+        dheap = [(dtarrays[i][p], i) for i, p in enumerate(pos) if p < ends[i]]
+        heapq.heapify(dheap)
+
+        while dheap:
+            dt0 = dheap[0][0]
+            dadv = []  # each data may only move once per step
+            while dheap and dheap[0][0] <= dt0:
+                dadv.append(heapq.heappop(dheap)[1])
+
+            for i in dadv:
+                didx.append(i)
+                pos[i] = p = pos[i] + 1
+                if p < ends[i]:
+                    heapq.heappush(dheap, (dtarrays[i][p], i))
+
+            dts.append(dt0)
+            offsets.append(len(didx))
+
+    @staticmethod
+    def getkey(datas):
+        '''Returns a key which identifies the current state of ``datas``.
+
+        The timeline only depends on the datetimes still to be delivered,
+        which are digested in full: datas with the same span and length
+        (a missing bar in between) get different keys. The key does not
+        depend on the id of the datas, to let optimization workers reuse the
+        timeline calculated by the main process
+        '''
+        key = []
+        for d in datas:
+            p, end = len(d), d.buflen()
+            dtarray = d.lines.datetime.array
+            if not isinstance(dtarray, array):  # not a preloaded buffer
+                dtarray = array(str('d'), dtarray)
+
+            digest = hashlib.sha1(dtarray[p:end].tobytes()).hexdigest()
+            key.append((d._name, p, end, digest))
+
+        return tuple(key)
+
+    def __len__(self):
+        return len(self.dts)
+
+    def __iter__(self):
+        '''Yields tuples (dt0, indices of the datas delivering at dt0)'''
+        offsets, didx = self.offsets, self.didx
+        for i, dt0 in enumerate(self.dts):
+            yield dt0, didx[offsets[i]:offsets[i + 1]]
+
+
 class Cerebro(with_metaclass(MetaParams, object)):
     '''Params:
 
@@ -316,10 +434,13 @@ class Cerebro(with_metaclass(MetaParams, object)):
         self._broker.cerebro = self
 
         self._tradingcal = None  # TradingCalendar()
+        self._calendars = dict()  # shared calendars keyed by name/instance
 
         self._pretimers = list()
+        self._timeline = None  # calculated/shared when running in runonce
         self._ohistory = list()
         self._fhistory = None
+        self._retention = None
 
     @staticmethod
     def iterize(iterable):
@@ -570,19 +691,32 @@ class Cerebro(with_metaclass(MetaParams, object)):
         If a subclass of `TradingCalendarBase` is passed (not an instance) it
         will be instantiated
         '''
-        if isinstance(cal, string_types):
-            cal = PandasMarketCalendar(calendar=cal)
-        elif hasattr(cal, 'valid_days'):
-            cal = PandasMarketCalendar(calendar=cal)
+        self._tradingcal = self._getcalendar(cal)
 
-        else:
+    def _getcalendar(self, cal):
+        '''Returns a ``TradingCalendarBase`` instance for ``cal`` (see
+        ``addcalendar``). Calendars created from a name or from a
+        ``pandas_market_calendars`` instance are kept and shared, so that all
+        datas using the same calendar share the compiled index
+        '''
+        if isinstance(cal, string_types) or hasattr(cal, 'valid_days'):
+            key = cal if isinstance(cal, string_types) else id(cal)
             try:
-                if issubclass(cal, TradingCalendarBase):
-                    cal = cal()
-            except TypeError:  # already an instance
+                return self._calendars[key][0]
+            except KeyError:
                 pass
 
-        self._tradingcal = cal
+            pcal = PandasMarketCalendar(calendar=cal)
+            self._calendars[key] = (pcal, cal)  # keep cal alive for the id
+            return pcal
+
+        try:
+            if issubclass(cal, TradingCalendarBase):
+                cal = cal()
+        except TypeError:  # already an instance
+            pass
+
+        return cal
 
     def add_signal(self, sigtype, sigcls, *sigargs, **sigkwargs):
         '''Adds a signal to the system which will be later added to a
@@ -615,6 +749,21 @@ class Cerebro(with_metaclass(MetaParams, object)):
         '''
         self.writers.append((wrtcls, args, kwargs))
 
+    def addretention(self, keep=None, logfile=None):
+        '''Adds a ``Retention`` policy for the orders and trades kept in
+        memory by the broker and the strategies during a run.
+
+          - ``keep``: number of orders and closed trades to keep. ``None``
+            keeps everything and ``0`` only what is still alive
+
+          - ``logfile``: file name (or file-like object) to which finished
+            orders and closed trades are written (csv) before leaving the
+            memory. It can be read back with ``Retention.readlog``
+
+        See ``Retention`` for the details
+        '''
+        self._retention = dict(keep=keep, logfile=logfile)
+
     def addsizer(self, sizercls, *args, **kwargs):
         '''Adds a ``Sizer`` class (and args) which is the default sizer for any
         strategy added to cerebro
@@ -1139,6 +1288,9 @@ class Cerebro(with_metaclass(MetaParams, object)):
                     if self._dopreload:
                         data.preload()
 
+                # calculate the timeline once for all workers
+                self._gettimeline(self._rundatas())
+
             pool = multiprocessing.Pool(self.p.maxcpus or None)
             for r in pool.imap(self, iterstrats):
                 self.runstrats.append(r)
@@ -1157,6 +1309,149 @@ class Cerebro(with_metaclass(MetaParams, object)):
 
         return self.runstrats
 
+    def scan(self, symbols, datafactory, datakwargs=None, maxcpus=None,
+             chunksize=1, outfile=None, callback=None):
+        '''Runs the configured strategies and analyzers once for each of the
+        ``symbols``, each run with a single data, and returns a list of
+        ``ScanResult`` (in the order of ``symbols``)
+
+        ``cerebro`` acts as template: it is configured (strategies, analyzers,
+        broker, calendars, stores ...) as usual, but without datas. For each
+        symbol the data is created with::
+
+          datafactory(dataname=symbol, **datakwargs)
+
+        and added with the symbol as name. ``datafactory`` is usually a data
+        feed class like ``GenericCSVData`` (in which case the symbol is the
+        name of the file) but can be any callable.
+
+        The symbols are run in a pool of ``maxcpus`` processes (``None`` uses
+        all cores and ``1`` runs everything in the current process). Each
+        worker receives the template once and reuses it (with its stores and
+        calendars) for all the symbols it runs, ``chunksize`` symbols at a
+        time. Only the analyses go back to the main process.
+
+        An exception during the run of a symbol does not stop the scan. It is
+        reported in the ``error`` attribute of the result of the symbol
+
+        If ``callback`` is given, it is called with each ``ScanResult`` as it
+        arrives. If ``outfile`` (a name or file-like object) is given, the
+        results are written to it as a table (csv format) with a row per
+        symbol and strategy, see ``scantable``
+        '''
+        datakwargs = datakwargs or dict()
+        # strategies add timers during a run: each symbol starts with these
+        self._scantimers = self._pretimers[:]
+        if maxcpus == 1:
+            results = (self._scanone(symbol, datafactory, datakwargs)
+                       for symbol in symbols)
+            pool = None
+        else:
+            pool = multiprocessing.Pool(
+                maxcpus, initializer=_scan_init,
+                initargs=(self, datafactory, datakwargs))
+            results = pool.imap(_scan_worker, symbols, chunksize)
+
+        scanresults = list()
+        try:
+            for result in results:
+                scanresults.append(result)
+                if callback is not None:
+                    callback(result)
+
+        except BaseException:  # callback error, KeyboardInterrupt ...
+            if pool is not None:
+                pool.terminate()  # do not run the remaining symbols
+            raise
+
+        else:
+            if pool is not None:
+                pool.close()
+
+        finally:
+            if pool is not None:
+                pool.join()
+
+        if outfile is not None:
+            self.scantable(scanresults, outfile)
+
+        return scanresults
+
+    def _scanreset(self):
+        self.datas = list()
+        self.datasbyname = collections.OrderedDict()
+        self.feeds = list()
+        self._dolive = self._doreplay = False
+        self._timeline = None
+        self.runstrats = list()
+        self._pretimers = self._scantimers[:]
+
+    def _scanone(self, symbol, datafactory, datakwargs):
+        # run with the data of the symbol as the only data
+        self._scanreset()
+        strats = self.strats[:]  # run may add a (signal) strategy
+        try:
+            data = datafactory(dataname=symbol, **datakwargs)
+            self.adddata(data, name=symbol)
+            analyses = list()
+            for strat in self.run():
+                analyses.append(collections.OrderedDict(
+                    (name, analyzer.get_analysis())
+                    for name, analyzer in strat.analyzers.getitems()))
+
+        except Exception as e:
+            return ScanResult(symbol, error='%s: %s' % (type(e).__name__, e))
+
+        finally:
+            self.strats = strats
+            self._scanreset()  # the results are in the analyses
+
+        return ScanResult(symbol, analyses=analyses)
+
+    @staticmethod
+    def scantable(scanresults, outfile):
+        '''Writes the ``scanresults`` (``ScanResult`` instances) to
+        ``outfile`` (a name or file-like object) in csv format with a row per
+        symbol and strategy. The analyses are flattened: nested keys are
+        joined with ``_`` and prefixed by the name of the analyzer'''
+        def flatten(prefix, analysis, row):
+            for key, value in analysis.items():
+                name = '%s_%s' % (prefix, key)
+                if isinstance(value, dict):
+                    flatten(name, value, row)
+                else:
+                    row[name] = value
+
+        rows = list()
+        fields = ['symbol', 'strategy', 'error']
+        known = set(fields)
+        for result in scanresults:
+            entries = enumerate(result.analyses) if result.analyses else [
+                (None, dict())]
+            for i, analyses in entries:
+                row = dict(symbol=result.symbol, strategy=i,
+                           error=result.error)
+                for name, analysis in analyses.items():
+                    flatten(name, analysis, row)
+
+                for field in row:
+                    if field not in known:
+                        known.add(field)
+                        fields.append(field)
+
+                rows.append(row)
+
+        if isinstance(outfile, string_types):
+            fh = io.open(outfile, 'w', newline='')
+        else:
+            fh = outfile
+
+        writer = csv.DictWriter(fh, fields)
+        writer.writeheader()
+        writer.writerows(rows)
+        if fh is not outfile:
+            fh.close()
+
     def _init_stcount(self):
         self.stcount = itertools.count(0)
 
@@ -1184,6 +1479,12 @@ class Cerebro(with_metaclass(MetaParams, object)):
         for orders, onotify in self._ohistory:
             self._broker.add_order_history(orders, onotify)
 
+        retention = None
+        if self._retention is not None:
+            retention = Retention(**self._retention)
+            retention.start()
+            self._broker.set_retention(retention)
+
         self._broker.start()
 
         for feed in self.feeds:
@@ -1222,6 +1523,8 @@ class Cerebro(with_metaclass(MetaParams, object)):
                 strat._oldsync = True  # tell strategy to use old clock update
             if self.p.tradehistory:
                 strat.set_tradehistory()
+            if retention is not None:
+                strat.set_retention(retention)
             runstrats.append(strat)
 
         tz = self.p.tz
@@ -1274,17 +1577,19 @@ class Cerebro(with_metaclass(MetaParams, object)):
             for writer in self.runwriters:
                 writer.start()
 
-            # Prepare timers
+            # Prepare timers. Kept as heaps of (nextdue, tid, timer), sorted
+            # by tid with no due time is already a valid heap
             self._timers = []
             self._timerscheat = []
             for timer in self._pretimers:
                 # preprocess tzdata if needed
                 timer.start(self.datas[0])
 
+                entry = (float('-inf'), timer.p.tid, timer)
                 if timer.params.cheat:
-                    self._timerscheat.append(timer)
+                    self._timerscheat.append(entry)
                 else:
-                    self._timers.append(timer)
+                    self._timers.append(entry)
 
             if self._dopreload and self._dorunonce:
                 if self.p.oldsync:
@@ -1302,6 +1607,9 @@ class Cerebro(with_metaclass(MetaParams, object)):
 
         self._broker.stop()
 
+        if retention is not None:
+            retention.stop()
+
         if not predata:
             for data in self.datas:
                 data.stop()
@@ -1318,7 +1626,10 @@ class Cerebro(with_metaclass(MetaParams, object)):
             # Results can be optimized
             results = list()
             for strat in runstrats:
-                for a in strat.analyzers:
+                analyzers = list(strat.analyzers)
+                while analyzers:  # children (PyFolio) included
+                    a = analyzers.pop()
+                    analyzers.extend(a._children)
                     a.strategy = None
                     a._parent = None
                     for attrname in dir(a):
@@ -1511,15 +1822,28 @@ class Cerebro(with_metaclass(MetaParams, object)):
         clonecount = sum(d._clone for d in datas)
         ldatas = len(datas)
         ldatas_noclones = ldatas - clonecount
+        # only these can report live data (clones included to be on the safe
+        # side) and need to be scanned for it
+        livedatas = [d for d in datas if d._clone or d.islive()]
+
+        # Datas which have been rewound with a bar for a later time are kept
+        # in a heap of (datetime, index) and are not touched again until the
+        # global time reaches them. Resampled datas do not take part in the
+        # calculation of dt0 (unless all are resampled) and are not parked
+        pending = []
+        ispending = [False] * ldatas
+        canpend = [onlyresample or noresample or i not in rsonly
+                   for i in range(ldatas)]
+
         lastqcheck = False
         dt0 = date2num(datetime.datetime.max) - 2  # default at max
         while d0ret or d0ret is None:
             # if any has live data in the buffer, no data will wait anything
-            newqcheck = not any(d.haslivedata() for d in datas)
+            newqcheck = not any(d.haslivedata() for d in livedatas)
             if not newqcheck:
                 # If no data has reached the live status or all, wait for
                 # the next incoming data
-                livecount = sum(d._laststatus == d.LIVE for d in datas)
+                livecount = sum(d._laststatus == d.LIVE for d in livedatas)
                 newqcheck = not livecount or livecount == ldatas_noclones
 
             lastret = False
@@ -1533,37 +1857,51 @@ class Cerebro(with_metaclass(MetaParams, object)):
                 return
 
             # record starting time and tell feeds to discount the elapsed time
-            # from the qcheck value
-            drets = []
+            # from the qcheck value. Parked datas would only deliver again
+            # their already seen bar and are skipped
+            drets = []  # (index, ret) of the datas which were moved
             qstart = datetime.datetime.utcnow()
-            for d in datas:
+            for i, d in enumerate(datas):
+                if ispending[i]:
+                    continue
                 qlapse = datetime.datetime.utcnow() - qstart
                 d.do_qcheck(newqcheck, qlapse.total_seconds())
-                drets.append(d.next(ticks=False))
+                drets.append((i, d.next(ticks=False)))
 
-            d0ret = any((dret for dret in drets))
-            if not d0ret and any((dret is None for dret in drets)):
+            d0ret = bool(pending) or any((dret for _, dret in drets))
+            if not d0ret and any((dret is None for _, dret in drets)):
                 d0ret = None
 
             if d0ret:
-                dts = []
-                for i, ret in enumerate(drets):
-                    dts.append(datas[i].datetime[0] if ret else None)
+                dts = []  # (index, datetime) of the datas delivering a bar
+                for i, ret in drets:
+                    if ret:
+                        dts.append((i, datas[i].datetime[0]))
 
                 # Get index to minimum datetime
-                if onlyresample or noresample:
-                    dt0 = min((d for d in dts if d is not None))
-                else:
-                    dt0 = min((d for i, d in enumerate(dts)
-                               if d is not None and i not in rsonly))
-
-                dmaster = datas[dts.index(dt0)]  # and timemaster
+                dtsmin = [dt for i, dt in dts if canpend[i]]
+                if pending:
+                    dtsmin.append(pending[0][0])
+                if onlyresample or noresample or not dtsmin:
+                    dtsmin += [dt for i, dt in dts if not canpend[i]]
+                dt0 = min(dtsmin)
+
+                # the parked datas which have reached dt0 deliver again
+                while pending and pending[0][0] <= dt0:
+                    dti, i = heapq.heappop(pending)
+                    ispending[i] = False
+                    datas[i].next(ticks=False)  # moves into the parked bar
+                    dts.append((i, dti))
+
+                dts.sort()  # in the order of the datas
+                imaster = min(i for i, dti in dts if dti == dt0)
+                dmaster = datas[imaster]  # and timemaster
                 self._dtmaster = dmaster.num2date(dt0)
                 self._udtmaster = num2date(dt0)
 
                 # slen = len(runstrats[0])
                 # Try to get something for those that didn't return
-                for i, ret in enumerate(drets):
+                for i, ret in drets:
                     if ret:  # dts already contains a valid datetime for this i
                         continue
 
@@ -1571,26 +1909,28 @@ class Cerebro(with_metaclass(MetaParams, object)):
                     d = datas[i]
                     d._check(forcedata=dmaster)  # check to force output
                     if d.next(datamaster=dmaster, ticks=False):  # retry
-                        dts[i] = d.datetime[0]  # good -> store
+                        dts.append((i, d.datetime[0]))  # good -> store
                         # self._plotfillers2[i].append(slen)  # mark as fill
                     else:
                         # self._plotfillers[i].append(slen)  # mark as empty
                         pass
 
                 # make sure only those at dmaster level end up delivering
-                for i, dti in enumerate(dts):
-                    if dti is not None:
-                        di = datas[i]
-                        rpi = False and di.replaying   # to check behavior
-                        if dti > dt0:
-                            if not rpi:  # must see all ticks ...
-                                di.rewind()  # cannot deliver yet
-                            # self._plotfillers[i].append(slen)
-                        elif not di.replaying:
-                            # Replay forces tick fill, else force here
-                            di._tick_fill(force=True)
+                for i, dti in dts:
+                    di = datas[i]
+                    rpi = False and di.replaying   # to check behavior
+                    if dti > dt0:
+                        if not rpi:  # must see all ticks ...
+                            di.rewind()  # cannot deliver yet
+                            if canpend[i]:  # park it until dt0 reaches it
+                                ispending[i] = True
+                                heapq.heappush(pending, (dti, i))
+                        # self._plotfillers[i].append(slen)
+                    elif not di.replaying:
+                        # Replay forces tick fill, else force here
+                        di._tick_fill(force=True)
 
-                        # self._plotfillers2[i].append(slen)  # mark as fill
+                    # self._plotfillers2[i].append(slen)  # mark as fill
 
             elif d0ret is None:
                 # meant for things like live feeds which may not produce a bar
@@ -1656,26 +1996,17 @@ class Cerebro(with_metaclass(MetaParams, object)):
         # has not moved forward all datas/indicators/observers that
         # were homed before calling once, Hence no "need" to do it
         # here again, because pointers are at 0
-        datas = sorted(self.datas,
-                       key=lambda x: (x._timeframe, x._compression))
-
-        while True:
-            # Check next incoming date in the datas
-            dts = [d.advance_peek() for d in datas]
-            dt0 = min(dts)
-            if dt0 == float('inf'):
-                break  # no data delivers anything
+        datas = self._rundatas()
+        for strat in runstrats:
+            strat._onceclocks(datas)
 
+        # The datas are preloaded, the alignment of the datas has been
+        # precalculated and can be simply replayed
+        for dt0, dadv in self._gettimeline(datas):
             # Timemaster if needed be
-            # dmaster = datas[dts.index(dt0)]  # and timemaster
-            slen = len(runstrats[0])
-            for i, dti in enumerate(dts):
-                if dti <= dt0:
-                    datas[i].advance()
-                    # self._plotfillers2[i].append(slen)  # mark as fill
-                else:
-                    # self._plotfillers[i].append(slen)
-                    pass
+            # dmaster = datas[dadv[0]]  # and timemaster
+            for i in dadv:
+                datas[i].advance()
 
             self._check_timers(runstrats, dt0, cheat=True)
 
@@ -1692,16 +2023,40 @@ class Cerebro(with_metaclass(MetaParams, object)):
             self._check_timers(runstrats, dt0, cheat=False)
 
             for strat in runstrats:
-                strat._oncepost(dt0)
+                strat._oncepost(dt0, dadv)
                 if self._event_stop:  # stop if requested
                     return
 
                 self._next_writers(runstrats)
 
+    def _rundatas(self):
+        '''Returns the datas in the order used to run them'''
+        return sorted(self.datas,
+                      key=lambda x: (x._timeframe, x._compression))
+
+    def _gettimeline(self, datas):
+        '''Returns the ``Timeline`` of the preloaded ``datas``, reusing the
+        last calculated one if the datas have not changed'''
+        timeline = self._timeline
+        if timeline is None or timeline.key != Timeline.getkey(datas):
+            self._timeline = timeline = Timeline(datas)
+
+        return timeline
+
     def _check_timers(self, runstrats, dt0, cheat=False):
         timers = self._timers if not cheat else self._timerscheat
-        for t in timers:
-            if not t.check(dt0):
+        if not timers or timers[0][0] > dt0:
+            return  # nothing is due
+
+        due = []
+        while timers and timers[0][0] <= dt0:
+            due.append(heapq.heappop(timers))
+
+        due.sort(key=operator.itemgetter(1))  # keep the order of addition
+        for _, tid, t in due:
+            ret = t.check(dt0)
+            heapq.heappush(timers, (t.nextdue(dt0), tid, t))
+            if not ret:
                 continue
 
             t.params.owner.notify_timer(t, t.lastwhen, *t.args, **t.kwargs)
@@ -23,7 +23,7 @@ from __future__ import (absolute_import, division, print_function,
 
 import datetime
 
-from .utils.py3 import with_metaclass
+from .utils.py3 import map, with_metaclass, zip
 from .metabase import MetaParams
 
 
@@ -305,6 +305,105 @@ class CommInfoBase(with_metaclass(MetaParams)):
         return days * self._creditrate * abs(size) * price
 
 
+    # Batch versions of the methods above. They take sequences (of the same
+    # length) and return a list with the result for each element. Subclasses
+    # overriding the scalar methods are honored by falling back to them
+    def _overridden(self, *names):
+        '''Returns ``True`` if any of the methods ``names`` has been overridden
+        by a subclass'''
+        cls = self.__class__
+        for name in names:
+            func = getattr(cls, name)
+            if getattr(func, '__func__', func) is not _CommInfoMethods[name]:
+                return True
+
+        return False
+
+    def get_margins(self, prices):
+        '''Batch version of ``get_margin``'''
+        if self._overridden('get_margin'):
+            return [self.get_margin(price) for price in prices]
+
+        automargin = self.p.automargin
+        if not automargin:
+            margin = self.p.margin
+            return [margin for price in prices]
+
+        factor = self.p.mult if automargin < 0 else automargin
+        return [price * factor for price in prices]
+
+    def getvaluesizes(self, sizes, prices):
+        '''Batch version of ``getvaluesize``'''
+        if self._overridden('getvaluesize'):
+            return list(map(self.getvaluesize, sizes, prices))
+
+        if not self._stocklike:
+            margins = self.get_margins(prices)
+            return [abs(size) * margin for size, margin in zip(sizes, margins)]
+
+        return [size * price for size, price in zip(sizes, prices)]
+
+    def getvalues(self, positions, prices):
+        '''Batch version of ``getvalue``'''
+        if self._overridden('getvalue'):
+            return list(map(self.getvalue, positions, prices))
+
+        if not self._stocklike:
+            margins = self.get_margins(prices)
+            return [abs(pos.size) * margin
+                    for pos, margin in zip(positions, margins)]
+
+        values = []
+        for pos, price in zip(positions, prices):
+            size = pos.size
+            if size >= 0:
+                values.append(size * price)
+            else:
+                # short: original value plus increase as price goes down
+                value = pos.price * size
+                value += (pos.price - price) * size
+                values.append(value)
+
+        return values
+
+    def profitandlosses(self, sizes, prices, newprices):
+        '''Batch version of ``profitandloss``'''
+        if self._overridden('profitandloss'):
+            return list(map(self.profitandloss, sizes, prices, newprices))
+
+        mult = self.p.mult
+        return [size * (newprice - price) * mult
+                for size, price, newprice in zip(sizes, prices, newprices)]
+
+    def cashadjusts(self, sizes, prices, newprices):
+        '''Batch version of ``cashadjust``'''
+        if self._overridden('cashadjust'):
+            return list(map(self.cashadjust, sizes, prices, newprices))
+
+        if self._stocklike:
+            return [0.0 for size in sizes]
+
+        mult = self.p.mult
+        return [size * (newprice - price) * mult
+                for size, price, newprice in zip(sizes, prices, newprices)]
+
+    def get_credit_interests(self, datas, positions, dts):
+        '''Batch version of ``get_credit_interest``. Without interest (and
+        no overridden calculation) nothing is due and all values are ``0.0``
+        '''
+        if self._overridden('get_credit_interest', '_get_credit_interest'):
+            return list(map(self.get_credit_interest, datas, positions, dts))
+
+        if not self.p.interest:
+            return [0.0 for pos in positions]
+
+        return [self.get_credit_interest(data, pos, dt)
+                for data, pos, dt in zip(datas, positions, dts)]
+
+
+_CommInfoMethods = dict(CommInfoBase.__dict__)
+
+
 class CommissionInfo(CommInfoBase):
     '''Base Class for the actual Commission Schemes.
 
@@ -1,2 +1,3 @@
+from .driver import DriverBase, DriverEvent
 from .breakout import BreakoutDriver
-from .reversal import ReversalDriver
\ No newline at end of file
+from .reversal import ReversalDriver
@@ -1,9 +1,18 @@
-from transitions import Machine
 import numpy as np
 
 import backtrader as bt
+from .driver import DriverBase
+
+class BreakoutDriver(DriverBase):
+    __slots__ = (
+        "entry_signal",
+        "protect_price",
+        "close_signal",
+        "entry_order",
+        "protect_order",
+        "close_order",
+    )
 
-class BreakoutDriver(object):
     states = [
         "idle",
         "entry",
@@ -15,73 +24,67 @@ class BreakoutDriver(object):
     ]
     initial_state = "idle"
 
-    def __init__(self, strategy):
-        self.strategy = strategy
-
-        self.entry_signal = np.NaN
-        self.protect_price = np.NaN
-        self.close_signal = np.NaN
-
-        self.entry_order = None
-        self.protect_order = None
-        self.close_order = None
-
-        self.machine = Machine(model=self,
-                               states=BreakoutDriver.states,
-                               initial=BreakoutDriver.initial_state,
-                               send_event=True,
-                               ignore_invalid_triggers=True)
-
-        # order is trigger, source, dest
+    # order is trigger, source, dest
+    transitions = [
         # from idle
-        self.machine.add_transition("next", "idle", "entry",
-                                    conditions=["is_entry_signal"],
-                                    after=["send_entry_order"])
+        dict(trigger="next", source="idle", dest="entry",
+             conditions=["is_entry_signal"],
+             after=["send_entry_order"]),
 
         # from entry
-        self.machine.add_transition("notify_order", "entry", "start_protect",
-                                    conditions=[
-                                        "is_entry_order_completed",
-                                    ],
-                                    after=["send_protect_order"])
-        self.machine.add_transition("stop", "entry", "cancel_entry",
-                                    after=["cancel_entry_order"])
+        dict(trigger="notify_order", source="entry", dest="start_protect",
+             conditions=["is_entry_order_completed"],
+             after=["send_protect_order"]),
+        dict(trigger="stop", source="entry", dest="cancel_entry",
+             after=["cancel_entry_order"]),
 
         # from cancel_entry
-        self.machine.add_transition("notify_order", "cancel_entry", "idle",
-                                    conditions=["is_entry_order_cancelled"])
+        dict(trigger="notify_order", source="cancel_entry", dest="idle",
+             conditions=["is_entry_order_cancelled"]),
 
         # from start_protect
-        self.machine.add_transition("notify_order", "start_protect", "idle",
-                                    conditions=["is_protect_order_completed"])
-        self.machine.add_transition("stop", "start_protect", "cancel_protect",
-                                    after=["cancel_protect_order"])
-        self.machine.add_transition("notify_order", "start_protect", "protect",
-                                    conditions=["is_protect_order_accepted"])
+        dict(trigger="notify_order", source="start_protect", dest="idle",
+             conditions=["is_protect_order_completed"]),
+        dict(trigger="stop", source="start_protect", dest="cancel_protect",
+             after=["cancel_protect_order"]),
+        dict(trigger="notify_order", source="start_protect", dest="protect",
+             conditions=["is_protect_order_accepted"]),
 
         # from protect
-        self.machine.add_transition("notify_order", "protect", "start_protect",
-                                    conditions=["is_protect_order_cancelled"],
-                                    after=["send_protect_order"])
-        self.machine.add_transition("notify_order", "protect", "idle",
-                                    conditions=["is_protect_order_completed"])
-        self.machine.add_transition("next", "protect", "cancel_protect",
-                                    conditions=["is_close_signal"],
-                                    after=["cancel_protect_order"])
-        self.machine.add_transition("next", "protect", "protect",
-                                    conditions=["is_protect_price_changed"],
-                                    after=["cancel_protect_order"])
+        dict(trigger="notify_order", source="protect", dest="start_protect",
+             conditions=["is_protect_order_cancelled"],
+             after=["send_protect_order"]),
+        dict(trigger="notify_order", source="protect", dest="idle",
+             conditions=["is_protect_order_completed"]),
+        dict(trigger="next", source="protect", dest="cancel_protect",
+             conditions=["is_close_signal"],
+             after=["cancel_protect_order"]),
+        dict(trigger="next", source="protect", dest="protect",
+             conditions=["is_protect_price_changed"],
+             after=["amend_protect_order"]),
 
         # from cancel_protect
-        self.machine.add_transition("notify_order", "cancel_protect", "close",
-                                    conditions=["is_protect_order_cancelled"],
-                                    after=["send_close_order"])
-        self.machine.add_transition("notify_order", "cancel_protect", "idle",
-                                    conditions=["is_protect_order_completed"])
+        dict(trigger="notify_order", source="cancel_protect", dest="close",
+             conditions=["is_protect_order_cancelled"],
+             after=["send_close_order"]),
+        dict(trigger="notify_order", source="cancel_protect", dest="idle",
+             conditions=["is_protect_order_completed"]),
 
         # from close
-        self.machine.add_transition("notify_order", "close", "idle",
-                                    conditions=["is_close_order_completed"])
+        dict(trigger="notify_order", source="close", dest="idle",
+             conditions=["is_close_order_completed"]),
+    ]
+
+    def __init__(self, strategy):
+        super(BreakoutDriver, self).__init__(strategy)
+
+        self.entry_signal = np.NaN
+        self.protect_price = np.NaN
+        self.close_signal = np.NaN
+
+        self.entry_order = None
+        self.protect_order = None
+        self.close_order = None
 
     @staticmethod
     def check_order_status(event, exp_order, status):
@@ -136,6 +139,14 @@ class BreakoutDriver(object):
     def cancel_protect_order(self, _):
         self.strategy.cancel(self.protect_order)
 
+    def amend_protect_order(self, _):
+        # move the stop in place, cancelling (and resending) it only if the
+        # broker cannot amend orders
+        if (self.protect_order is None or
+                not self.strategy.amend(self.protect_order,
+                                        price=self.protect_price)):
+            self.strategy.cancel(self.protect_order)
+
     def is_protect_order_completed(self, event):
         return self.check_order_status(event,
                                        self.protect_order,
@@ -0,0 +1,130 @@
+from backtrader.utils.py3 import string_types, with_metaclass
+
+
+class DriverEvent(object):
+    """
+    What the conditions and callbacks of a transition receive: the driver
+    and the trigger with the arguments it was called with
+    """
+    __slots__ = ("driver", "trigger", "args", "kwargs")
+
+    def __init__(self, driver, trigger, args, kwargs):
+        self.driver = driver
+        self.trigger = trigger
+        self.args = args
+        self.kwargs = kwargs
+
+
+class MetaDriver(type):
+    """
+    Compiles the declared ``transitions`` of each driver class into a
+    dispatch table (trigger -> state -> candidate transitions) with the
+    conditions and callbacks already resolved to functions, and adds a
+    method to the class for each trigger
+    """
+    def __init__(cls, name, bases, dct):
+        super(MetaDriver, cls).__init__(name, bases, dct)
+
+        states = cls.states
+        tables = dict()
+        for transition in cls.transitions:
+            trigger = transition["trigger"]
+            source, dest = transition["source"], transition["dest"]
+
+            if source == "*":
+                sources = states
+            elif isinstance(source, string_types):
+                sources = [source]
+            else:
+                sources = source
+
+            for state in list(sources) + [dest]:
+                if state not in states:
+                    raise ValueError("%s: unknown state %r in transition %r"
+                                     % (name, state, transition))
+
+            # (function, expected result): unless expects False
+            checks = tuple(
+                [(cls._resolve(c), True)
+                 for c in transition.get("conditions", [])] +
+                [(cls._resolve(c), False)
+                 for c in transition.get("unless", [])])
+            after = tuple(cls._resolve(c) for c in transition.get("after", []))
+
+            table = tables.setdefault(trigger, dict())
+            for state in sources:
+                table.setdefault(state, []).append((dest, checks, after))
+
+        cls._tables = tables
+        for trigger, table in tables.items():
+            # triggers defined by the class itself take precedence
+            if trigger not in dct:
+                setattr(cls, trigger, cls._trigger(trigger, table))
+
+    def _resolve(cls, callback):
+        if isinstance(callback, string_types):
+            return getattr(cls, callback)
+        return callback
+
+    @staticmethod
+    def _trigger(trigger, table):
+        def fire(self, *args, **kwargs):
+            candidates = table.get(self.state)
+            if not candidates:
+                return False  # nothing to do in this state
+
+            event = DriverEvent(self, trigger, args, kwargs)
+            for dest, checks, after in candidates:
+                for check, expected in checks:
+                    if check(self, event) != expected:
+                        break
+                else:
+                    self.state = dest
+                    for callback in after:
+                        callback(self, event)
+                    return True
+
+            return False
+
+        fire.__name__ = str(trigger)
+        return fire
+
+
+class DriverBase(with_metaclass(MetaDriver, object)):
+    """
+    Base class for drivers: state machines which take care of the orders of
+    a strategy.
+
+    Subclasses declare ``states``, the ``initial_state`` and the
+    ``transitions``, as dictionaries with the keys
+
+      - ``trigger``: name of the method which fires the transition
+      - ``source``: state (list of states or ``*`` for all) from which the
+        transition is possible
+      - ``dest``: state after the transition
+      - ``conditions``: (optional) names of the methods which must return
+        ``True``
+      - ``unless``: (optional) names of the methods which must return
+        ``False``
+      - ``after``: (optional) names of the methods to call after the change
+        of state
+
+    Conditions and callbacks are called with a ``DriverEvent`` which carries
+    the arguments given to the trigger. The transitions of the current state
+    are tried in declaration order and the first one whose conditions are met
+    is executed. Calling a trigger returns ``True`` if a transition took place
+    and ``False`` otherwise (there are no invalid triggers)
+    """
+    __slots__ = ("strategy", "state")
+
+    states = []
+    initial_state = None
+    transitions = []
+
+    def __init__(self, strategy):
+        self.strategy = strategy
+        self.state = self.initial_state
+
+    def trigger(self, trigger, *args, **kwargs):
+        """Fires the trigger named ``trigger``"""
+        return getattr(self, trigger)(*args, **kwargs)
@@ -1,10 +1,20 @@
-from transitions import Machine
 import numpy as np
 import pandas as pd
 
 import backtrader as bt
+from .driver import DriverBase
+
+class ReversalDriver(DriverBase):
+    __slots__ = (
+        "entry_signal",
+        "entry_price",
+        "protect_price",
+        "close_signal",
+        "entry_order",
+        "protect_order",
+        "close_order",
+    )
 
-class ReversalDriver(object):
     states = [
         "idle",
         "start_entry",
@@ -17,98 +27,91 @@ class ReversalDriver(object):
     ]
     initial_state = "idle"
 
-    def __init__(self, strategy):
-        self.strategy = strategy
-
-        self.entry_signal = np.NaN
-        self.entry_price = np.NaN
-        self.protect_price = np.NaN
-        self.close_signal = np.NaN
-
-        self.entry_order = None
-        self.protect_order = None
-        self.close_order = None
-
-        self.machine = Machine(model=self,
-                               states=ReversalDriver.states,
-                               initial=ReversalDriver.initial_state,
-                               send_event=True,
-                               ignore_invalid_triggers=True)
-
-        # order is trigger, source, dest
+    # order is trigger, source, dest
+    transitions = [
         # from idle
-        self.machine.add_transition("next", "idle", "start_entry",
-                                    conditions=["is_entry_signal"],
-                                    after=["send_entry_order"])
+        dict(trigger="next", source="idle", dest="start_entry",
+             conditions=["is_entry_signal"],
+             after=["send_entry_order"]),
 
         # from start_entry
-        self.machine.add_transition("notify_order",
-                                    "start_entry",
-                                    "start_protect",
-                                    conditions=["is_entry_order_completed"],
-                                    after=["send_protect_order"])
-        self.machine.add_transition("stop", "start_entry", "cancel_entry",
-                                    after=["cancel_entry_order"])
-        self.machine.add_transition("notify_order", "start_entry", "entry",
-                                    conditions=["is_entry_order_accepted"])
+        dict(trigger="notify_order", source="start_entry",
+             dest="start_protect",
+             conditions=["is_entry_order_completed"],
+             after=["send_protect_order"]),
+        dict(trigger="stop", source="start_entry", dest="cancel_entry",
+             after=["cancel_entry_order"]),
+        dict(trigger="notify_order", source="start_entry", dest="entry",
+             conditions=["is_entry_order_accepted"]),
 
         # from entry
-        self.machine.add_transition("notify_order", "entry", "start_entry",
-                                    conditions=["is_entry_order_cancelled"],
-                                    after=["send_entry_order"])
-        self.machine.add_transition("notify_order", "entry", "start_protect",
-                                    conditions=["is_entry_order_completed"],
-                                    after=["send_protect_order"])
-        self.machine.add_transition("next", "entry", "cancel_entry",
-                                    conditions=["is_close_signal"],
-                                    after=["cancel_entry_order"])
-        self.machine.add_transition("next", "entry", "cancel_entry",
-                                    unless=["is_entry_signal"],
-                                    after=["cancel_entry_order"])
-        self.machine.add_transition("next", "entry", "entry",
-                                    conditions=["is_entry_price_changed",
-                                                "is_entry_signal"],
-                                    after=["cancel_entry_order"])
+        dict(trigger="notify_order", source="entry", dest="start_entry",
+             conditions=["is_entry_order_cancelled"],
+             after=["send_entry_order"]),
+        dict(trigger="notify_order", source="entry", dest="start_protect",
+             conditions=["is_entry_order_completed"],
+             after=["send_protect_order"]),
+        dict(trigger="next", source="entry", dest="cancel_entry",
+             conditions=["is_close_signal"],
+             after=["cancel_entry_order"]),
+        dict(trigger="next", source="entry", dest="cancel_entry",
+             unless=["is_entry_signal"],
+             after=["cancel_entry_order"]),
+        dict(trigger="next", source="entry", dest="entry",
+             conditions=["is_entry_price_changed", "is_entry_signal"],
+             after=["amend_entry_order"]),
 
         # from cancel_entry
-        self.machine.add_transition("notify_order", "cancel_entry", "idle",
-                                    conditions=["is_entry_order_cancelled"])
-        self.machine.add_transition("notify_order",
-                                    "cancel_entry",
-                                    "close",
-                                    conditions=["is_entry_order_completed"],
-                                    after=["send_close_order"])
+        dict(trigger="notify_order", source="cancel_entry", dest="idle",
+             conditions=["is_entry_order_cancelled"]),
+        dict(trigger="notify_order", source="cancel_entry", dest="close",
+             conditions=["is_entry_order_completed"],
+             after=["send_close_order"]),
+
         # from start_protect
-        self.machine.add_transition("notify_order", "start_protect", "idle",
-                                    conditions=["is_protect_order_completed"])
-        self.machine.add_transition("stop", "start_protect", "cancel_protect",
-                                    after=["cancel_protect_order"])
-        self.machine.add_transition("notify_order", "start_protect", "protect",
-                                    conditions=["is_protect_order_accepted"])
+        dict(trigger="notify_order", source="start_protect", dest="idle",
+             conditions=["is_protect_order_completed"]),
+        dict(trigger="stop", source="start_protect", dest="cancel_protect",
+             after=["cancel_protect_order"]),
+        dict(trigger="notify_order", source="start_protect", dest="protect",
+             conditions=["is_protect_order_accepted"]),
 
         # from protect
-        self.machine.add_transition("notify_order", "protect", "start_protect",
-                                    conditions=["is_protect_order_cancelled"],
-                                    after=["send_protect_order"])
-        self.machine.add_transition("notify_order", "protect", "idle",
-                                    conditions=["is_protect_order_completed"])
-        self.machine.add_transition("next", "protect", "cancel_protect",
-                                    conditions=["is_close_signal"],
-                                    after=["cancel_protect_order"])
-        self.machine.add_transition("next", "protect", "protect",
-                                    conditions=["is_protect_price_changed"],
-                                    after=["cancel_protect_order"])
+        dict(trigger="notify_order", source="protect", dest="start_protect",
+             conditions=["is_protect_order_cancelled"],
+             after=["send_protect_order"]),
+        dict(trigger="notify_order", source="protect", dest="idle",
+             conditions=["is_protect_order_completed"]),
+        dict(trigger="next", source="protect", dest="cancel_protect",
+             conditions=["is_close_signal"],
+             after=["cancel_protect_order"]),
+        dict(trigger="next", source="protect", dest="protect",
+             conditions=["is_protect_price_changed"],
+             after=["amend_protect_order"]),
 
         # from cancel_protect
-        self.machine.add_transition("notify_order", "cancel_protect", "close",
-                                    conditions=["is_protect_order_cancelled"],
-                                    after=["send_close_order"])
-        self.machine.add_transition("notify_order", "cancel_protect", "idle",
-                                    conditions=["is_protect_order_completed"])
+        dict(trigger="notify_order", source="cancel_protect", dest="close",
+             conditions=["is_protect_order_cancelled"],
+             after=["send_close_order"]),
+        dict(trigger="notify_order", source="cancel_protect", dest="idle",
+             conditions=["is_protect_order_completed"]),
 
         # from close
-        self.machine.add_transition("notify_order", "close", "idle",
-                                    conditions=["is_close_order_completed"])
+        dict(trigger="notify_order", source="close", dest="idle",
+             conditions=["is_close_order_completed"]),
+    ]
+
+    def __init__(self, strategy):
+        super(ReversalDriver, self).__init__(strategy)
+
+        self.entry_signal = np.NaN
+        self.entry_price = np.NaN
+        self.protect_price = np.NaN
+        self.close_signal = np.NaN
+
+        self.entry_order = None
+        self.protect_order = None
+        self.close_order = None
 
     @staticmethod
     def check_order_status(event, exp_order, status):
@@ -144,6 +147,13 @@ class ReversalDriver(object):
     def cancel_entry_order(self, _):
         self.strategy.cancel(self.entry_order)
 
+    def amend_entry_order(self, _):
+        # a change of direction needs a new order (sent after the cancel)
+        order = self.entry_order
+        if (order is None or order.isbuy() != (self.entry_signal > 0) or
+                not self.strategy.amend(order, price=self.entry_price)):
+            self.strategy.cancel(order)
+
     def is_entry_order_accepted(self, event):
         return self.check_order_status(event,
                                        self.entry_order,
@@ -181,6 +191,14 @@ class ReversalDriver(object):
     def cancel_protect_order(self, _):
         self.strategy.cancel(self.protect_order)
 
+    def amend_protect_order(self, _):
+        # move the stop in place, cancelling (and resending) it only if the
+        # broker cannot amend orders
+        if (self.protect_order is None or
+                not self.strategy.amend(self.protect_order,
+                                        price=self.protect_price)):
+            self.strategy.cancel(self.protect_order)
+
     def is_protect_order_completed(self, event):
         return self.check_order_status(event,
                                        self.protect_order,
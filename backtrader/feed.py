@@ -195,7 +195,11 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         if cal is None:
             self._calendar = self._env._tradingcal
         elif isinstance(cal, string_types):
-            self._calendar = PandasMarketCalendar(calendar=cal)
+            env = getattr(self, '_env', None)
+            if env is not None:  # share the calendar with other datas
+                self._calendar = env._getcalendar(cal)
+            else:
+                self._calendar = PandasMarketCalendar(calendar=cal)
 
         self._started = True
 
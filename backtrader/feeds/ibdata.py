@@ -259,6 +259,9 @@ class IBData(with_metaclass(MetaIBData, DataBase)):
         self.ib = self._store(**kwargs)
         self.precontract = self.parsecontract(self.p.dataname)
         self.pretradecontract = self.parsecontract(self.p.tradename)
+        # let the store request all contract details together at start
+        self.ib.prefetchContractDetails(self.precontract)
+        self.ib.prefetchContractDetails(self.pretradecontract)
 
     def setenvironment(self, env):
         '''Receives an environment (cerebro) and passes it over to the store it
@@ -64,3 +64,48 @@ class ADBreakout(Indicator):
             is_below_support = self.data0.close[0] < self.lines.level[-1]
             self.lines.breakout[0] = -1 if (
                     was_above_support and is_below_support) else 0
+
+    def once(self, start, end):
+        trend, ad = self.trend.array, self.ad.array
+        high, low = self.data.high.array, self.data.low.array
+        close = self.data0.close.array
+        level, breakout = self.lines.level.array, self.lines.breakout.array
+
+        for i in range(start, end):
+            if trend[i] > 0:
+                if ad[i] >= high[i]:
+                    if pd.isnull(level[i - 1]):
+                        level[i] = ad[i]
+                    else:
+                        level[i] = max(ad[i], level[i - 1])
+
+                elif trend[i - 1] <= 0:
+                    # we just flipped trends, we don't know resistance yet
+                    level[i] = np.NaN
+
+                else:
+                    level[i] = level[i - 1]
+
+                was_below_resistance = close[i - 1] < level[i - 1]
+                is_above_resistance = close[i] > level[i - 1]
+                breakout[i] = 1 if (
+                        was_below_resistance and is_above_resistance) else 0
+
+            elif trend[i] < 0:
+                if ad[i] <= low[i]:
+                    if pd.isnull(level[i - 1]):
+                        level[i] = ad[i]
+                    else:
+                        level[i] = min(ad[i], level[i - 1])
+
+                elif trend[i - 1] >= 0:
+                    # we just flipped trends, we don't know support yet
+                    level[i] = np.NaN
+
+                else:
+                    level[i] = level[i - 1]
+
+                was_above_support = close[i - 1] > level[i - 1]
+                is_below_support = close[i] < level[i - 1]
+                breakout[i] = -1 if (
+                        was_above_support and is_below_support) else 0
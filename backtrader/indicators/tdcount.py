@@ -112,3 +112,74 @@ class TDSequential(bt.Indicator):
         else:
             self.lines.shoulder[0] = self.lines.shoulder[-1]
             self.lines.reversal[0] = 0
+
+    def oncestart(self, start, end):
+        for i in range(start, end):
+            self.lines.value.array[i] = 0
+            self.lines.toe.array[i] = np.NaN
+            self.lines.shoulder.array[i] = np.NaN
+
+    def once(self, start, end):
+        base = self.td_base.array
+        high, low = self.data.high.array, self.data.low.array
+        close = self.data.close.array
+        values, reversals = self.lines.value.array, self.lines.reversal.array
+        toes, shoulders = self.lines.toe.array, self.lines.shoulder.array
+
+        shoulder_count, cap_count = self.p.shoulder_count, self.p.cap_count
+        sp = self.p.shoulder_period
+
+        for i in range(start, end):
+            # count (see _update_count) going back over the same td_base
+            tdf = base[i]
+            value = tdf
+            j = 1
+            try:
+                while base[i - j] == tdf:
+                    j += 1
+                    value += tdf
+            except IndexError:
+                # expected at the start of the backtest
+                pass
+            values[i] = value
+
+            if value == 1:
+                toes[i] = low[i]
+            elif value == -1:
+                toes[i] = high[i]
+            else:
+                toes[i] = toes[i - 1]
+
+            if value > shoulder_count:
+
+                if value >= cap_count:
+                    ei = int(shoulder_count - cap_count) + 1
+                    si = ei - sp
+                    shoulders[i] = max([high[i + k] for k in range(si, ei)])
+                else:
+                    ei = int(shoulder_count - value) + 1
+                    si = ei - sp
+                    shoulders[i] = max([high[i + k] for k in range(si, ei)]
+                                       + [shoulders[i - 1]])
+
+                reversals[i] = (1 if reversals[i - 1] == 1 else (
+                    1 if (close[i] > shoulders[i]) else 0))
+
+            elif value < -shoulder_count:
+
+                if value <= -cap_count:
+                    ei = int(shoulder_count - cap_count) + 1
+                    si = ei - sp
+                    shoulders[i] = max([low[i + k] for k in range(si, ei)])
+                else:
+                    ei = int(shoulder_count + value) + 1
+                    si = ei - sp
+                    shoulders[i] = max([low[i + k] for k in range(si, ei)]
+                                       + [shoulders[i - 1]])
+
+                reversals[i] = (-1 if reversals[i - 1] == -1 else (
+                    -1 if (close[i] < shoulders[i]) else 0))
+
+            else:
+                shoulders[i] = shoulders[i - 1]
+                reversals[i] = 0
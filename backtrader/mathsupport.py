@@ -63,3 +63,45 @@ def standarddev(x, avgx=None, bessel=False):
       A float with the standard deviation of the elements of x
     '''
     return math.sqrt(average(variance(x, avgx), bessel=bessel))
+
+
+class RunningStats(object):
+    '''Online calculation (Welford's algorithm) of the average and standard
+    deviation of a series of values, with constant memory and ``O(1)``
+    updates
+
+    The results match ``average`` and ``standarddev`` up to floating point
+    rounding
+
+    Member Attributes:
+
+      - ``count``: number of values added
+      - ``mean``: average of the values added
+    '''
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0  # sum of the squared differences to the mean
+
+    def add(self, x):
+        '''Adds a value to the series'''
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+
+    def copy(self):
+        '''Returns an independent copy of the accumulator, to for example
+        account for a provisional value'''
+        other = self.__class__()
+        other.count, other.mean, other._m2 = self.count, self.mean, self._m2
+        return other
+
+    def variance(self, bessel=False):
+        '''Returns the variance. With ``bessel`` the sum of squares is divided
+        by ``N - 1`` (Bessel's correction)'''
+        return self._m2 / (self.count - bessel)
+
+    def stddev(self, bessel=False):
+        '''Returns the standard deviation (see ``variance``)'''
+        return math.sqrt(self.variance(bessel=bessel))
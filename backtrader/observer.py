@@ -66,3 +66,30 @@ class Observer(with_metaclass(MetaObserver, ObserverBase)):
 
     def start(self):
         pass
+
+    def _stop(self):
+        self.stop()
+
+    def stop(self):
+        '''Called at the end of the run, before the ``stop`` of the strategy.
+        Observers which defer the calculation of their lines do it here'''
+        pass
+
+    def _candefer(self, deferred=None):
+        '''Returns ``True`` if the lines can be calculated at the end of the
+        run: ``deferred`` (``None`` means automatic) is not ``False``, the
+        lines keep all values (no memory saving) and no csv writer reads
+        them during the run'''
+        if deferred is not None and not deferred:
+            return False
+
+        cerebro = self._owner.cerebro
+        if self.csv and cerebro.writers_csv:
+            return False
+
+        return cerebro._exactbars < 1
+
+    @staticmethod
+    def _setline(line, values):
+        # the line has been forwarded on each next: the values fill it up
+        line.array[:len(values)] = values
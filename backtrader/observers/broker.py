@@ -21,6 +21,8 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+from array import array
+
 from .. import Observer
 
 
@@ -82,12 +84,27 @@ class Broker(Observer):
     '''This observer keeps track of the current cash amount and portfolio value in
     the broker (including the cash)
 
-    Params: None
+    Params:
+
+      - ``fund`` (default: ``None``)
+
+        See ``Value``
+
+      - ``deferred`` (default: ``None``)
+
+        Record the cash and value in arrays during the run and fill the
+        lines with them at the end of the run (before the ``stop`` of the
+        strategy). The lines carry no values during the run: set it to
+        ``False`` to read them in ``next``.
+
+        ``None`` defers when possible: not if memory saving (``exactbars``)
+        is active or a writer outputs the lines as csv during the run
     '''
     _stclock = True
 
     params = (
         ('fund', None),
+        ('deferred', None),
     )
 
     alias = ('CashValue',)
@@ -105,12 +122,28 @@ class Broker(Observer):
             self.plotlines.cash._plotskip = True
             self.plotlines.value._name = 'FundValue'
 
+        self._deferred = self._candefer(self.p.deferred)
+        if self._deferred:
+            self._values, self._cash = array(str('d')), array(str('d'))
+
     def next(self):
-        if not self._fundmode:
-            self.lines.value[0] = value = self._owner.broker.getvalue()
-            self.lines.cash[0] = self._owner.broker.getcash()
+        broker = self._owner.broker
+        if self._deferred:
+            if not self._fundmode:
+                self._values.append(broker.getvalue())
+                self._cash.append(broker.getcash())
+            else:
+                self._values.append(broker.fundvalue)
+        elif not self._fundmode:
+            self.lines.value[0] = broker.getvalue()
+            self.lines.cash[0] = broker.getcash()
         else:
-            self.lines.value[0] = self._owner.broker.fundvalue
+            self.lines.value[0] = broker.fundvalue
+
+    def stop(self):
+        if self._deferred:
+            self._setline(self.lines.value, self._values)
+            self._setline(self.lines.cash, self._cash)
 
 
 class FundValue(Observer):
@@ -21,6 +21,8 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+from array import array
+
 import backtrader as bt
 from .. import Observer
 
@@ -40,11 +42,22 @@ class DrawDown(Observer):
 
         Set it to ``True`` or ``False`` for a specific behavior
 
+      - ``deferred`` (default: ``None``)
+
+        Only record the value of the broker during the run and calculate the
+        lines in a single pass at the end of the run (before the ``stop`` of
+        the strategy). The lines carry no values during the run: set it to
+        ``False`` to read them in ``next``.
+
+        ``None`` defers when possible: not if memory saving (``exactbars``)
+        is active or a writer outputs the lines as csv during the run
+
     '''
     _stclock = True
 
     params = (
         ('fund', None),
+        ('deferred', None),
     )
 
     lines = ('drawdown', 'maxdrawdown',)
@@ -54,23 +67,54 @@ class DrawDown(Observer):
     plotlines = dict(maxdrawdown=dict(_plotskip=True,))
 
     def __init__(self):
-        kwargs = self.p._getkwargs()
-        self._dd = self._owner._addanalyzer_slave(bt.analyzers.DrawDown,
-                                                  **kwargs)
+        self._deferred = self._candefer(self.p.deferred)
+        if not self._deferred:
+            self._dd = self._owner._addanalyzer_slave(bt.analyzers.DrawDown,
+                                                      fund=self.p.fund)
+
+    def start(self):
+        if self._deferred:
+            self._values = _deferred_values(self)
 
     def next(self):
+        if self._deferred:
+            self._values.next()
+            return
+
         self.lines.drawdown[0] = self._dd.rets.drawdown  # update drawdown
         self.lines.maxdrawdown[0] = self._dd.rets.max.drawdown  # update max
 
+    def stop(self):
+        if not self._deferred:
+            return
+
+        drawdowns, maxdrawdowns = array(str('d')), array(str('d'))
+        maxdd = 0.0
+        for drawdown, _ in _drawdowns(self._values.values):
+            drawdowns.append(drawdown)
+            maxdd = max(maxdd, drawdown)
+            maxdrawdowns.append(maxdd)
+
+        self._setline(self.lines.drawdown, drawdowns)
+        self._setline(self.lines.maxdrawdown, maxdrawdowns)
+
 
 class DrawDownLength(Observer):
     '''This observer keeps track of the current drawdown length (plotted) and
     the drawdown max length (not plotted)
 
-    Params: None
+    Params:
+
+      - ``deferred`` (default: ``None``)
+
+        Calculate the lines at the end of the run (see ``DrawDown``)
     '''
     _stclock = True
 
+    params = (
+        ('deferred', None),
+    )
+
     lines = ('len', 'maxlen',)
 
     plotinfo = dict(plot=True, subplot=True)
@@ -78,12 +122,62 @@ class DrawDownLength(Observer):
     plotlines = dict(maxlength=dict(_plotskip=True,))
 
     def __init__(self):
-        self._dd = self._owner._addanalyzer_slave(bt.analyzers.DrawDown)
+        self._deferred = self._candefer(self.p.deferred)
+        if not self._deferred:
+            self._dd = self._owner._addanalyzer_slave(bt.analyzers.DrawDown)
+
+    def start(self):
+        if self._deferred:
+            self._values = _deferred_values(self)
 
     def next(self):
+        if self._deferred:
+            self._values.next()
+            return
+
         self.lines.len[0] = self._dd.rets.len  # update drawdown length
         self.lines.maxlen[0] = self._dd.rets.max.len  # update max length
 
+    def stop(self):
+        if not self._deferred:
+            return
+
+        lens, maxlens = array(str('d')), array(str('d'))
+        ddlen = maxlen = 0
+        for drawdown, _ in _drawdowns(self._values.values):
+            ddlen = ddlen + 1 if drawdown else 0
+            maxlen = max(maxlen, ddlen)
+            lens.append(ddlen)
+            maxlens.append(maxlen)
+
+        self._setline(self.lines.len, lens)
+        self._setline(self.lines.maxlen, maxlens)
+
+
+class _deferred_values(object):
+    # Records the value (or fund value) of the broker of the owner of an
+    # observer on each call to next
+    def __init__(self, observer):
+        fund = getattr(observer.p, 'fund', None)
+        broker = observer._owner.broker
+        if fund is None:
+            fund = broker.fundmode
+
+        self.values = values = array(str('d'))
+        if fund:
+            self.next = lambda: values.append(broker.fundvalue)
+        else:
+            self.next = lambda: values.append(broker.getvalue())
+
+
+def _drawdowns(values):
+    # yields (drawdown, moneydown) as the DrawDown analyzer calculates them
+    maxvalue = float('-inf')
+    for value in values:
+        maxvalue = max(maxvalue, value)
+        moneydown = maxvalue - value
+        yield 100.0 * moneydown / maxvalue, moneydown
+
 
 class DrawDown_Old(Observer):
     '''This observer keeps track of the current drawdown level (plotted) and
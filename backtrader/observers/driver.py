@@ -11,15 +11,19 @@ class DriverStateObserver(bt.Observer):
         state = dict(_method="bar"),
     )
 
-    def get_driver_state(self):
-        owner = self._owner
+    def start(self):
+        # the driver and the index of its states are resolved only once
+        self._driver = getattr(self._owner, "driver", None)
+        if self._driver is not None:
+            self._states = dict(
+                (state, i) for i, state in enumerate(self._driver.states))
 
-        try:
-            driver = owner.driver
-        except AttributeError:
+    def get_driver_state(self):
+        driver = self._driver
+        if driver is None:
             return np.NaN
 
-        return driver.states.index(driver.state)
+        return self._states[driver.state]
 
     def get_owner_value(self, line):
         owner = self._owner
@@ -43,14 +47,20 @@ class DriverPriceObserver(bt.Observer):
         protect_price = dict(marker='x', markersize=3.0, color='pink', fillstyle='full'),
     )
 
-    def get_owner_value(self, line):
-        owner = self._owner
+    def start(self):
+        # the lines of the owner are resolved only once (None if missing)
+        ownerlines = self._owner.lines
+        self._ownerlines = dict(
+            (line, getattr(ownerlines, line, None))
+            for line in ("entry_signal", "entry_price", "protect_price"))
 
-        try:
-            return getattr(owner.lines, line)[0]
-        except AttributeError:
+    def get_owner_value(self, line):
+        ownerline = self._ownerlines.get(line)
+        if ownerline is None:
             return np.NaN
 
+        return ownerline[0]
+
     def next(self):
         self.lines.entry_price[0] = (
             np.NaN if self.get_owner_value("entry_signal") == 0 else
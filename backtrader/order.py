@@ -21,8 +21,6 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
-import collections
-from copy import copy
 import datetime
 import itertools
 
@@ -58,6 +56,9 @@ class OrderExecutionBit(object):
       - pprice: current open position price
 
     '''
+    __slots__ = ('dt', 'size', 'price', 'closed', 'opened',
+                 'closedvalue', 'openedvalue', 'closedcomm', 'openedcomm',
+                 'value', 'comm', 'pnl', 'psize', 'pprice')
 
     def __init__(self,
                  dt=None, size=0, price=0.0,
@@ -114,8 +115,9 @@ class OrderData(object):
       - pprice: current open position price
 
     '''
-    # According to the docs, collections.deque is thread-safe with appends at
-    # both ends, there will be no pop (nowhere) and therefore to know which the
+    # Appending to the exbits list is atomic (like appending to a
+    # collections.deque, at a fraction of the memory), there will be no pop
+    # (nowhere) and therefore to know which the
     # new exbits are two indices are needed. At time of cloning (__copy__) the
     # indices can be updated to match the previous end, and the new end
     # (len(exbits)
@@ -126,12 +128,17 @@ class OrderData(object):
     # implementations) and therefore no append will happen during a copy and
     # the len of the exbits can be queried with no concerns about another
     # thread making an append and with no need for a lock
+    __slots__ = ('pclose', 'exbits', 'p1', 'p2',
+                 'dt', 'size', 'remsize', 'price', 'pricelimit', '_plimit',
+                 'trailamount', 'trailpercent',
+                 'value', 'comm', 'margin', 'pnl', 'psize', 'pprice',
+                 '_snapshot')
 
     def __init__(self, dt=None, size=0, price=0.0, pricelimit=0.0, remsize=0,
                  pclose=0.0, trailamount=0.0, trailpercent=0.0):
 
         self.pclose = pclose
-        self.exbits = collections.deque()  # for historical purposes
+        self.exbits = list()  # for historical purposes
         self.p1, self.p2 = 0, 0  # indices to pending notifications
 
         self.dt = dt
@@ -160,6 +167,8 @@ class OrderData(object):
         self.psize = 0
         self.pprice = 0
 
+        self._snapshot = None  # last snapshot handed out
+
     def _getplimit(self):
         return self._plimit
 
@@ -213,11 +222,49 @@ class OrderData(object):
         # rebuild the indices to mark which exbits are pending in clone
         self.p1, self.p2 = self.p2, len(self.exbits)
 
+    def _copy(self):
+        # attribute by attribute is much faster than copy for slots
+        obj = self.__class__.__new__(self.__class__)
+        obj.pclose = self.pclose
+        obj.exbits = self.exbits
+        obj.p1 = self.p1
+        obj.p2 = self.p2
+        obj.dt = self.dt
+        obj.size = self.size
+        obj.remsize = self.remsize
+        obj.price = self.price
+        obj.pricelimit = self.pricelimit
+        obj._plimit = self._plimit
+        obj.trailamount = self.trailamount
+        obj.trailpercent = self.trailpercent
+        obj.value = self.value
+        obj.comm = self.comm
+        obj.margin = self.margin
+        obj.pnl = self.pnl
+        obj.psize = self.psize
+        obj.pprice = self.pprice
+        obj._snapshot = None  # do not chain the snapshots
+        return obj
+
     def clone(self):
-        obj = copy(self)
+        obj = self._copy()
         obj.markpending()
         return obj
 
+    def snapshot(self):
+        '''Returns a copy in which the pending execution bits are those added
+        since the previous snapshot. If nothing has changed since the previous
+        snapshot (and it had no pending bits) it is returned again'''
+        snap = self._snapshot
+        if (snap is not None and snap.p1 == snap.p2 == len(self.exbits) and
+                snap.dt == self.dt):
+            return snap
+
+        # mark the pending bits in the live object and not only in the copy
+        self.markpending()
+        self._snapshot = snap = self._copy()
+        return snap
+
 
 class OrderBase(with_metaclass(MetaParams, object)):
     params = (
@@ -231,6 +278,18 @@ class OrderBase(with_metaclass(MetaParams, object)):
         ('histnotify', False),
     )
 
+    # The params are resolved to attributes during construction. The params
+    # object (params and p) and anything added later go to the __dict__
+    __slots__ = (
+        'owner', 'data', 'size', 'price', 'pricelimit', 'exectype', 'valid',
+        'tradeid', 'oco', 'trailamount', 'trailpercent', 'parent',
+        'transmit', 'simulated', 'histnotify',
+        'p', 'ref', 'broker', 'info', 'comminfo', 'triggered', '_active',
+        'status', '_plimit', 'created', '_limitoffset', '_trailref',
+        'executed', 'position', 'dteos', 'plen', 'pannotated',
+        '__dict__',
+    )
+
     DAY = datetime.timedelta()  # constant for DAY order identification
 
     # Time Restrictions for orders
@@ -300,11 +359,19 @@ class OrderBase(with_metaclass(MetaParams, object)):
         return '\n'.join(tojoin)
 
     def __init__(self):
+        # resolve the params to attributes to avoid going through __getattr__
+        # with each access
+        params = self.p
+        for pname in params._getkeys():
+            setattr(self, pname, getattr(params, pname))
+
         self.ref = next(self.refbasis)
         self.broker = None
         self.info = AutoOrderedDict()
         self.comminfo = None
         self.triggered = False
+        self.plen = 0  # set during submission
+        self.pannotated = None  # used by the broker for Close orders
 
         self._active = self.parent is None
         self.status = Order.Created
@@ -335,6 +402,7 @@ class OrderBase(with_metaclass(MetaParams, object)):
                                  trailpercent=self.trailpercent)
 
         # Adjust price in case a trailing limit is wished
+        self._trailref = None  # price which set the current trailing stop
         if self.exectype in [Order.StopTrail, Order.StopTrailLimit]:
             self._limitoffset = self.created.price - self.created.pricelimit
             price = self.created.price
@@ -369,18 +437,24 @@ class OrderBase(with_metaclass(MetaParams, object)):
 
         if not self.p.simulated:
             # provisional end-of-session
-            # get next session end
-            dtime = self.data.datetime.datetime(0)
-            session = self.data.p.sessionend
-            dteos = dtime.replace(hour=session.hour, minute=session.minute,
-                                  second=session.second,
-                                  microsecond=session.microsecond)
-
-            if dteos < dtime:
-                # eos before current time ... no ... must be at least next day
-                dteos += datetime.timedelta(days=1)
-
-            self.dteos = self.data.date2num(dteos)
+            # get next session end (shared by the orders of the same bar)
+            dt0 = self.data.datetime[0]
+            eoscache = getattr(self.data, '_ordereos', None)
+            if eoscache is not None and eoscache[0] == dt0:
+                self.dteos = eoscache[1]
+            else:
+                dtime = self.data.datetime.datetime(0)
+                session = self.data.p.sessionend
+                dteos = dtime.replace(hour=session.hour, minute=session.minute,
+                                      second=session.second,
+                                      microsecond=session.microsecond)
+
+                if dteos < dtime:
+                    # eos before current time ... must be at least next day
+                    dteos += datetime.timedelta(days=1)
+
+                self.dteos = self.data.date2num(dteos)
+                self.data._ordereos = (dt0, self.dteos)
         else:
             self.dteos = 0.0
 
@@ -388,10 +462,61 @@ class OrderBase(with_metaclass(MetaParams, object)):
         # status, triggered and executed are the only moving parts in order
         # status and triggered are covered by copy
         # executed has to be replaced with an intelligent clone of itself
-        obj = copy(self)
+        obj = self._copy()
         obj.executed = self.executed.clone()
         return obj  # status could change in next to completed
 
+    def _copy(self):
+        # attribute by attribute is much faster than copy for slots
+        obj = self.__class__.__new__(self.__class__)
+        obj.__dict__.update(self.__dict__)
+        obj.owner = self.owner
+        obj.data = self.data
+        obj.size = self.size
+        obj.price = self.price
+        obj.pricelimit = self.pricelimit
+        obj.exectype = self.exectype
+        obj.valid = self.valid
+        obj.tradeid = self.tradeid
+        obj.oco = self.oco
+        obj.trailamount = self.trailamount
+        obj.trailpercent = self.trailpercent
+        obj.parent = self.parent
+        obj.transmit = self.transmit
+        obj.simulated = self.simulated
+        obj.histnotify = self.histnotify
+        obj.p = self.p
+        obj.ref = self.ref
+        obj.broker = self.broker
+        obj.info = self.info
+        obj.comminfo = self.comminfo
+        obj.triggered = self.triggered
+        obj._active = self._active
+        obj.status = self.status
+        obj._plimit = self._plimit
+        obj.created = self.created
+        obj._limitoffset = self._limitoffset
+        obj._trailref = self._trailref
+        obj.executed = self.executed
+        obj.position = self.position
+        obj.dteos = self.dteos
+        obj.plen = self.plen
+        obj.pannotated = self.pannotated
+        return obj
+
+    def snapshot(self):
+        '''Returns a copy of the order with the status at the time of the call,
+        meant for notifications.
+
+        Unlike ``clone`` the unchanged parts are shared: ``created``, ``info``
+        and the params (as in a clone) and also ``executed`` if nothing has
+        been executed (or changed) since the previous snapshot. The pending
+        execution bits of ``executed`` are those not yet notified
+        '''
+        obj = self._copy()
+        obj.executed = self.executed.snapshot()
+        return obj
+
     def getstatusname(self, status=None):
         '''Returns the name for a given status or the one of the order'''
         return self.Status[self.status if status is None else status]
@@ -524,6 +649,53 @@ class OrderBase(with_metaclass(MetaParams, object)):
     def trailadjust(self, price):
         pass  # generic interface
 
+    def amend(self, price=None, pricelimit=None,
+              trailamount=None, trailpercent=None):
+        '''Changes in place the given prices of the order, which keeps its
+        reference and place in the queue of the broker. Only the values which
+        are not ``None`` are changed
+
+          - ``price``: limit/stop price (the current stop for trailing orders)
+          - ``pricelimit``: limit price of ``StopLimit`` orders. For
+            ``StopTrailLimit`` orders it follows the stop (keeping the
+            distance) if not given
+          - ``trailamount``, ``trailpercent``: distance to the price for
+            trailing orders
+
+        Returns ``False`` if the order has no price to amend (``Market``,
+        ``Close`` and ``Historical`` orders)
+
+        The order is only changed. Brokers must be informed of the change,
+        which is what ``broker.amend`` does
+        '''
+        if self.exectype in [Order.Market, Order.Close, Order.Historical]:
+            return False
+
+        created = self.created
+        trailing = self.exectype in [Order.StopTrail, Order.StopTrailLimit]
+
+        if price is not None:
+            self.price = created.price = price
+            if trailing:
+                self._trailref = None  # the stop was not set by trailing
+                if pricelimit is None:
+                    created.pricelimit = price - self._limitoffset
+
+        if pricelimit is not None:
+            self.pricelimit = created.pricelimit = pricelimit
+            if trailing:
+                self._limitoffset = created.price - pricelimit
+
+        if trailamount is not None:
+            self.trailamount = created.trailamount = trailamount
+            self._trailref = None
+
+        if trailpercent is not None:
+            self.trailpercent = created.trailpercent = trailpercent
+            self._trailref = None
+
+        return True
+
 
 class Order(OrderBase):
     '''
@@ -593,6 +765,7 @@ class Order(OrderBase):
         return False
 
     def trailadjust(self, price):
+        pref = price
         if self.trailamount:
             pamount = self.trailamount
         elif self.trailpercent:
@@ -600,17 +773,20 @@ class Order(OrderBase):
         else:
             pamount = 0.0
 
-        # Stop sell is below (-), stop buy is above, move only if needed
+        # Stop sell is below (-), stop buy is above, move only if needed. The
+        # stop only moves again if the price goes beyond the recorded one
         if self.isbuy():
             price += pamount
             if price < self.created.price:
                 self.created.price = price
+                self._trailref = pref
                 if self.exectype == Order.StopTrailLimit:
                     self.created.pricelimit = price - self._limitoffset
         else:
             price -= pamount
             if price > self.created.price:
                 self.created.price = price
+                self._trailref = pref
                 if self.exectype == Order.StopTrailLimit:
                     # limitoffset is negative when pricelimit was greater
                     # the - allows increasing the price limit if stop increases
@@ -33,6 +33,20 @@ import matplotlib.transforms as mtransforms
 from .utils import shade_color
 
 
+def _copycollection(dst, src):
+    # Moves the geometry and colors of the collection src (not added to any
+    # axis) to dst, which keeps its place in the axis and legend
+    paths = src.get_paths()
+    if isinstance(dst, mcol.LineCollection):
+        dst.set_segments([path.vertices for path in paths])
+        dst.set_color(src.get_color())
+    else:
+        dst.set_verts_and_codes([path.vertices for path in paths],
+                                [path.codes for path in paths])
+        dst.set_facecolor(src.get_facecolor())
+        dst.set_edgecolor(src.get_edgecolor())
+
+
 class CandlestickPlotHandler(object):
     legend_opens = [0.50, 0.50, 0.50]
     legend_highs = [1.00, 1.00, 1.00]
@@ -83,6 +97,10 @@ class CandlestickPlotHandler(object):
         else:
             self.tickdown = self.edgedown
 
+        self._barargs = dict(width=width, tickwidth=tickwidth,
+                             edgeadjust=edgeadjust,
+                             fillup=fillup, filldown=filldown)
+
         self.barcol, self.tickcol = self.barcollection(
             x, opens, highs, lows, closes,
             width, tickwidth, edgeadjust,
@@ -101,6 +119,17 @@ class CandlestickPlotHandler(object):
         # Add self as legend handler for this object
         mlegend.Legend.update_default_handler_map({self.barcol: self})
 
+    def update(self, x, opens, highs, lows, closes, **kwargs):
+        '''Replaces the candles with new values (level of detail rendering).
+        ``kwargs`` may override the ``width``, ``tickwidth``, ... given
+        during construction'''
+        barargs = dict(self._barargs, **kwargs)
+        barcol, tickcol = self.barcollection(
+            x, opens, highs, lows, closes, **barargs)
+
+        _copycollection(self.barcol, barcol)
+        _copycollection(self.tickcol, tickcol)
+
     def legend_artist(self, legend, orig_handle, fontsize, handlebox):
         x0 = handlebox.xdescent
         y0 = handlebox.ydescent
@@ -277,6 +306,8 @@ class VolumePlotHandler(object):
         ax.update_datalim(corners)
         ax.autoscale_view()
 
+        self._barargs = dict(width=width, edgeadjust=edgeadjust)
+
         self.barcol = self.barcollection(
             x, opens, closes, volumes,
             width=width, edgeadjust=edgeadjust,
@@ -288,6 +319,14 @@ class VolumePlotHandler(object):
         # Add a legend handler for this object
         mlegend.Legend.update_default_handler_map({self.barcol: self})
 
+    def update(self, x, opens, closes, volumes, **kwargs):
+        '''Replaces the volume bars with new values (level of detail
+        rendering). ``kwargs`` may override the ``width`` and ``edgeadjust``
+        given during construction'''
+        barargs = dict(self._barargs, **kwargs)
+        _copycollection(self.barcol, self.barcollection(
+            x, opens, closes, volumes, **barargs))
+
     def legend_artist(self, legend, orig_handle, fontsize, handlebox):
         x0 = handlebox.xdescent
         y0 = handlebox.ydescent
@@ -381,6 +420,8 @@ class OHLCPlotHandler(object):
         r, g, b = mcolors.colorConverter.to_rgb(colordown)
         self.colordown = r, g, b, alpha
 
+        self._barargs = dict(width=width, tickwidth=tickwidth)
+
         bcol, ocol, ccol = self.barcollection(
             x, opens, highs, lows, closes,
             width=width, tickwidth=tickwidth,
@@ -403,6 +444,15 @@ class OHLCPlotHandler(object):
         # Add self as legend handler for this object
         mlegend.Legend.update_default_handler_map({self.barcol: self})
 
+    def update(self, x, opens, highs, lows, closes, **kwargs):
+        '''Replaces the bars with new values (level of detail rendering).
+        ``kwargs`` may override the ``width`` and ``tickwidth`` given during
+        construction'''
+        barargs = dict(self._barargs, **kwargs)
+        cols = self.barcollection(x, opens, highs, lows, closes, **barargs)
+        for dst, src in zip((self.barcol, self.opencol, self.closecol), cols):
+            _copycollection(dst, src)
+
     def legend_artist(self, legend, orig_handle, fontsize, handlebox):
         x0 = handlebox.xdescent
         y0 = handlebox.ydescent
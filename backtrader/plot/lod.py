@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import collections
+import math
+
+import numpy as np  # guaranteed by matplotlib
+
+
+def _buckets(x, size):
+    # Buckets are aligned to multiples of size along the x axis (and not to
+    # the 1st visible point) to keep them stable when panning. Returns the
+    # start/end indices of the non-empty buckets and the bucket of each start
+    ids = np.floor_divide(x, size)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(ids)) + 1))
+    ends = np.append(starts[1:], len(x))
+    return starts, ends, ids[starts]
+
+
+def _first(y, values, starts, ends):
+    # index of the 1st occurrence of each value in its bucket. Buckets with
+    # no occurrence (all NaN) get the index of their start
+    hits = np.flatnonzero(y == np.repeat(values, ends - starts))
+    if not len(hits):
+        return starts
+
+    idx = hits[np.minimum(np.searchsorted(hits, starts), len(hits) - 1)]
+    return np.where((idx >= starts) & (idx < ends), idx, starts)
+
+
+def decimate(x, y, size):
+    '''Reduces the points ``x``, ``y`` of a line to 2 per bucket of ``size``
+    units of the x axis: the minimum and the maximum of the bucket, in order
+    of appearance. The extremes of the line are therefore preserved.
+    Buckets which only contain NaN values keep a NaN (a gap in the line)
+
+    Returns the tuple ``(x, y)`` of numpy arrays
+    '''
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    if size <= 1 or len(x) < 2:
+        return x, y
+
+    starts, ends, _ = _buckets(x, size)
+    ilow = _first(y, np.fmin.reduceat(y, starts), starts, ends)
+    ihigh = _first(y, np.fmax.reduceat(y, starts), starts, ends)
+
+    idx = np.column_stack((np.minimum(ilow, ihigh),
+                           np.maximum(ilow, ihigh))).ravel()
+    return x[idx], y[idx]
+
+
+def aggregate(x, size, opens, highs, lows, closes, volumes=None):
+    '''Aggregates the bars ``x``, ``opens``, ... into buckets of ``size``
+    units of the x axis, as a resampling would do: first open, highest high,
+    lowest low and last close. The volume is the largest of the bucket (and
+    not the sum) to keep the scale of the volume axis.
+
+    The x coordinate of a bucket is its center.
+
+    Returns the tuple ``(x, opens, highs, lows, closes, volumes)`` of numpy
+    arrays (``volumes`` is ``None`` if not given)
+    '''
+    x = np.asarray(x, dtype=float)
+    cols = [np.asarray(c, dtype=float) for c in (opens, highs, lows, closes)]
+    if volumes is not None:
+        volumes = np.asarray(volumes, dtype=float)
+
+    if size <= 1 or not len(x):
+        return tuple([x] + cols + [volumes])
+
+    opens, highs, lows, closes = cols
+    starts, ends, ids = _buckets(x, size)
+    if volumes is not None:
+        volumes = np.fmax.reduceat(volumes, starts)
+
+    return (ids * size + (size - 1) / 2.0,
+            opens[starts],
+            np.fmax.reduceat(highs, starts),
+            np.fmin.reduceat(lows, starts),
+            closes[ends - 1],
+            volumes)
+
+
+class _LODItem(object):
+    # An artist with the full resolution data and how to reduce and update it
+    def __init__(self, x, columns, points, reduce, update):
+        self.x = np.asarray(x, dtype=float)
+        self.columns = [np.asarray(c, dtype=float) for c in columns]
+        self.points = points
+        self.reduce = reduce
+        self.update = update
+        self.last = None
+
+    def refresh(self, lod, ax, x0, x1):
+        x = self.x
+        # one extra point on each side for lines to reach the borders
+        i0 = max(0, np.searchsorted(x, x0) - 1)
+        i1 = min(len(x), np.searchsorted(x, x1, side='right') + 1)
+        if i1 <= i0:
+            return  # nothing in view, leave the artist as it is
+
+        size = lod.bucketsize(ax, x1 - x0, self.points)
+        if (i0, i1, size) == self.last:
+            return
+
+        self.last = (i0, i1, size)
+        x, columns = self.reduce(x[i0:i1],
+                                 [c[i0:i1] for c in self.columns], size)
+        self.update(x, columns, size)
+
+
+class LevelOfDetail(object):
+    '''Level of detail rendering for plots with more bars than pixels.
+
+    Lines are decimated (``decimate``) and candles, bars and volume
+    aggregated (``aggregate``) into buckets of ``pixels`` horizontal pixels
+    of the axis. The artists are registered with the full resolution data,
+    and re-reduced from it when the limits of the x axis change (zooming,
+    panning) or the figure is resized
+
+    Args:
+
+      - ``pixels`` (default: ``1``): width in pixels of a bucket
+
+    '''
+    def __init__(self, pixels=1):
+        self.pixels = pixels
+        self.dpi = None  # if set, overrides the dpi of the figure
+        self.items = collections.OrderedDict()
+
+    def buckets(self, ax):
+        '''Number of buckets which fit in the width of ``ax``'''
+        width = ax.bbox.width
+        if self.dpi is not None:
+            width *= self.dpi / ax.figure.dpi
+
+        return max(1, int(width / self.pixels))
+
+    def bucketsize(self, ax, span, points=1):
+        '''Size in units of the x axis of the buckets for ``span`` units of
+        the x axis in ``ax``, with ``points`` points per bucket. ``1`` if
+        there is no need to reduce'''
+        buckets = self.buckets(ax)
+        if span <= buckets * points:
+            return 1
+
+        return int(math.ceil(span / buckets))
+
+    def line(self, ax, x, y, span):
+        '''Returns ``x`` and ``y`` decimated for ``span`` units of the x
+        axis of ``ax`` and the size of the buckets'''
+        size = self.bucketsize(ax, span, points=2)
+        if size <= 1:
+            return x, y, size
+
+        x, y = decimate(x, y, size)
+        return x, y, size
+
+    def bars(self, ax, x, span, *columns):
+        '''Returns ``x`` and the (o, h, l, c, v) ``columns`` aggregated for
+        ``span`` units of the x axis of ``ax`` and the size of the buckets'''
+        size = self.bucketsize(ax, span, points=1)
+        if size <= 1:
+            return x, columns, size
+
+        reduced = aggregate(x, size, *columns)
+        return reduced[0], reduced[1:len(columns) + 1], size
+
+    def addline(self, ax, line, x, y):
+        '''Registers the ``Line2D`` ``line`` plotted on ``ax`` with its full
+        resolution data'''
+        def reduce(x, columns, size):
+            x, y = decimate(x, columns[0], size)
+            return x, [y]
+
+        def update(x, columns, size):
+            line.set_data(x, columns[0])
+
+        self._add(ax, _LODItem(x, [y], 2, reduce, update))
+
+    def addbars(self, ax, update, x, *columns):
+        '''Registers bars plotted on ``ax`` with its full resolution data
+        (``columns`` being opens, highs, lows, closes and optionally
+        volumes). ``update`` is called with the aggregated ``x`` and
+        ``columns`` and the size of the buckets'''
+        def reduce(x, columns, size):
+            reduced = aggregate(x, size, *columns)
+            return reduced[0], reduced[1:len(columns) + 1]
+
+        self._add(ax, _LODItem(x, columns, 1, reduce, update))
+
+    def _add(self, ax, item):
+        if ax not in self.items:
+            self.items[ax] = list()
+            # lambdas are kept alive by matplotlib (bound methods are not)
+            ax.callbacks.connect('xlim_changed', lambda a: self.refresh(a))
+
+        self.items[ax].append(item)
+
+    def connect(self, fig):
+        '''Re-reduces the data when ``fig`` is resized'''
+        fig.canvas.mpl_connect('resize_event', lambda event: self.refresh())
+
+    def refresh(self, ax=None):
+        '''Re-reduces the data of ``ax`` (or all axes) for the current
+        limits of the x axis'''
+        for a in ([ax] if ax is not None else list(self.items)):
+            x0, x1 = a.get_xlim()
+            for item in self.items.get(a, []):
+                item.refresh(self, a, x0, x1)
@@ -28,6 +28,7 @@ import itertools
 import math
 import operator
 import sys
+import weakref
 
 import matplotlib
 import numpy as np  # guaranteed by matplotlib
@@ -39,9 +40,11 @@ import matplotlib.ticker as mticker
 from ..utils.py3 import range, with_metaclass, string_types, integer_types
 from .. import AutoInfoClass, MetaParams, TimeFrame, date2num
 
-from .finance import plot_candlestick, plot_ohlc, plot_volume, plot_lineonclose
+from .finance import (CandlestickPlotHandler, OHLCPlotHandler,
+                      VolumePlotHandler, plot_lineonclose)
 from .formatters import (MyVolFormatter, MyDateFormatter, getlocator)
 from . import locator as loc
+from .lod import LevelOfDetail
 from .multicursor import MultiCursor
 from .scheme import PlotScheme
 from .utils import tag_box_style
@@ -65,6 +68,7 @@ class PInfo(object):
         self.handles = collections.defaultdict(list)
         self.labels = collections.defaultdict(list)
         self.legpos = collections.defaultdict(int)
+        self.lod = None
 
         self.prop = mfontmgr.FontProperties(size=self.sch.subtxtsize)
 
@@ -75,6 +79,8 @@ class PInfo(object):
         self.vaxis = list()
         self.row = 0
         self.sharex = None
+        if self.sch.lod:
+            self.lod = LevelOfDetail(pixels=self.sch.lodpixels)
         return fig
 
     def nextcolor(self, ax):
@@ -101,6 +107,8 @@ class Plot_OldSync(with_metaclass(MetaParams, object)):
         for pname, pvalue in kwargs.items():
             setattr(self.p.scheme, pname, pvalue)
 
+        self.lods = weakref.WeakKeyDictionary()  # level of detail per figure
+
     def drawtag(self, ax, x, y, facecolor, edgecolor, alpha=0.9, **kwargs):
 
         txt = ax.text(x, y, '%.2f' % y, va='center', ha='left',
@@ -237,6 +245,10 @@ class Plot_OldSync(with_metaclass(MetaParams, object)):
 
             self.pinf.cursors.append(cursor)
 
+            if self.pinf.lod is not None:
+                self.pinf.lod.connect(fig)
+                self.lods[fig] = self.pinf.lod
+
             # Put the subplots as indicated by hspace
             fig.subplots_adjust(hspace=self.pinf.sch.plotdist,
                                 top=0.98, left=0.05, bottom=0.05, right=0.95)
@@ -449,6 +461,14 @@ class Plot_OldSync(with_metaclass(MetaParams, object)):
                 lplotarray = lplotarray[lplotmask]
                 xdata = np.array(xdata)[lplotmask]
 
+            # decimate lines with more points than pixels (not bars ...)
+            lod, lodsize = self.pinf.lod, 1
+            lodline = lineplotinfo._get('_method', 'plot') == 'plot'
+            if lod is not None and lodline:
+                xfull, lfull = xdata, lplotarray
+                xdata, lplotarray, lodsize = lod.line(
+                    ax, xdata, lplotarray, self.pinf.xlen)
+
             plottedline = pltmethod(xdata, lplotarray, **plotkwargs)
             try:
                 plottedline = plottedline[0]
@@ -456,6 +476,9 @@ class Plot_OldSync(with_metaclass(MetaParams, object)):
                 # Possibly a container of artists (when plotting bars)
                 pass
 
+            if lodsize > 1:
+                lod.addline(ax, plottedline, xfull, lfull)
+
             self.pinf.zorder[ax] = plottedline.get_zorder()
 
             vtags = lineplotinfo._get('plotvaluetags', True)
@@ -574,10 +597,22 @@ class Plot_OldSync(with_metaclass(MetaParams, object)):
 
             # Plot the volume (no matter if as overlay or standalone)
             vollabel = label
-            volplot, = plot_volume(ax, self.pinf.xdata, opens, closes, volumes,
-                                   colorup=self.pinf.sch.volup,
-                                   colordown=self.pinf.sch.voldown,
-                                   alpha=volalpha, label=vollabel)
+            x, cols, lodsize = self.lodbars(
+                ax, opens, highs, lows, closes, volumes)
+            vhandler = VolumePlotHandler(
+                ax, x, cols[0], cols[3], cols[4],
+                colorup=self.pinf.sch.volup,
+                colordown=self.pinf.sch.voldown,
+                alpha=volalpha, label=vollabel,
+                width=lodsize)
+            volplot = vhandler.barcol
+
+            if lodsize > 1:
+                self.pinf.lod.addbars(
+                    ax,
+                    lambda x, cols, size: vhandler.update(
+                        x, cols[0], cols[3], cols[4], width=size),
+                    self.pinf.xdata, opens, highs, lows, closes, volumes)
 
             nbins = 6
             prune = 'both'
@@ -679,30 +714,52 @@ class Plot_OldSync(with_metaclass(MetaParams, object)):
                 self.pinf.nextcolor(axdatamaster)
                 color = self.pinf.color(axdatamaster)
 
+            x, lcloses, lodsize = self.pinf.xdata, closes, 1
+            if self.pinf.lod is not None:
+                x, lcloses, lodsize = self.pinf.lod.line(
+                    ax, x, closes, self.pinf.xlen)
+
             plotted = plot_lineonclose(
-                ax, self.pinf.xdata, closes,
+                ax, x, lcloses,
                 color=color, label=datalabel)
+
+            if lodsize > 1:
+                self.pinf.lod.addline(ax, plotted[0], self.pinf.xdata, closes)
         else:
             if self.pinf.sch.linevalues and plinevalues:
                 datalabel += ' O:%.2f H:%.2f L:%.2f C:%.2f' % \
                              (opens[-1], highs[-1], lows[-1], closes[-1])
+            # bars are aggregated if there are more than pixels
+            x, cols, lodsize = self.lodbars(ax, opens, highs, lows, closes)
             if self.pinf.sch.style.startswith('candle'):
-                plotted = plot_candlestick(
-                    ax, self.pinf.xdata, opens, highs, lows, closes,
+                handler = CandlestickPlotHandler(
+                    ax, x, *cols,
                     colorup=self.pinf.sch.barup,
                     colordown=self.pinf.sch.bardown,
                     label=datalabel,
                     alpha=self.pinf.sch.baralpha,
                     fillup=self.pinf.sch.barupfill,
-                    filldown=self.pinf.sch.bardownfill)
+                    filldown=self.pinf.sch.bardownfill,
+                    width=lodsize, tickwidth=1.25)
+                plotted = handler.barcol, handler.tickcol
+                lodupdate = lambda x, cols, size: handler.update(
+                    x, *cols, width=size)
 
             elif self.pinf.sch.style.startswith('bar') or True:
                 # final default option -- should be "else"
-                plotted = plot_ohlc(
-                    ax, self.pinf.xdata, opens, highs, lows, closes,
+                handler = OHLCPlotHandler(
+                    ax, x, *cols,
                     colorup=self.pinf.sch.barup,
                     colordown=self.pinf.sch.bardown,
-                    label=datalabel)
+                    label=datalabel,
+                    width=1.5, tickwidth=0.5 * lodsize)
+                plotted = handler.barcol, handler.opencol, handler.closecol
+                lodupdate = lambda x, cols, size: handler.update(
+                    x, *cols, tickwidth=0.5 * size)
+
+            if lodsize > 1:
+                self.pinf.lod.addbars(ax, lodupdate, self.pinf.xdata,
+                                      opens, highs, lows, closes)
 
         self.pinf.zorder[ax] = plotted[0].get_zorder()
 
@@ -791,14 +848,33 @@ class Plot_OldSync(with_metaclass(MetaParams, object)):
             a = axdatamaster or ax
             a.set_yscale('log')
 
+    def lodbars(self, ax, *columns):
+        # aggregates the bars (opens, highs, ...) if needed and returns the x
+        # coordinates, the columns and the size of the buckets
+        if self.pinf.lod is None:
+            return self.pinf.xdata, columns, 1
+
+        return self.pinf.lod.bars(ax, self.pinf.xdata, self.pinf.xlen,
+                                  *columns)
+
     def show(self):
         self.mpyplot.show()
 
     def savefig(self, fig, filename, width=16, height=9, dpi=300, tight=True):
         fig.set_size_inches(width, height)
         bbox_inches = 'tight' * tight or None
+
+        lod = self.lods.get(fig)
+        if lod is not None:  # reduce for the size/resolution of the file
+            lod.dpi = dpi
+            lod.refresh()
+
         fig.savefig(filename, dpi=dpi, bbox_inches=bbox_inches)
 
+        if lod is not None:
+            lod.dpi = None
+            lod.refresh()
+
     def sortdataindicators(self, strategy):
         # These lists/dictionaries hold the subplots that go above each data
         self.dplotstop = list()
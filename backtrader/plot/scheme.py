@@ -184,6 +184,13 @@ class PlotScheme(object):
         # strftime Format string for the display of data points values
         self.fmt_x_data = None
 
+        # Level of detail: if there are more bars than horizontal pixels,
+        # lines are decimated (keeping the min/max of each bucket) and bars,
+        # candles and volume aggregated into buckets of lodpixels pixels.
+        # The buckets are recalculated from the full data when zooming
+        self.lod = True
+        self.lodpixels = 1
+
     def color(self, idx):
         colidx = tab10_index[idx % len(tab10_index)]
         return self.lcolors[colidx]
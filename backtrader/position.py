@@ -37,6 +37,8 @@ class Position(object):
     The Position instances can be tested using len(position) to see if size
     is not null
     '''
+    __slots__ = ('size', 'price', 'price_orig', 'adjbase',
+                 'upopened', 'upclosed', 'updt', 'datetime')
 
     def __str__(self):
         items = list()
@@ -64,6 +66,7 @@ class Position(object):
         self.set(size, price)
 
         self.updt = None
+        self.datetime = None  # last update/credit calculation
 
     def fix(self, size, price):
         oldsize = self.size
@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import csv
+import io
+
+from .metabase import MetaParams
+from .utils.py3 import string_types, with_metaclass
+
+
+__all__ = ['Retention']
+
+
+class Retention(with_metaclass(MetaParams, object)):
+    '''Retention policy for the orders and trades which brokers and
+    strategies keep in memory during a run.
+
+    Without a policy everything is kept until the end of the run: the orders
+    of the broker, the notified orders and all trades of the strategies. With
+    a policy the memory usage stays flat regardless of the length of the run.
+
+    Analyzers and observers are not affected, because they receive the
+    orders and trades via notifications.
+
+    Params:
+
+      - ``keep`` (default: ``None``)
+
+        Number of finished orders (and closed trades per data and tradeid)
+        to keep in memory. ``None`` keeps everything and ``0`` only keeps
+        what is still alive: open orders and the current trade of each data
+        and tradeid
+
+      - ``logfile`` (default: ``None``)
+
+        Name of a file (or file-like object) to which a line is appended
+        (csv format) for each order which is finished and each trade which
+        is closed, before they leave the memory. ``readlog`` streams the
+        lines back as dictionaries
+
+    Usage:
+
+      - ``cerebro.addretention(keep=100, logfile='run.csv')``
+    '''
+    params = (
+        ('keep', None),
+        ('logfile', None),
+    )
+
+    KIND_ORDER, KIND_TRADE = 'order', 'trade'
+
+    Fields = (
+        'kind', 'owner', 'ref', 'data', 'tradeid', 'status',
+        # orders
+        'ordtype', 'exectype', 'created_dt', 'created_size', 'created_price',
+        'executed_dt', 'executed_size', 'executed_price', 'executed_value',
+        'executed_comm', 'executed_pnl',
+        # trades
+        'dtopen', 'dtclose', 'barlen', 'size', 'price', 'value', 'commission',
+        'pnl', 'pnlcomm',
+    )
+
+    def __init__(self):
+        self._fh = None
+        self._close = False
+        self._csv = None
+
+    def start(self):
+        logfile = self.p.logfile
+        if logfile is None:
+            return
+
+        if isinstance(logfile, string_types):
+            self._fh = io.open(logfile, 'w', newline='')
+            self._close = True
+        else:
+            self._fh = logfile
+
+        self._csv = csv.DictWriter(self._fh, self.Fields)
+        self._csv.writeheader()
+
+    def stop(self):
+        if self._fh is not None:
+            self._fh.flush()
+            if self._close:
+                self._fh.close()
+
+        self._fh = self._csv = None
+
+    def trim(self, items, finished=None):
+        '''Removes from the (list of) ``items`` all but the last ``keep``
+
+        If ``finished`` (a callable) is given, only the items for which it
+        returns ``True`` are counted and removed: the others stay'''
+        keep = self.p.keep
+        if keep is None or len(items) <= keep:
+            return
+
+        if finished is None:
+            del items[:len(items) - keep]
+            return
+
+        done = [item for item in items if finished(item)]
+        if len(done) > keep:
+            drop = set(id(item) for item in done[:len(done) - keep])
+            items[:] = [item for item in items if id(item) not in drop]
+
+    @staticmethod
+    def _ownername(owner):
+        return owner.__class__.__name__ if owner is not None else None
+
+    def logorder(self, order):
+        '''Appends a finished order to the log (if any)'''
+        if self._csv is None:
+            return
+
+        created, executed = order.created, order.executed
+        self._csv.writerow(dict(
+            kind=self.KIND_ORDER, owner=self._ownername(order.owner),
+            ref=order.ref,
+            data=order.data._name, tradeid=order.tradeid,
+            status=order.getstatusname(),
+            ordtype=order.ordtypename(), exectype=order.getordername(),
+            created_dt=created.dt, created_size=created.size,
+            created_price=created.price,
+            executed_dt=executed.dt, executed_size=executed.size,
+            executed_price=executed.price, executed_value=executed.value,
+            executed_comm=executed.comm, executed_pnl=executed.pnl,
+        ))
+
+    def logtrade(self, trade, owner=None):
+        '''Appends a closed trade of ``owner`` (a strategy) to the log (if
+        any)'''
+        if self._csv is None:
+            return
+
+        self._csv.writerow(dict(
+            kind=self.KIND_TRADE, owner=self._ownername(owner),
+            ref=trade.ref,
+            data=trade.data._name, tradeid=trade.tradeid,
+            status=trade.status_names[trade.status],
+            dtopen=trade.dtopen, dtclose=trade.dtclose, barlen=trade.barlen,
+            size=trade.size, price=trade.price, value=trade.value,
+            commission=trade.commission, pnl=trade.pnl, pnlcomm=trade.pnlcomm,
+        ))
+
+    @classmethod
+    def readlog(cls, logfile, kind=None):
+        '''Generator which yields the lines of ``logfile`` as dictionaries,
+        optionally filtering by ``kind`` (``order`` or ``trade``). Empty
+        fields are skipped and numeric fields are converted back to numbers
+        '''
+        with io.open(logfile, 'r', newline='') as fh:
+            for row in csv.DictReader(fh):
+                if kind is not None and row['kind'] != kind:
+                    continue
+
+                entry = dict()
+                for k, v in row.items():
+                    if v == '':
+                        continue
+                    try:
+                        v = int(v)
+                    except ValueError:
+                        try:
+                            v = float(v)
+                        except ValueError:
+                            pass
+
+                    entry[k] = v
+
+                yield entry
@@ -26,7 +26,9 @@ from copy import copy
 from datetime import date, datetime, timedelta
 import inspect
 import itertools
+import os.path
 import random
+import re
 import threading
 import time
 
@@ -82,6 +84,49 @@ class RTVolume(object):
             self.datetime += tmoffset
 
 
+class HistBar(object):
+    '''Historical bar kept in the local cache of downloaded bars. It mimics
+    the ``historicalData`` messages received from TWS, with ``date`` already
+    converted to a ``datetime``
+    '''
+    __slots__ = ['reqId', 'date', 'open', 'high', 'low', 'close', 'volume',
+                 'count', 'WAP', 'hasGaps']
+
+    _DTFMT = '%Y-%m-%dT%H:%M:%S.%f'
+
+    def __init__(self, reqId=None, date=None, open=0.0, high=0.0, low=0.0,
+                 close=0.0, volume=0, count=0, WAP=0.0, hasGaps=False):
+        self.reqId = reqId
+        self.date = date
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.count = count
+        self.WAP = WAP
+        self.hasGaps = hasGaps
+
+    @classmethod
+    def frommsg(cls, msg):
+        return cls(msg.reqId, msg.date, msg.open, msg.high, msg.low,
+                   msg.close, msg.volume, msg.count, msg.WAP,
+                   bool(msg.hasGaps))
+
+    @classmethod
+    def fromline(cls, line):
+        tokens = line.strip().split(',')
+        return cls(None, datetime.strptime(tokens[0], cls._DTFMT),
+                   float(tokens[1]), float(tokens[2]), float(tokens[3]),
+                   float(tokens[4]), int(tokens[5]), int(tokens[6]),
+                   float(tokens[7]), tokens[8] == '1')
+
+    def toline(self):
+        return '{},{!r},{!r},{!r},{!r},{},{},{!r},{}\n'.format(
+            self.date.strftime(self._DTFMT), self.open, self.high, self.low,
+            self.close, self.volume, self.count, self.WAP, int(self.hasGaps))
+
+
 class MetaSingleton(MetaParams):
     '''Metaclass to make a metaclassed class a singleton'''
     def __init__(cls, name, bases, dct):
@@ -163,6 +208,32 @@ class IBStore(with_metaclass(MetaSingleton, object)):
       - ``indcash`` (default: ``True``)
 
         Manage IND codes as if they were cash for price retrieval
+
+      - ``histmaxreqs`` (default: ``50``)
+
+        Maximum number of historical data requests simultaneously in flight.
+        Additional requests are queued and sent when others finish. ``0``
+        removes the limit
+
+      - ``histpacing`` (default: ``(60, 600.0)``)
+
+        Tuple ``(count, seconds)``: no more than ``count`` historical data
+        requests will be sent in any period of ``seconds`` (the IB pacing
+        rules). Requests over the budget are queued and sent as soon as the
+        budget allows it. ``None`` deactivates pacing
+
+      - ``histcache`` (default: ``None``)
+
+        Directory in which downloaded historical bars are kept, together with
+        the date ranges which have been downloaded in full. If the begin date
+        of a request is in one of those ranges, the cached bars of the range
+        are delivered and only the rest up to the requested end date is
+        downloaded. Else everything is downloaded
+
+    Identical historical data requests in flight (for example from several
+    datas) are only sent once and the answer is delivered to all of them.
+    Contract details are cached and the details for the contracts of all
+    ``IBData`` feeds are requested together with the first lookup
     '''
 
     # Set a base for the data requests (historical/realtime) to distinguish the
@@ -184,6 +255,9 @@ class IBStore(with_metaclass(MetaSingleton, object)):
         ('timeoffset', True),  # Use offset to server for timestamps if needed
         ('timerefresh', 60.0),  # How often to refresh the timeoffset
         ('indcash', True),  # Treat IND codes as CASH elements
+        ('histmaxreqs', 50),  # max historical requests in flight, 0 no limit
+        ('histpacing', (60, 600.0)),  # max historical requests per seconds
+        ('histcache', None),  # directory to keep downloaded historical bars
     )
 
     @classmethod
@@ -228,6 +302,19 @@ class IBStore(with_metaclass(MetaSingleton, object)):
         self.histsend = dict()  # holds sessionend (data time) for request
         self.histtz = dict()  # holds sessionend (data time) for request
 
+        self._lock_hist = threading.Lock()  # sync pacing of hist requests
+        self.histpending = collections.deque()  # requests awaiting pacing
+        self.histactive = set()  # tickerIds of hist requests in flight
+        self.histsent = collections.deque()  # times of sent hist requests
+        self.histtimer = None  # pending timer to resume paced requests
+        self._lock_histq = threading.Lock()  # sync answers and followers
+        self.histreqs = dict()  # request key -> queue (deduplication)
+        self.histqkey = dict()  # queue -> request key
+        self.histmsgs = dict()  # queue -> messages delivered so far
+        self.histfollow = dict()  # queue -> queues of duplicate requests
+        self.histlastdt = dict()  # queue -> last datetime from cache
+        self.histcbars = dict()  # queue -> (cache key, begin, downloaded)
+
         self.acc_cash = AutoDict()  # current total cash per account
         self.acc_value = AutoDict()  # current total value per account
         self.acc_upds = AutoDict()  # current account valueinfos per account
@@ -240,6 +327,9 @@ class IBStore(with_metaclass(MetaSingleton, object)):
         self.orderid = None  # next possible orderid (will be itertools.count)
 
         self.cdetails = collections.defaultdict(list)  # hold cdetails requests
+        self.cdcache = dict()  # contract key -> received contract details
+        self.cdqueues = dict()  # contract key -> queue of request in flight
+        self.cdprefetch = list()  # contracts to be requested together
 
         self.managed_accounts = list()  # received via managedAccounts
 
@@ -477,7 +567,7 @@ class IBStore(with_metaclass(MetaSingleton, object)):
             except KeyError:
                 pass  # should not happend but it can
             else:
-                q.put(-msg.errorCode)
+                self._histput(q, -msg.errorCode)
                 self.cancelQueue(q)
 
         elif msg.errorCode == 326:  # not recoverable, clientId in use
@@ -615,18 +705,67 @@ class IBStore(with_metaclass(MetaSingleton, object)):
         if sendnone:
             q.put(None)
 
+        # clean up the historical request structures if any
+        with self._lock_histq:
+            self.histreqs.pop(self.histqkey.pop(q, None), None)
+            self.histmsgs.pop(q, None)
+            self.histlastdt.pop(q, None)
+            self.histcbars.pop(q, None)
+            for fq in self.histfollow.pop(q, ()):
+                if sendnone:
+                    fq.put(None)
+
+        if tickerId in self.histactive:
+            self._reqhistdone(tickerId)
+
     def validQueue(self, q):
         '''Returns (bool)  if a queue is still valid'''
         return q in self.ts  # queue -> ticker
 
+    def _contractkey(self, contract):
+        '''Returns a hashable key which identifies a contract'''
+        return tuple(getattr(contract, x, None) for x in (
+            'm_conId', 'm_symbol', 'm_secType', 'm_expiry', 'm_strike',
+            'm_right', 'm_multiplier', 'm_exchange', 'm_primaryExch',
+            'm_currency', 'm_localSymbol'))
+
+    def prefetchContractDetails(self, contract):
+        '''Registers ``contract`` to have its details requested together with
+        all other registered contracts with the first ``getContractDetails``
+        call, rather than sequentially'''
+        if contract is not None:
+            self.cdprefetch.append(contract)
+
+    def _reqContractDetailsOnce(self, contract):
+        '''Requests the details of ``contract`` unless they are already cached
+        or have already been requested'''
+        ckey = self._contractkey(contract)
+        if ckey not in self.cdcache and ckey not in self.cdqueues:
+            self.cdqueues[ckey] = self.reqContractDetails(contract)
+
+        return ckey
+
     def getContractDetails(self, contract, maxcount=None):
-        cds = list()
-        q = self.reqContractDetails(contract)
-        while True:
-            msg = q.get()
-            if msg is None:
-                break
-            cds.append(msg)
+        # Send the prefetch requests in one go to have them answered
+        # concurrently. The answers are collected from the cache later
+        prefetch, self.cdprefetch = self.cdprefetch, list()
+        for precontract in prefetch:
+            self._reqContractDetailsOnce(precontract)
+
+        ckey = self._reqContractDetailsOnce(contract)
+        try:
+            cds = self.cdcache[ckey]
+        except KeyError:
+            cds = list()
+            q = self.cdqueues.pop(ckey)
+            while True:
+                msg = q.get()
+                if msg is None:
+                    break
+                cds.append(msg)
+
+            if cds:  # only valid answers are kept
+                self.cdcache[ckey] = cds
 
         if not cds or (maxcount and len(cds) > maxcount):
             err = 'Ambiguous contract: none/multiple answers received'
@@ -670,6 +809,41 @@ class IBStore(with_metaclass(MetaSingleton, object)):
             # Ticks are not supported
             return self.getTickerQueue(start=True)
 
+        if tickerId is None:  # new request (not a follow-up of a segment)
+            hkey = (self._contractkey(contract), enddate, begindate,
+                    timeframe, compression, what, useRTH, str(tz), sessionend)
+
+            # the answer is delivered from the receiving thread: replaying
+            # it and following it must not let a message slip in between
+            with self._lock_histq:
+                q = self.histreqs.get(hkey, None)
+                if q is not None:  # identical request in flight, share it
+                    fq = queue.Queue()
+                    for msg in self.histmsgs.get(q, ()):  # replay delivered
+                        fq.put(msg)
+                    self.histfollow.setdefault(q, list()).append(fq)
+                    return fq
+
+                tickerId, q = self.getTickerQueue()
+                self.histreqs[hkey] = q
+                self.histqkey[q] = hkey
+                self.histmsgs[q] = list()
+
+            if self.p.histcache:
+                begindate, done = self._histfromcache(
+                    q, contract, enddate, begindate, timeframe, compression,
+                    what, useRTH, tz, sessionend)
+
+                if done:  # all bars came from the cache
+                    self._histput(q, HistBar(reqId=tickerId))
+                    self.cancelQueue(q)
+                    return q
+
+            kwargs.update(begindate=begindate)
+
+        else:
+            tickerId, q = self.reuseQueue(tickerId)  # reuse q for old tickerId
+
         if enddate is None:
             enddate = datetime.now()
 
@@ -679,29 +853,27 @@ class IBStore(with_metaclass(MetaSingleton, object)):
                 err = ('No duration for historical data request for '
                        'timeframe/compresison')
                 self.notifs.put((err, (), kwargs))
-                return self.getTickerQueue(start=True)
+                self.cancelQueue(q, True)
+                return q
             barsize = self.tfcomp_to_size(timeframe, compression)
             if barsize is None:
                 err = ('No supported barsize for historical data request for '
                        'timeframe/compresison')
                 self.notifs.put((err, (), kwargs))
-                return self.getTickerQueue(start=True)
+                self.cancelQueue(q, True)
+                return q
 
             return self.reqHistoricalData(contract=contract, enddate=enddate,
                                           duration=duration, barsize=barsize,
                                           what=what, useRTH=useRTH, tz=tz,
-                                          sessionend=sessionend)
+                                          sessionend=sessionend,
+                                          tickerId=tickerId)
 
         # Check if the requested timeframe/compression is supported by IB
         durations = self.getdurations(timeframe, compression)
         if not durations:  # return a queue and put a None in it
-            return self.getTickerQueue(start=True)
-
-        # Get or reuse a queue
-        if tickerId is None:
-            tickerId, q = self.getTickerQueue()
-        else:
-            tickerId, q = self.reuseQueue(tickerId)  # reuse q for old tickerId
+            self.cancelQueue(q, True)
+            return q
 
         # Get the best possible duration to reduce number of requests
         duration = None
@@ -736,7 +908,7 @@ class IBStore(with_metaclass(MetaSingleton, object)):
 
         what = what or 'TRADES'
 
-        self.conn.reqHistoricalData(
+        self._reqhistsend(
             tickerId,
             contract,
             bytes(intdate.strftime('%Y%m%d %H:%M:%S') + ' GMT'),
@@ -749,11 +921,15 @@ class IBStore(with_metaclass(MetaSingleton, object)):
         return q
 
     def reqHistoricalData(self, contract, enddate, duration, barsize,
-                          what=None, useRTH=False, tz='', sessionend=None):
+                          what=None, useRTH=False, tz='', sessionend=None,
+                          tickerId=None):
         '''Proxy to reqHistorical Data'''
 
         # get a ticker/queue for identification/data delivery
-        tickerId, q = self.getTickerQueue()
+        if tickerId is None:
+            tickerId, q = self.getTickerQueue()
+        else:
+            q = self.qs[tickerId]
 
         if contract.m_secType in ['CASH', 'CFD']:
             self.iscash[tickerId] = True
@@ -768,7 +944,7 @@ class IBStore(with_metaclass(MetaSingleton, object)):
         self.histsend[tickerId] = sessionend
         self.histtz[tickerId] = tz
 
-        self.conn.reqHistoricalData(
+        self._reqhistsend(
             tickerId,
             contract,
             bytes(enddate.strftime('%Y%m%d %H:%M:%S') + ' GMT'),
@@ -780,6 +956,192 @@ class IBStore(with_metaclass(MetaSingleton, object)):
 
         return q
 
+    def _reqhistsend(self, tickerId, *args):
+        '''Sends a historical data request to TWS or queues it if the maximum
+        number of requests in flight or the pacing budget have been reached'''
+        with self._lock_hist:
+            self.histpending.append((tickerId, args))
+
+        self._reqhistpump()
+
+    def _reqhistpump(self):
+        '''Sends the queued historical data requests allowed by the limits'''
+        with self._lock_hist:
+            maxreqs = self.p.histmaxreqs
+            pacing = self.p.histpacing
+            sent = self.histsent
+            while self.histpending:
+                if maxreqs and len(self.histactive) >= maxreqs:
+                    break  # wait for the end of a request
+
+                if pacing:
+                    count, period = pacing
+                    now = time.time()
+                    while sent and sent[0] <= now - period:
+                        sent.popleft()
+
+                    if len(sent) >= count:  # wait for the window to move
+                        if self.histtimer is None:
+                            self.histtimer = threading.Timer(
+                                sent[0] + period - now, self._reqhisttimer)
+                            self.histtimer.daemon = True
+                            self.histtimer.start()
+                        break
+
+                    sent.append(now)
+
+                tickerId, args = self.histpending.popleft()
+                if tickerId not in self.qs:
+                    continue  # cancelled in the meantime
+
+                self.histactive.add(tickerId)
+                self.conn.reqHistoricalData(tickerId, *args)
+
+    def _reqhisttimer(self):
+        with self._lock_hist:
+            self.histtimer = None
+
+        self._reqhistpump()
+
+    def _reqhistdone(self, tickerId):
+        '''Frees the slot of a historical request and sends pending ones'''
+        with self._lock_hist:
+            self.histactive.discard(tickerId)
+
+        self._reqhistpump()
+
+    def _histput(self, q, msg):
+        '''Delivers a historical data message to a queue and to the queues of
+        the identical requests which share the answer'''
+        with self._lock_histq:
+            if getattr(msg, 'date', None) is not None:
+                lastdt = self.histlastdt.get(q, None)
+                if lastdt is not None and msg.date <= lastdt:
+                    return  # already delivered from the cache
+
+                try:
+                    self.histcbars[q][2].append(HistBar.frommsg(msg))
+                except KeyError:
+                    pass
+
+            q.put(msg)
+            try:
+                self.histmsgs[q].append(msg)
+            except KeyError:
+                pass
+
+            for fq in self.histfollow.get(q, ()):
+                fq.put(msg)
+
+    def _histcachekey(self, contract, timeframe, compression, what, useRTH,
+                      tz, sessionend):
+        ckey = self._contractkey(contract)
+        ckey += (timeframe, compression, what, int(useRTH))
+        if timeframe >= TimeFrame.Days:  # dates depend on tz and sessionend
+            ckey += (str(tz), str(sessionend))
+
+        return ckey
+
+    def _histcachefile(self, ckey):
+        name = '-'.join(str(x) for x in ckey)
+        name = re.sub(r'[^\w.]+', '_', name)
+        return os.path.join(self.p.histcache, name + '.csv')
+
+    def _histloadcache(self, ckey):
+        '''Returns the sorted list of cached bars for the cache key'''
+        try:
+            with open(self._histcachefile(ckey)) as f:
+                return [HistBar.fromline(line) for line in f if line.strip()]
+        except (IOError, OSError):
+            return list()
+
+    def _histloadranges(self, ckey):
+        '''Returns the sorted list of ``[begin, end]`` datetime ranges which
+        have been downloaded in full for the cache key'''
+        ranges = list()
+        try:
+            with open(self._histcachefile(ckey) + '.ranges') as f:
+                for line in f:
+                    if line.strip():
+                        ranges.append([datetime.strptime(x, HistBar._DTFMT)
+                                       for x in line.strip().split(',')])
+        except (IOError, OSError):
+            pass
+
+        return ranges
+
+    def _histfromcache(self, q, contract, enddate, begindate, timeframe,
+                       compression, what, useRTH, tz, sessionend):
+        '''Delivers to ``q`` the cached bars of the downloaded range which
+        contains ``begindate`` and returns the begin date for the request
+        which fetches the rest and whether the rest is empty. Without such a
+        range nothing is delivered and everything has to be downloaded'''
+        ckey = self._histcachekey(contract, timeframe, compression, what,
+                                  useRTH, tz, sessionend)
+        self.histcbars[q] = (ckey, begindate, list())  # downloaded bars
+
+        if begindate is None:  # the start is decided by the server
+            return begindate, False
+
+        for rbegin, rend in self._histloadranges(ckey):
+            if rbegin <= begindate <= rend:
+                break
+        else:
+            return begindate, False  # head not in the cache
+
+        if enddate is not None:
+            rend = min(rend, enddate)
+
+        for bar in self._histloadcache(ckey):
+            if bar.date < begindate:
+                continue
+            if bar.date > rend:
+                break
+            self._histput(q, bar)
+
+        self.histlastdt[q] = rend  # filter overlapping downloaded bars
+        self.histcbars[q] = (ckey, rend, list())
+        return rend, enddate is not None and rend >= enddate
+
+    def _histsavecache(self, q):
+        '''Merges the bars downloaded for ``q`` into the cache and records
+        the downloaded range. The last bar is left out because it may not be
+        complete'''
+        try:
+            ckey, begin, bars = self.histcbars.pop(q)
+        except KeyError:
+            return
+
+        if len(bars) < 2:
+            return
+
+        bars = bars[:-1]
+        merged = dict((bar.date, bar) for bar in self._histloadcache(ckey))
+        merged.update((bar.date, bar) for bar in bars)
+
+        # add the downloaded range joining it with overlapping ranges
+        begin = bars[0].date if begin is None else min(begin, bars[0].date)
+        ranges = list()
+        newrange = [begin, bars[-1].date]
+        for rng in sorted(self._histloadranges(ckey) + [newrange]):
+            if ranges and rng[0] <= ranges[-1][1]:
+                ranges[-1][1] = max(ranges[-1][1], rng[1])
+            else:
+                ranges.append(rng)
+
+        if not os.path.isdir(self.p.histcache):
+            os.makedirs(self.p.histcache)
+
+        fname = self._histcachefile(ckey)
+        with open(fname, 'w') as f:
+            for dt in sorted(merged):
+                f.write(merged[dt].toline())
+
+        with open(fname + '.ranges', 'w') as f:
+            for rbegin, rend in ranges:
+                f.write('{},{}\n'.format(rbegin.strftime(HistBar._DTFMT),
+                                          rend.strftime(HistBar._DTFMT)))
+
     def cancelHistoricalData(self, q):
         '''Cancels an existing HistoricalData request
 
@@ -787,7 +1149,9 @@ class IBStore(with_metaclass(MetaSingleton, object)):
           - q: the Queue returned by reqMktData
         '''
         with self._lock_q:
-            self.conn.cancelHistoricalData(self.ts[q])
+            tickerId = self.ts[q]
+            if tickerId in self.histactive:  # else not yet sent
+                self.conn.cancelHistoricalData(tickerId)
             self.cancelQueue(q, True)
 
     def reqRealTimeBars(self, contract, useRTH=False, duration=5):
@@ -927,6 +1291,7 @@ class IBStore(with_metaclass(MetaSingleton, object)):
         tickerId = msg.reqId
         q = self.qs[tickerId]
         if msg.date.startswith('finished-'):
+            self._reqhistdone(tickerId)  # slot free for other requests
             self.histfmt.pop(tickerId, None)
             self.histsend.pop(tickerId, None)
             self.histtz.pop(tickerId, None)
@@ -936,7 +1301,10 @@ class IBStore(with_metaclass(MetaSingleton, object)):
                 return
 
             msg.date = None
+            self._histput(q, msg)
+            self._histsavecache(q)
             self.cancelQueue(q)
+            return
         else:
             dtstr = msg.date  # Format when string req: YYYYMMDD[  HH:MM:SS]
             if self.histfmt[tickerId]:
@@ -961,7 +1329,7 @@ class IBStore(with_metaclass(MetaSingleton, object)):
             else:
                 msg.date = datetime.utcfromtimestamp(long(dtstr))
 
-        q.put(msg)
+        self._histput(q, msg)
 
     # The _durations are meant to calculate the needed historical data to
     # perform backfilling at the start of a connetion or a connection is lost.
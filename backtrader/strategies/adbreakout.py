@@ -2,6 +2,37 @@ import numpy as np
 
 import backtrader as bt
 
+
+def breakout_signals(breakout, td, entry_td_max, close_td_reversal):
+    """
+    Returns the entry and close signals of the breakout strategies as line
+    expressions, calculated in a single pass in runonce mode
+
+    An ``entry_td_max`` below zero does not filter the entries with the TD
+    count. Zero requires the count to have the same sign as the breakout and
+    a positive value also requires the count not to go beyond it
+    """
+    if entry_td_max < 0:
+        entry_signal = breakout
+    else:
+        count = td.lines.value
+        td_up, td_down = count > 0, count < 0
+        if entry_td_max > 0:
+            td_up = bt.And(td_up, count <= entry_td_max)
+            td_down = bt.And(td_down, count >= -entry_td_max)
+
+        entry_signal = bt.If(bt.Or(bt.And(td_up, breakout > 0),
+                                   bt.And(td_down, breakout < 0)),
+                             breakout, 0)
+
+    if close_td_reversal:
+        close_signal = td.lines.reversal
+    else:
+        close_signal = bt.LineNum(0)
+
+    return entry_signal, close_signal
+
+
 class STADTDBreakoutStrategy(bt.Strategy):
     """
     ST = Supertrend, AD = ADBreakout, TD = TDSequential
@@ -36,45 +67,26 @@ class STADTDBreakoutStrategy(bt.Strategy):
                                                  self.reversal.lines.wick)
         self.td = bt.indicators.TDSequential(period=self.p.td_period)
 
-        self.driver = bt.drivers.BreakoutDriver(self)
+        # the strategy lines are reset after runonce: values copied in next
+        self.entry_line, self.close_line = breakout_signals(
+            self.breakout.lines.breakout, self.td,
+            self.p.entry_td_max, self.p.close_td_reversal)
+        self.protect_line = self.st.lines.stop
 
+        self.driver = bt.drivers.BreakoutDriver(self)
 
-    def update_breakout(self):
-        breakout = self.breakout.lines.breakout[0]
-        td_count = self.td.value[0]
-
-        if self.p.entry_td_max < 0:
-            # a negative setting means we don't filter entry at all using TD
-            self.lines.entry_signal[0] = breakout
-        elif self.p.entry_td_max == 0:
-            # a setting of zero means we simply require the td count to have the
-            # same sign as the breakout
-            if td_count > 0 and breakout > 0:
-                self.lines.entry_signal[0] = breakout
-            elif td_count < 0 and breakout < 0:
-                self.lines.entry_signal[0] = breakout
-            else:
-                self.lines.entry_signal[0] = 0
-        else:
-            if 0 < td_count <= self.p.entry_td_max and breakout > 0:
-                self.lines.entry_signal[0] = breakout
-            elif 0 > td_count >= -self.p.entry_td_max and breakout < 0:
-                self.lines.entry_signal[0] = breakout
-            else:
-                self.lines.entry_signal[0] = 0
-
-        if self.p.close_td_reversal:
-            self.lines.close_signal[0] = self.td.lines.reversal[0]
-        else:
-            self.lines.close_signal[0] = 0
-
-        self.lines.protect_price[0] = self.st.lines.stop[0]
 
     def next(self):
-        self.update_breakout()
-        self.driver.next(entry_signal=self.lines.entry_signal[0],
-                         protect_price=self.lines.protect_price[0],
-                         close_signal=self.lines.close_signal[0])
+        entry_signal = self.lines.entry_signal[0] = self.entry_line[0]
+        protect_price = self.lines.protect_price[0] = self.protect_line[0]
+        close_signal = self.lines.close_signal[0] = self.close_line[0]
+
+        if self.driver.state == "idle" and not entry_signal:
+            return  # the driver only waits for an entry signal
+
+        self.driver.next(entry_signal=entry_signal,
+                         protect_price=protect_price,
+                         close_signal=close_signal)
 
     def notify_order(self, order):
         self.driver.notify_order(order)
@@ -121,7 +133,7 @@ class IADTDBreakoutStrategy(bt.Strategy):
         # self.lines.protect_price = bt.If(self.trend > 0, self.cloud_top, self.cloud_bot)
 
         self.trend = self.data.close - self.ichi.lines.senkou_span_a
-        self.lines.protect_price = self.ichi.lines.senkou_span_a
+        self.protect_line = self.ichi.lines.senkou_span_a
 
         self.reversal = bt.indicators.ReversalSignal()
         self.breakout = bt.indicators.ADBreakout(self.data,
@@ -129,42 +141,24 @@ class IADTDBreakoutStrategy(bt.Strategy):
                                                  self.reversal.lines.wick)
         self.td = bt.indicators.TDSequential()
 
-        self.driver = bt.drivers.BreakoutDriver(self)
+        # the strategy lines are reset after runonce: values copied in next
+        self.entry_line, self.close_line = breakout_signals(
+            self.breakout.lines.breakout, self.td,
+            self.p.entry_td_max, self.p.close_td_reversal)
 
-    def update_breakout(self):
-        breakout = self.breakout.lines.breakout[0]
-        td_count = self.td.value[0]
-
-        if self.p.entry_td_max < 0:
-            # a negative setting means we don't filter entry at all using TD
-            self.lines.entry_signal[0] = breakout
-        elif self.p.entry_td_max == 0:
-            # a setting of zero means we simply require the td count to have the
-            # same sign as the breakout
-            if td_count > 0 and breakout > 0:
-                self.lines.entry_signal[0] = breakout
-            elif td_count < 0 and breakout < 0:
-                self.lines.entry_signal[0] = breakout
-            else:
-                self.lines.entry_signal[0] = 0
-        else:
-            if 0 < td_count <= self.p.entry_td_max and breakout > 0:
-                self.lines.entry_signal[0] = breakout
-            elif 0 > td_count >= -self.p.entry_td_max and breakout < 0:
-                self.lines.entry_signal[0] = breakout
-            else:
-                self.lines.entry_signal[0] = 0
-
-        if self.p.close_td_reversal:
-            self.lines.close_signal[0] = self.td.lines.reversal[0]
-        else:
-            self.lines.close_signal[0] = 0
+        self.driver = bt.drivers.BreakoutDriver(self)
 
     def next(self):
-        self.update_breakout()
-        self.driver.next(entry_signal=self.lines.entry_signal[0],
-                         protect_price=self.lines.protect_price[0],
-                         close_signal=self.lines.close_signal[0])
+        entry_signal = self.lines.entry_signal[0] = self.entry_line[0]
+        protect_price = self.lines.protect_price[0] = self.protect_line[0]
+        close_signal = self.lines.close_signal[0] = self.close_line[0]
+
+        if self.driver.state == "idle" and not entry_signal:
+            return  # the driver only waits for an entry signal
+
+        self.driver.next(entry_signal=entry_signal,
+                         protect_price=protect_price,
+                         close_signal=close_signal)
 
     def notify_order(self, order):
         self.driver.notify_order(order)
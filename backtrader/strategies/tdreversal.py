@@ -2,14 +2,18 @@ import numpy as np
 
 import backtrader as bt
 
-class TDReversalStrategy(bt.Strategy):
+
+class TDReversalSignal(bt.Indicator):
     """
-    TD = TDSequential
-    The strategy enters
+    Entry signal, entry price and protect price of TDReversalStrategy
+
+    data - OHLC
+    data1 - TDSequential
+    data2 - AverageTrueRange
     """
+    _mindatas = 3
 
     params = (
-        ("period", 4),
         ("max_entry_count", 1),
         ("protect_entry_count", 4),
         ("cap_count", 9),
@@ -20,51 +24,121 @@ class TDReversalStrategy(bt.Strategy):
         "entry_signal",
         "entry_price",
         "protect_price",
-        "close_signal",
     )
 
-    def __init__(self):
-        self.td = bt.indicators.TDSequential(period=self.p.period)
-        self.atr = bt.indicators.AverageTrueRange()
+    plotinfo = dict(plot=False)  # the lines are those of the strategy
 
-        self.driver = bt.drivers.ReversalDriver(self)
-
-    def get_entry_signal(self):
+    def _entry_signal(self, atr, close, value, reversals, idx):
+        # reversals[idx] is the current reversal in the array of the line
         # Require a minimum ATR to weed out low-probability trades
-        atr_percent = self.atr.lines.atr[0] / self.data.close[0]
-        if atr_percent < self.p.min_atr_percent:
+        if atr / close < self.p.min_atr_percent:
             return 0
 
         for li in range(1, self.p.max_entry_count + 1):
-            reversal = self.td.lines.reversal[-li]
-            value = self.td.lines.value[0]
+            reversal = reversals[idx - li]
             if reversal > 0 and value == -li:
                 return -1
             elif reversal < 0 and value == li:
                 return 1
         return 0
 
-    def next(self):
-        self.lines.entry_signal[0] = self.get_entry_signal()
+    def _prices(self, value, high, low, prev_entry, toe, shoulder):
         # Currently this sets the limit buy to the hl/2 of the previous candle,
         # to retain some sort of conservatism
         # TODO: We need to make this configurable so we can optimize it!
-        td_value = self.td.lines.value[0]
-        if abs(td_value) <= self.p.max_entry_count:
-            self.lines.entry_price[0] = (self.data.high[0] + self.data.low[0]) / 2
+        if abs(value) <= self.p.max_entry_count:
+            entry_price = (high + low) / 2
         else:
-            self.lines.entry_price[0] = self.lines.entry_price[-1]
+            entry_price = prev_entry
 
-        if abs(td_value) < self.p.protect_entry_count:
-            self.lines.protect_price[0] = self.td.lines.toe[0]
-        elif abs(td_value) < self.p.cap_count:
-            self.lines.protect_price[0] = self.lines.entry_price[0]
+        if abs(value) < self.p.protect_entry_count:
+            protect_price = toe
+        elif abs(value) < self.p.cap_count:
+            protect_price = entry_price
         else:
-            self.lines.protect_price[0] = self.td.lines.shoulder[0]
+            protect_price = shoulder
+
+        return entry_price, protect_price
+
+    def next(self):
+        td = self.data1.lines
+        value = td.value[0]
+        self.lines.entry_signal[0] = self._entry_signal(
+            self.data2.lines.atr[0], self.data.close[0], value,
+            td.reversal.array, td.reversal.idx)
+
+        self.lines.entry_price[0], self.lines.protect_price[0] = self._prices(
+            value, self.data.high[0], self.data.low[0],
+            self.lines.entry_price[-1], td.toe[0], td.shoulder[0])
+
+    def once(self, start, end):
+        high, low = self.data.high.array, self.data.low.array
+        close = self.data.close.array
+        td = self.data1.lines
+        values, reversals = td.value.array, td.reversal.array
+        toes, shoulders = td.toe.array, td.shoulder.array
+        atrs = self.data2.lines.atr.array
+
+        entry_signal = self.lines.entry_signal.array
+        entry_price = self.lines.entry_price.array
+        protect_price = self.lines.protect_price.array
+
+        for i in range(start, end):
+            value = values[i]
+            entry_signal[i] = self._entry_signal(
+                atrs[i], close[i], value, reversals, i)
+
+            entry_price[i], protect_price[i] = self._prices(
+                value, high[i], low[i], entry_price[i - 1],
+                toes[i], shoulders[i])
+
+
+class TDReversalStrategy(bt.Strategy):
+    """
+    TD = TDSequential
+    The strategy enters
+    """
+
+    params = (
+        ("period", 4),
+        ("max_entry_count", 1),
+        ("protect_entry_count", 4),
+        ("cap_count", 9),
+        ("min_atr_percent", 0.0),
+    )
+
+    lines = (
+        "entry_signal",
+        "entry_price",
+        "protect_price",
+        "close_signal",
+    )
+
+    def __init__(self):
+        self.td = bt.indicators.TDSequential(period=self.p.period)
+        self.atr = bt.indicators.AverageTrueRange()
+
+        # the strategy lines are reset after runonce: values copied in next
+        self.signal = TDReversalSignal(
+            self.data, self.td, self.atr,
+            max_entry_count=self.p.max_entry_count,
+            protect_entry_count=self.p.protect_entry_count,
+            cap_count=self.p.cap_count,
+            min_atr_percent=self.p.min_atr_percent)
+        self.driver = bt.drivers.ReversalDriver(self)
+
+    def next(self):
+        signal = self.signal.lines
+        entry_signal = self.lines.entry_signal[0] = signal.entry_signal[0]
+        entry_price = self.lines.entry_price[0] = signal.entry_price[0]
+        protect_price = self.lines.protect_price[0] = signal.protect_price[0]
+
+        if self.driver.state == "idle" and not entry_signal:
+            return  # the driver only waits for an entry signal
 
-        self.driver.next(entry_signal=self.lines.entry_signal[0],
-                         entry_price=self.lines.entry_price[0],
-                         protect_price=self.lines.protect_price[0],
+        self.driver.next(entry_signal=entry_signal,
+                         entry_price=entry_price,
+                         protect_price=protect_price,
                          close_signal=0) # always go out with a stop babby
 
     def notify_order(self, order):
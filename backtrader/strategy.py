@@ -22,7 +22,6 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 import collections
-import copy
 import datetime
 import inspect
 import itertools
@@ -92,6 +91,7 @@ class MetaStrategy(StrategyBase.__class__):
         _obj._slave_analyzers = list()
 
         _obj._tradehistoryon = False
+        _obj._retention = None
 
         return _obj, args, kwargs
 
@@ -289,8 +289,53 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
         else:
             self.prenext_open()
 
-    def _oncepost(self, dt):
-        for indicator in self._lineiterators[LineIterator.IndType]:
+    def _onceclocks(self, datas):
+        '''Groups the indicators by the index in ``datas`` of the data which
+        clocks them, to advance them when the data delivers a bar instead of
+        comparing lengths. Indicators whose clock does not lead to a data are
+        kept apart and still compared'''
+        dindex = dict((id(d), i) for i, d in enumerate(datas))
+        lindex = dict((id(line), i)
+                      for i, d in enumerate(datas) for line in d.lines)
+
+        indicators = self._lineiterators[LineIterator.IndType]
+        indids = set(id(ind) for ind in indicators)
+
+        self._dindicators = [list() for d in datas]
+        self._cindicators = list()
+        for ind in indicators:
+            clk, i = ind._clock, None
+            while clk is not None:
+                if id(clk) in dindex:
+                    i = dindex[id(clk)]
+                elif isinstance(clk, LineSeriesStub):
+                    clk = clk.lines[0]
+                    continue
+                elif id(clk) in indids:
+                    clk = clk._clock
+                    continue
+                else:
+                    i = lindex.get(id(clk), None)  # a line of a data
+
+                break
+
+            if i is not None and len(ind) == len(datas[i]):
+                self._dindicators[i].append(ind)
+            else:
+                self._cindicators.append(ind)
+
+    def _oncepost(self, dt, dadv=None):
+        if dadv is None:
+            indicators = self._lineiterators[LineIterator.IndType]
+        else:
+            # indices (as in _onceclocks) of the datas delivering a bar
+            for i in dadv:
+                for indicator in self._dindicators[i]:
+                    indicator.advance()
+
+            indicators = self._cindicators
+
+        for indicator in indicators:
             if len(indicator._clock) > len(indicator):
                 indicator.advance()
 
@@ -480,6 +525,13 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
         return wrinfo
 
     def _stop(self):
+        for obs in self.observers:
+            if not isinstance(obs, list):
+                obs = [obs]  # support of multi-data observers
+
+            for o in obs:
+                o._stop()  # complete (deferred) lines before user code
+
         self.stop()
 
         for analyzer in itertools.chain(self.analyzers, self._slave_analyzers):
@@ -495,15 +547,42 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
     def set_tradehistory(self, onoff=True):
         self._tradehistoryon = onoff
 
+    def set_retention(self, retention):
+        '''Sets the ``Retention`` policy for the notified orders and the
+        trades kept by the strategy'''
+        self._retention = retention
+
     def clear(self):
         self._orders.extend(self._orderspending)
+        if self._retention is not None:
+            self._retention.trim(self._orders)
         self._orderspending = list()
         self._tradespending = list()
 
+    def _addtradenotification(self, trade, qtrades=None):
+        # a single snapshot of the trade serves all notification queues
+        trade = trade.clone()
+        self._tradespending.append(trade)
+        if qtrades is not None:
+            qtrades.append(trade)
+
+        if trade.isclosed and self._retention is not None:
+            self._retention.logtrade(trade, owner=self)
+
+    def _newtrade(self, datatrades, data, tradeid):
+        if self._retention is not None:
+            self._retention.trim(datatrades)  # only closed trades in list
+
+        trade = Trade(data=data, tradeid=tradeid,
+                      historyon=self._tradehistoryon)
+        datatrades.append(trade)
+        return trade
+
     def _addnotification(self, order, quicknotify=False):
         if not order.p.simulated:
             self._orderspending.append(order)
 
+        qtrades = None
         if quicknotify:
             qorders = [order]
             qtrades = []
@@ -519,9 +598,7 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
 
         datatrades = self._trades[tradedata][order.tradeid]
         if not datatrades:
-            trade = Trade(data=tradedata, tradeid=order.tradeid,
-                          historyon=self._tradehistoryon)
-            datatrades.append(trade)
+            trade = self._newtrade(datatrades, tradedata, order.tradeid)
         else:
             trade = datatrades[-1]
 
@@ -539,16 +616,13 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
                              comminfo=order.comminfo)
 
                 if trade.isclosed:
-                    self._tradespending.append(copy.copy(trade))
-                    if quicknotify:
-                        qtrades.append(copy.copy(trade))
+                    self._addtradenotification(trade, qtrades)
 
             # Update it if needed
             if exbit.opened:
                 if trade.isclosed:
-                    trade = Trade(data=tradedata, tradeid=order.tradeid,
-                                  historyon=self._tradehistoryon)
-                    datatrades.append(trade)
+                    trade = self._newtrade(datatrades, tradedata,
+                                           order.tradeid)
 
                 trade.update(order,
                              exbit.opened,
@@ -562,14 +636,10 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
                 # orders have put the position down to 0 and the next order
                 # "opens" a position but "closes" the trade
                 if trade.isclosed:
-                    self._tradespending.append(copy.copy(trade))
-                    if quicknotify:
-                        qtrades.append(copy.copy(trade))
+                    self._addtradenotification(trade, qtrades)
 
             if trade.justopened:
-                self._tradespending.append(copy.copy(trade))
-                if quicknotify:
-                    qtrades.append(copy.copy(trade))
+                self._addtradenotification(trade, qtrades)
 
         if quicknotify:
             self._notify(qorders=qorders, qtrades=qtrades)
@@ -771,6 +841,22 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
         '''Cancels the order in the broker'''
         self.broker.cancel(order)
 
+    def amend(self, order, price=None, pricelimit=None,
+              trailamount=None, trailpercent=None):
+        '''Changes in place the prices of a pending order in the broker, which
+        keeps its reference and place in the queue, with no notification.
+
+        Only the arguments which are not ``None`` are changed. See
+        ``Order.amend``
+
+        Returns ``True`` if the order has been amended or ``False`` if the
+        order is no longer pending or the broker cannot amend orders (a cancel
+        and a new order are then needed)
+        '''
+        return self.broker.amend(order, price=price, pricelimit=pricelimit,
+                                 trailamount=trailamount,
+                                 trailpercent=trailpercent)
+
     def buy(self, data=None,
             size=None, price=None, plimit=None,
             exectype=None, valid=None, tradeid=0, oco=None,
@@ -1375,6 +1461,90 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
 
         return self.order_target_value(data=data, target=target, **kwargs)
 
+    def rebalance(self, targets, sequence='sellsfirst', **kwargs):
+        '''
+        Place the orders to rebalance the portfolio to the given ``targets``
+        in a single batch
+
+          - ``targets``: a ``dict`` (or iterable of pairs) ``data`` ->
+            ``weight`` (the data may also be given by name). The weight is
+            the percentage of the portfolio value expressed in decimal
+            (``0.05`` -> ``5%``) like in ``order_target_percent``
+
+            Several weights for the same data are netted
+
+          - ``sequence`` (default: ``'sellsfirst'``): order in which the
+            orders are submitted
+
+            - ``None``: the order of ``targets``
+            - ``'sellsfirst'``: sells before buys
+            - ``'reducefirst'``: orders reducing a position before those
+              opening/increasing one
+            - a callable: ``key(data, size)`` to sort the orders (``size`` is
+              negative for sells)
+
+            Along with the default ``checksubmit`` policy of the broker (the
+            submission order) this lets the cash released by the first orders
+            cover the later ones
+
+        All deltas are calculated against a single snapshot of the portfolio
+        value. The sizing is the one of ``order_target_value`` and
+        ``kwargs`` are passed to ``buy``/``sell``
+
+        Returns: the list of submitted orders
+        '''
+        broker = self.broker
+        portvalue = broker.getvalue()  # single snapshot for all targets
+
+        weights = OrderedDict()
+        items = iteritems(targets) if isinstance(targets, dict) else targets
+        for data, weight in items:
+            if isinstance(data, string_types):
+                data = self.getdatabyname(data)
+
+            weights[data] = weights.get(data, 0.0) + weight
+
+        deltas = []  # (data, signed size, price)
+        for data, weight in iteritems(weights):
+            target = weight * portvalue
+            possize = self.getposition(data, broker).size
+            if not target:
+                if possize:
+                    deltas.append((data, -possize, None))  # close position
+                continue
+
+            value = broker.getvalue(datas=[data])
+            comminfo = broker.getcommissioninfo(data)
+            price = data.close[0]
+            if target > value:
+                size = comminfo.getsize(price, target - value)
+            elif target < value:
+                size = -comminfo.getsize(price, value - target)
+            else:
+                continue
+
+            if size:
+                deltas.append((data, size, price))
+
+        if sequence == 'sellsfirst':
+            deltas.sort(key=lambda x: x[1] > 0)
+        elif sequence == 'reducefirst':
+            deltas.sort(
+                key=lambda x: self.getposition(x[0], broker).size * x[1] >= 0)
+        elif sequence is not None:
+            deltas.sort(key=lambda x: sequence(x[0], x[1]))
+
+        orders = []
+        for data, size, price in deltas:
+            if size > 0:
+                order = self.buy(data=data, size=size, price=price, **kwargs)
+            else:
+                order = self.sell(data=data, size=-size, price=price, **kwargs)
+
+            orders.append(order)
+
+        return orders
+
     def getposition(self, data=None, broker=None):
         '''
         Returns the current position for a given data in a given broker.
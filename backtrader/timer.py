@@ -26,6 +26,7 @@ import bisect
 import collections
 from datetime import date, datetime, timedelta
 from itertools import islice
+import math
 
 from .feed import AbstractDataBase
 from .metabase import MetaParams
@@ -38,6 +39,10 @@ __all__ = ['SESSION_TIME', 'SESSION_START', 'SESSION_END', 'Timer']
 
 SESSION_TIME, SESSION_START, SESSION_END = range(3)
 
+# Safety margin (in days, ~86 microseconds) when translating date changes and
+# end of sessions to float timestamps, to cover the rounding in num2date
+_DUEMARGIN = 1e-9
+
 
 class Timer(with_metaclass(MetaParams, object)):
     params = (
@@ -79,6 +84,8 @@ class Timer(with_metaclass(MetaParams, object)):
         self._reset_when()
 
         self._nexteos = datetime.min
+        self._eoskey = None  # nexteos for which _dteos was calculated
+        self._dteos = 0.0
         self._curdate = date.min
 
         self._curmonth = -1  # non-existent month
@@ -223,3 +230,27 @@ class Timer(with_metaclass(MetaParams, object)):
                     break
 
         return True  # timer target was met
+
+    def nextdue(self, dt):
+        '''
+        Returns the earliest float timestamp after the last call to ``check``
+        (which was made with ``dt``) at which ``check`` may either fire or
+        change the internal state of the timer.
+
+        Calling ``check`` with any timestamp before the returned value is a
+        no-op which returns ``False`` and can therefore be skipped
+        '''
+        due = math.floor(dt) + 1.0 - _DUEMARGIN  # date change
+        if self._lastcall == num2date(dt).date():
+            return due  # already called/discarded today, wait for next day
+
+        nexteos = self._nexteos
+        if nexteos is not self._eoskey:
+            self._eoskey = nexteos
+            self._dteos = date2num(nexteos) - _DUEMARGIN
+
+        dtwhen = self._dtwhen
+        if dtwhen is None or self._dteos <= dt:
+            return dt  # pending calculations/reset, check on next call
+
+        return min(due, self._dteos, dtwhen)
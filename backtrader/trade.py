@@ -136,7 +136,16 @@ class Trade(object):
         The first entry in the history is the Opening Event
         The last entry in the history is the Closing Event
 
+        The events are recorded as plain tuples and the ``TradeHistory``
+        entries are only created when the attribute is accessed
+
     '''
+    __slots__ = ('ref', 'data', 'tradeid', 'size', 'price', 'value',
+                 'commission', 'pnl', 'pnlcomm',
+                 'justopened', 'isopen', 'isclosed', 'long',
+                 'baropen', 'dtopen', 'barclose', 'dtclose', 'barlen',
+                 'historyon', '_history', '_histobjs', 'status')
+
     refbasis = itertools.count(1)
 
     status_names = ['Created', 'Open', 'Closed']
@@ -172,6 +181,7 @@ class Trade(object):
         self.justopened = False
         self.isopen = False
         self.isclosed = False
+        self.long = size > 0
 
         self.baropen = 0
         self.dtopen = 0.0
@@ -180,10 +190,49 @@ class Trade(object):
         self.barlen = 0
 
         self.historyon = historyon
-        self.history = list()
+        self._history = list()  # raw update events
+        self._histobjs = list()  # TradeHistory entries created on demand
 
         self.status = self.Created
 
+    def clone(self):
+        '''Returns a copy of the trade with the current status. The history
+        (if any) is shared with the original'''
+        obj = self.__class__.__new__(self.__class__)
+        obj.ref = self.ref
+        obj.data = self.data
+        obj.tradeid = self.tradeid
+        obj.size = self.size
+        obj.price = self.price
+        obj.value = self.value
+        obj.commission = self.commission
+        obj.pnl = self.pnl
+        obj.pnlcomm = self.pnlcomm
+        obj.justopened = self.justopened
+        obj.isopen = self.isopen
+        obj.isclosed = self.isclosed
+        obj.long = self.long
+        obj.baropen = self.baropen
+        obj.dtopen = self.dtopen
+        obj.barclose = self.barclose
+        obj.dtclose = self.dtclose
+        obj.barlen = self.barlen
+        obj.historyon = self.historyon
+        obj._history = self._history
+        obj._histobjs = self._histobjs
+        obj.status = self.status
+        return obj
+
+    @property
+    def history(self):
+        histobjs = self._histobjs
+        for event in itertools.islice(self._history, len(histobjs), None):
+            histentry = TradeHistory(*event[:9])
+            histentry.doupdate(*event[9:])
+            histobjs.append(histentry)
+
+        return histobjs
+
     def __len__(self):
         '''Absolute size of the trade'''
         return abs(self.size)
@@ -296,9 +345,8 @@ class Trade(object):
         # Update the history if needed
         if self.historyon:
             dt0 = self.data.datetime[0] if not order.p.simulated else 0.0
-            histentry = TradeHistory(
+            self._history.append((
                 self.status, dt0, self.barlen,
                 self.size, self.price, self.value,
-                self.pnl, self.pnlcomm, self.data._tz)
-            histentry.doupdate(order, size, price, commission)
-            self.history.append(histentry)
+                self.pnl, self.pnlcomm, self.data._tz,
+                order, size, price, commission))
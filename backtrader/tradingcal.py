@@ -22,6 +22,7 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 
+import bisect
 from datetime import datetime, timedelta, time
 
 from .metabase import MetaParams
@@ -73,7 +74,7 @@ class TradingCalendarBase(with_metaclass(MetaParams, object)):
         Returns the iso week number of the next trading day, given a ``day``
         (datetime/date) instance
         '''
-        self._nextday(day)[1][1]  # 2 elem is isocal / 0 - y, 1 - wk, 2 - day
+        return self._nextday(day)[1][1]  # 2 elem is isocal / 0 - y, 1 - wk, 2 - day
 
     def last_weekday(self, day):
         '''
@@ -141,10 +142,76 @@ class TradingCalendar(TradingCalendarBase):
         ('holidays', []),  # list of non trading days (date)
         ('earlydays', []),  # list of tuples (date, opentime, closetime)
         ('offdays', ISOWEEKEND),  # list of non trading (isoweekdays)
+        ('cachesize', 365),  # Number of days to compile in advance
     )
 
     def __init__(self):
-        self._earlydays = [x[0] for x in self.p.earlydays]  # speed up searches
+        self._compile()
+
+    def _compile(self):
+        '''
+        (Re)builds the lookup structures out of the current parameters. The
+        index of trading days itself is filled lazily by ``_extend``
+        '''
+        # Keep references to detect if the user has replaced the params
+        self._pkey = (self.p.holidays, self.p.earlydays, self.p.offdays,
+                      self.p.open, self.p.close)
+
+        self._holidays = set(d.toordinal() for d in self.p.holidays)
+        self._earlydays = dict((x[0].toordinal(), tuple(x[1:3]))
+                               for x in self.p.earlydays)
+        self._offdays = frozenset(self.p.offdays)
+
+        self._ifrom = self._ito = 0  # ordinal range of the compiled index
+        self._tradeday = bytearray()  # 1 if trading day, [ifrom, ito)
+        self._tdays = []  # sorted ordinals of trading days in the range
+        self._isocals = []  # isocalendar of each trading day in _tdays
+        self._scache = dict()  # (ordinal, tz) -> (opening, closing)
+
+    def _checkindex(self):
+        p = self.p
+        pkey = self._pkey
+        if (pkey[0] is not p.holidays or pkey[1] is not p.earlydays or
+                pkey[2] is not p.offdays or pkey[3] is not p.open or
+                pkey[4] is not p.close):
+            self._compile()
+
+    def _extend(self, ordinal):
+        '''
+        Makes sure the compiled index covers ``ordinal`` and holds a trading
+        day after it, compiling ``cachesize`` days in advance
+        '''
+        if not self._tdays or ordinal < self._ifrom:
+            ifrom = ito = ordinal  # restart the index
+            tradeday, tdays, isocals = bytearray(), [], []
+        else:
+            ifrom, ito = self._ifrom, self._ito
+            tradeday, tdays, isocals = self._tradeday, self._tdays, self._isocals
+
+        target = max(ordinal + 1, ito) + max(self.p.cachesize, 1)
+        offdays, holidays = self._offdays, self._holidays
+        while ito < target or not tdays or tdays[-1] <= ordinal:
+            isocal = datetime.fromordinal(ito).isocalendar()
+            isday = not (isocal[2] in offdays or ito in holidays)
+            tradeday.append(isday)
+            if isday:
+                tdays.append(ito)
+                isocals.append(tuple(isocal))
+            ito += 1
+
+        self._ifrom, self._ito = ifrom, ito
+        self._tradeday, self._tdays, self._isocals = tradeday, tdays, isocals
+
+    def istradingday(self, day):
+        '''
+        Returns ``True`` if ``day`` (datetime/date instance) is a trading day
+        '''
+        self._checkindex()
+        o = day.toordinal()
+        if not (self._ifrom <= o < self._ito):
+            self._extend(o)
+
+        return bool(self._tradeday[o - self._ifrom])
 
     def _nextday(self, day):
         '''
@@ -153,13 +220,16 @@ class TradingCalendar(TradingCalendarBase):
 
         The return value is a tuple with 2 components: (nextday, (y, w, d))
         '''
-        while True:
-            day += ONEDAY
-            isocal = day.isocalendar()
-            if isocal[2] in self.p.offdays or day in self.p.holidays:
-                continue
+        self._checkindex()
+        o = day.toordinal()
+        tdays = self._tdays
+        i = bisect.bisect_right(tdays, o)
+        if o < self._ifrom or i == len(tdays):  # out of the compiled range
+            self._extend(o)
+            tdays = self._tdays
+            i = bisect.bisect_right(tdays, o)
 
-            return day, isocal
+        return day + timedelta(days=tdays[i] - o), self._isocals[i]
 
     def schedule(self, day, tz=None):
         '''
@@ -169,28 +239,29 @@ class TradingCalendar(TradingCalendarBase):
 
         The return value is a tuple with 2 components: opentime, closetime
         '''
+        self._checkindex()
+        scache = self._scache
         while True:
             dt = day.date()
+            key = (dt.toordinal(), tz)
             try:
-                i = self._earlydays.index(dt)
-                o, c = self.p.earlydays[i][1:]
-            except ValueError:  # not found
-                o, c = self.p.open, self.p.close
-
-            closing = datetime.combine(dt, c)
-            if tz is not None:
-                closing = tz.localize(closing).astimezone(UTC)
-                closing = closing.replace(tzinfo=None)
+                opening, closing = scache[key]
+            except KeyError:
+                o, c = self._earlydays.get(key[0], (self.p.open, self.p.close))
+                closing = datetime.combine(dt, c)
+                opening = datetime.combine(dt, o)
+                if tz is not None:
+                    closing = tz.localize(closing).astimezone(UTC)
+                    closing = closing.replace(tzinfo=None)
+                    opening = tz.localize(opening).astimezone(UTC)
+                    opening = opening.replace(tzinfo=None)
+
+                scache[key] = opening, closing
 
             if day > closing:  # current time over eos
                 day += ONEDAY
                 continue
 
-            opening = datetime.combine(dt, o)
-            if tz is not None:
-                opening = tz.localize(opening).astimezone(UTC)
-                opening = opening.replace(tzinfo=None)
-
             return opening, closing
 
 
@@ -233,11 +304,15 @@ class PandasMarketCalendar(TradingCalendarBase):
             import pandas_market_calendars as mcal
             self._calendar = mcal.get_calendar(self._calendar)
 
-        import pandas as pd  # guaranteed because of pandas_market_calendars
-        self.dcache = pd.DatetimeIndex([0.0])
-        self.idcache = pd.DataFrame(index=pd.DatetimeIndex([0.0]))
         self.csize = timedelta(days=self.p.cachesize)
 
+        # Compiled copies of the pandas caches as plain sorted lists
+        self._vdays = []  # ordinals of valid days
+        self._vdts = []  # valid days as datetime instances
+        self._sdays = []  # ordinals of the sessions in the schedule
+        self._sopen = []  # naive utc session openings
+        self._sclose = []  # naive utc session closings
+
     def _nextday(self, day):
         '''
         Returns the next trading day (datetime/date instance) after ``day``
@@ -246,14 +321,17 @@ class PandasMarketCalendar(TradingCalendarBase):
         The return value is a tuple with 2 components: (nextday, (y, w, d))
         '''
         day += ONEDAY
+        o = day.toordinal()
         while True:
-            i = self.dcache.searchsorted(day)
-            if i == len(self.dcache):
+            i = bisect.bisect_left(self._vdays, o)
+            if i == len(self._vdays):
                 # keep a cache of 1 year to speed up searching
-                self.dcache = self._calendar.valid_days(day, day + self.csize)
+                dcache = self._calendar.valid_days(day, day + self.csize)
+                self._vdts = [x.to_pydatetime() for x in dcache]
+                self._vdays = [x.toordinal() for x in self._vdts]
                 continue
 
-            d = self.dcache[i].to_pydatetime()
+            d = self._vdts[i]
             return d, d.isocalendar()
 
     def schedule(self, day, tz=None):
@@ -265,16 +343,20 @@ class PandasMarketCalendar(TradingCalendarBase):
         The return value is a tuple with 2 components: opentime, closetime
         '''
         while True:
-            i = self.idcache.index.searchsorted(day.date())
-            if i == len(self.idcache):
+            i = bisect.bisect_left(self._sdays, day.toordinal())
+            if i == len(self._sdays):
                 # keep a cache of 1 year to speed up searching
-                self.idcache = self._calendar.schedule(day, day + self.csize)
+                idcache = self._calendar.schedule(day, day + self.csize)
+                self._sdays = [x.toordinal() for x in idcache.index]
+                self._sopen, self._sclose = (
+                    [x.tz_localize(None).to_pydatetime() for x in idcache[c]]
+                    for c in idcache.columns[0:2]
+                )
                 continue
 
-            st = (x.tz_localize(None) for x in self.idcache.iloc[i, 0:2])
-            opening, closing = st  # Get utc naive times
+            closing = self._sclose[i]  # Get utc naive times
             if day > closing:  # passed time is over the sessionend
                 day += ONEDAY  # wrap over to next day
                 continue
 
-            return opening.to_pydatetime(), closing.to_pydatetime()
+            return self._sopen[i], closing
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from array import array
+import collections
+
+
+__all__ = ('ColumnBuffer',)
+
+
+class ColumnBuffer(object):
+    '''Table of float columns (``array.array('d')``) which grows by rows and
+    can be preallocated for a known number of rows.
+
+    The columns can be handed over to ``numpy``/``pandas`` without copying
+    them (see ``asarray`` and ``todataframe``), which is the reason to keep
+    values like datetimes in their numeric (``date2num``) form
+
+    Params:
+
+      - ``names``: the names of the columns
+      - ``size`` (default: ``0``): number of rows to preallocate
+    '''
+    def __init__(self, names, size=0):
+        self.names = list(names)
+        self._columns = [array(str('d'), [0.0]) * size for _ in self.names]
+        self._alloc = size
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def add(self, row):
+        '''Appends a row (an iterable with a value per column) and returns its
+        index'''
+        i = self._len
+        if i == self._alloc:
+            grow = max(self._alloc, 64)
+            for column in self._columns:
+                column.extend(array(str('d'), [0.0]) * grow)
+            self._alloc += grow
+
+        for column, value in zip(self._columns, row):
+            column[i] = value
+
+        self._len = i + 1
+        return i
+
+    def set(self, i, row):
+        '''Overwrites the row at index ``i``'''
+        for column, value in zip(self._columns, row):
+            column[i] = value
+
+    def get(self, i, name):
+        '''Returns the value of column ``name`` in row ``i``'''
+        return self._columns[self.names.index(name)][i]
+
+    def truncate(self, size):
+        '''Discards the rows from index ``size`` onwards'''
+        self._len = min(self._len, size)
+
+    def rows(self, start=0):
+        '''Generator which yields the rows from ``start`` as tuples'''
+        columns = self._columns
+        for i in range(start, self._len):
+            yield tuple(column[i] for column in columns)
+
+    def trim(self):
+        '''Releases the preallocated rows which have not been used. Rows
+        cannot be added while arrays returned by ``asarray`` are alive'''
+        if self._alloc == self._len:
+            return  # nothing to release (and the columns may be exported)
+
+        for column in self._columns:
+            del column[self._len:]
+
+        self._alloc = self._len
+
+    def column(self, name):
+        '''Returns the ``array`` of column ``name`` (trimmed to the rows)'''
+        self.trim()
+        return self._columns[self.names.index(name)]
+
+    def asarray(self, name):
+        '''Returns column ``name`` as a ``numpy`` array sharing the memory of
+        the column'''
+        import numpy as np
+        return np.frombuffer(self.column(name), dtype=np.float64)
+
+    def asdatetimes(self, name, tz=None, dates=False):
+        '''Returns column ``name``, holding ``date2num`` values, as a
+        ``pandas.DatetimeIndex`` (naive, in timezone ``tz`` if given), as
+        ``num2date`` would convert the values one by one. With ``dates`` the
+        time part is removed'''
+        import numpy as np
+        import pandas
+
+        nums = self.asarray(name)
+        days = np.floor(nums)
+        musecs = (nums - days) * 86400e6
+        # compensate for rounding errors as num2date does
+        secs = np.round(musecs / 1e6) * 1e6
+        musecs = np.where(np.abs(musecs - secs) < 10, secs, np.floor(musecs))
+
+        # ordinal 719163 is 1970-01-01
+        epoch = (days - 719163.0) * 86400e6 + musecs
+        index = pandas.to_datetime(epoch.astype(np.int64), unit='us')
+        if tz is not None:
+            index = index.tz_localize('UTC').tz_convert(tz).tz_localize(None)
+        if dates:
+            index = index.normalize()
+
+        return pandas.DatetimeIndex(index.values)  # no inferred frequency
+
+    def todataframe(self, names=None, index=None):
+        '''Returns a ``pandas.DataFrame`` with the columns ``names`` (all if
+        ``None``) sharing the memory of the columns. ``index`` is passed to
+        the ``DataFrame``'''
+        import pandas
+
+        names = self.names if names is None else names
+        data = collections.OrderedDict(
+            (name, self.asarray(name)) for name in names)
+        return pandas.DataFrame(data, index=index, copy=False)
@@ -21,14 +21,21 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+from array import array
 import collections
+import datetime
+import gzip
 import io
 import itertools
+import os
+import shutil
 import sys
+import threading
 
 import backtrader as bt
+from backtrader.utils import date2num
 from backtrader.utils.py3 import (map, with_metaclass, string_types,
-                                  integer_types)
+                                  integer_types, queue)
 
 
 class WriterBase(with_metaclass(bt.MetaParams, object)):
@@ -81,6 +88,38 @@ class WriterFile(WriterBase):
         Number of decimal places to round floats down to. With ``None`` no
         rounding is performed
 
+      - ``csv_bufsize`` (default: ``None``)
+
+        Number of rows of the csv stream kept in memory before they are
+        written as a single block. With ``None`` each row is written as soon
+        as it is complete
+
+      - ``csv_format`` (default: ``text``)
+
+        Format of the csv stream:
+
+          - ``text``: lines of text written to ``out``
+
+          - ``npy``: binary columnar output. Each column is written to
+            ``csv_out`` (a directory) as a ``numpy`` file named after the
+            column (``Id``, ``name.len``, ``name.close`` ...). Datetimes are
+            stored as floats (see ``backtrader.num2date``), missing values as
+            ``nan`` and the columns with the names of the objects are
+            skipped. The blocks are appended to the files during the run
+            (``csv_bufsize`` defaults to ``4096`` rows) and the files are
+            completed during ``stop``
+
+      - ``csv_out`` (default: ``None``)
+
+        Directory for the ``npy`` format (created if needed)
+
+      - ``csv_thread`` (default: ``False``)
+
+        Format and write the blocks of rows in a background thread. Only
+        used if rows are buffered (``csv_bufsize`` or ``npy`` format)
+
+    If ``out`` is a filename ending in ``.gz`` the output is compressed with
+    ``gzip``
     '''
     params = (
         ('out', sys.stdout),
@@ -95,8 +134,15 @@ class WriterFile(WriterBase):
         ('separators', ['=', '-', '+', '*', '.', '~', '"', '^', '#']),
         ('seplen', 79),
         ('rounding', None),
+
+        ('csv_bufsize', None),
+        ('csv_format', 'text'),
+        ('csv_out', None),
+        ('csv_thread', False),
     )
 
+    NPY_BUFSIZE = 4096  # default rows per block for npy
+
     def __init__(self):
         self._len = itertools.count(1)
         self.headers = list()
@@ -104,34 +150,164 @@ class WriterFile(WriterBase):
 
         # open file if needed
         if isinstance(self.p.out, string_types):
-            self.out = open(self.p.out, 'w')
+            if self.p.out.endswith('.gz'):
+                self.out = gzip.open(self.p.out, 'wt')
+            else:
+                self.out = open(self.p.out, 'w')
             self.close_out = True
         else:
             self.out = self.p.out
             self.close_out = self.p.close_out
 
+        self._npy = self.p.csv_format == 'npy'
+        self._bufsize = self.p.csv_bufsize
+        if self._npy and not self._bufsize:
+            self._bufsize = self.NPY_BUFSIZE
+
+        self._rows = list()
+        self._queue = self._thread = None
+        self._columns = None  # npy: (index in row, filename, raw file)
+        self._nrows = 0
+
     def start(self):
         if self.p.csv:
             self.writelineseparator()
-            self.writeiterable(self.headers, counter='Id')
+            if not self._npy:
+                self.writeiterable(self.headers, counter='Id')
+
+            if self._bufsize and self.p.csv_thread:
+                self._queue = queue.Queue(maxsize=4)
+                self._thread = threading.Thread(target=self._t_blocks)
+                self._thread.daemon = True
+                self._thread.start()
 
     def stop(self):
+        self.flush()
+        if self._npy and self.p.csv:
+            self._npy_close()
+
         if self.close_out:
             self.out.close()
 
     def next(self):
         if self.p.csv:
-            self.writeiterable(self.values, func=str, counter=next(self._len))
+            if not self._bufsize:
+                self.writeiterable(self.values, func=str,
+                                   counter=next(self._len))
+            else:
+                row = self.values
+                if self.p.csv_counter:
+                    row.insert(0, next(self._len))
+                self._rows.append(row)
+                if len(self._rows) >= self._bufsize:
+                    self._flushrows()
+
             self.values = list()
 
+    def flush(self):
+        '''Writes the buffered rows of the csv stream (if any) and waits
+        until they have been written'''
+        self._flushrows()
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._queue = self._thread = None
+
+    def _flushrows(self):
+        if not self._rows:
+            return
+
+        rows, self._rows = self._rows, list()
+        if self._queue is not None:
+            self._queue.put(rows)
+        else:
+            self._writeblock(rows)
+
+    def _t_blocks(self):
+        while True:
+            rows = self._queue.get()
+            if rows is None:
+                break
+            self._writeblock(rows)
+
+    def _writeblock(self, rows):
+        if self._npy:
+            self._npy_block(rows)
+            return
+
+        sep = self.p.csvsep
+        self.out.write(''.join([sep.join(map(str, row)) + '\n'
+                                for row in rows]))
+
+    def _npy_columns(self, row):
+        # columns are named after the last object name seen (which is both
+        # header and value) and those with object names are skipped
+        headers = self.headers
+        if self.p.csv_counter:
+            headers = ['Id'] + headers
+
+        columns = list()
+        prefix = ''
+        names = collections.defaultdict(int)  # repeated names get a suffix
+        for i, (header, value) in enumerate(zip(headers, row)):
+            if isinstance(value, string_types) and value and value == header:
+                prefix = value + '.'
+                continue
+
+            name = prefix + header
+            n = names[name]
+            names[name] += 1
+            if n:
+                name += '_%d' % n
+            fname = os.path.join(self.p.csv_out, name.replace(os.sep, '_'))
+            columns.append((i, fname + '.npy', io.open(fname + '.f8', 'wb')))
+
+        return columns
+
+    def _npy_block(self, rows):
+        if self._columns is None:
+            if not os.path.isdir(self.p.csv_out):
+                os.makedirs(self.p.csv_out)
+            self._columns = self._npy_columns(rows[0])
+
+        nan = float('NaN')
+        for i, _, fh in self._columns:
+            col = array(str('d'))
+            for row in rows:
+                value = row[i]
+                if isinstance(value, datetime.datetime):
+                    value = date2num(value)
+                elif isinstance(value, string_types):
+                    value = nan  # missing value
+                col.append(value)
+
+            col.tofile(fh)
+
+        self._nrows += len(rows)
+
+    def _npy_close(self):
+        # add the header to the raw values to make the npy files
+        import numpy as np
+
+        for _, fname, fh in self._columns or []:
+            fh.close()
+            with io.open(fname, 'wb') as out:
+                np.lib.format.write_array_header_1_0(out, dict(
+                    descr=np.lib.format.dtype_to_descr(np.dtype('d')),
+                    fortran_order=False, shape=(self._nrows,)))
+                with io.open(fh.name, 'rb') as raw:
+                    shutil.copyfileobj(raw, out)
+
+            os.remove(fh.name)
+
     def addheaders(self, headers):
         if self.p.csv:
             self.headers.extend(headers)
 
     def addvalues(self, values):
         if self.p.csv:
-            if self.p.csv_filternan:
-                values = map(lambda x: x if x == x else '', values)
+            if self.p.csv_filternan and not self._npy:  # npy keeps nan
+                values = [x if x == x else '' for x in values]
             self.values.extend(values)
 
     def writeiterable(self, iterable, func=None, counter=''):
@@ -145,11 +321,13 @@ class WriterFile(WriterBase):
         self.writeline(line)
 
     def writeline(self, line):
+        if self._rows or self._thread is not None:
+            self.flush()  # keep the order with the buffered csv rows
         self.out.write(line + '\n')
 
     def writelines(self, lines):
         for l in lines:
-            self.out.write(l + '\n')
+            self.writeline(l)
 
     def writelineseparator(self, level=0):
         sepnum = level % len(self.p.separators)
@@ -76,7 +76,7 @@ def runstrat():
     data = bt.feeds.BacktraderCSVData(dataname='../../datas/2006-day-001.txt')
     cerebro.adddata(data)
 
-    cerebro.addobserver(bt.observers.DrawDown)
+    cerebro.addobserver(bt.observers.DrawDown, deferred=False)  # read in next
     cerebro.addobserver(bt.observers.DrawDown_Old)
 
     cerebro.addstrategy(MyStrategy)
@@ -201,5 +201,40 @@ def test_run(main=False):
                 assert np.isnan(analysis['t_pnlminus'])
                 assert np.isnan(analysis['prev_t_pnlminus'])
 
+
+class ScanStrategy(bt.Strategy):
+    def __init__(self):
+        for data in self.datas:
+            sma = btind.SMA(data, period=15)
+            btind.CrossOver(data.close, sma)
+
+
+def test_scanner(main=False):
+    cerebro = bt.Cerebro()
+    for name in ['a', 'b']:
+        cerebro.adddata(testcommon.getdata(0), name=name)
+    cerebro.addstrategy(ScanStrategy)
+    cerebro.addanalyzer(bt.analyzers.LatestBar, scanner=True)
+    cerebro.addanalyzer(bt.analyzers.LatestBar, _name='latest')
+    strat = cerebro.run()[0]
+
+    analysis = strat.analyzers[0].get_analysis()
+    latest = strat.analyzers.latest.get_analysis()
+    if main:
+        print(analysis)
+
+    columns = analysis['columns']
+    assert columns[0] == 'data'
+    assert [row[0] for row in analysis['rows']] == ['a', 'b']
+    for row in analysis['rows']:
+        values = dict(zip(columns, row))
+        for name in ['datetime', 'close', 'prev_close', 'sma_sma',
+                     'prev_co_crossover']:
+            assert values[name] == latest[name]
+
+        assert values['sma_sma'] == 4095.012
+
+
 if __name__ == '__main__':
     test_run(main=True)
+    test_scanner(main=True)
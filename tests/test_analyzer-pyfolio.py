@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os.path
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+
+class RunStrategy(bt.Strategy):
+    params = (('period', 15),)
+
+    def __init__(self):
+        self.cross = [btind.CrossOver(d.close,
+                                      btind.SMA(d, period=self.p.period))
+                      for d in self.datas]
+
+    def next(self):
+        for d, cross in zip(self.datas, self.cross):
+            if cross > 0.0:
+                self.buy(data=d)
+            elif cross < 0.0 and self.getposition(d):
+                self.close(data=d)
+
+
+def getcerebro(**kwargs):
+    cerebro = bt.Cerebro(**kwargs)
+    for dataname in ['2006-day-001.txt', '2006-week-001.txt']:
+        datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                                dataname)
+        cerebro.adddata(bt.feeds.BacktraderCSVData(dataname=datapath))
+    cerebro.addanalyzer(bt.analyzers.PyFolio)
+    return cerebro
+
+
+def test_run(main=False):
+    cerebro = getcerebro()
+    cerebro.addstrategy(RunStrategy)
+    strat = cerebro.run()[0]
+
+    pyfolio = strat.analyzers.pyfolio
+    returns, positions, transactions, gross_lev = pyfolio.get_pf_items()
+    analysis = pyfolio.get_analysis()
+    if main:
+        print(positions.tail())
+        print(transactions.tail())
+
+    # the columns were preallocated for the bars of the data
+    assert len(pyfolio._positions.values) == len(strat.data0)
+
+    # the frames built from the columns match the dictionaries
+    pss = list(analysis['positions'].items())[1:]  # skip headers
+    assert len(positions) == len(pss)
+    for (dt, values), (idx, row) in zip(pss, positions.iterrows()):
+        assert idx.date() == dt
+        assert list(row) == values[-2:]
+
+    txs = [(dt, tx) for dt, txs in analysis['transactions'].items()
+           for tx in txs][1:]  # skip headers
+    assert len(transactions) == len(txs) > 0
+    for (dt, tx), (idx, row) in zip(txs, transactions.iterrows()):
+        assert idx.to_pydatetime().replace(tzinfo=None) == dt
+        assert list(row) == tx
+
+    assert list(gross_lev) == list(analysis['gross_lev'].values())
+
+
+def test_optimize(main=False):
+    cerebro = getcerebro()
+    cerebro.addstrategy(RunStrategy)
+    analysis = cerebro.run()[0].analyzers.pyfolio.get_analysis()
+
+    # with optreturn the analyzers lose their strategy and datas
+    for maxcpus in [1, 2]:
+        cerebro = getcerebro(maxcpus=maxcpus)
+        cerebro.optstrategy(RunStrategy, period=[15, 20])
+        results = cerebro.run()
+        assert len(results) == 2
+        for oreturn in (r[0] for r in results):
+            pyfolio = oreturn.analyzers.pyfolio
+            pyfolio.get_pf_items()
+            if oreturn.params.period == 15:
+                assert pyfolio.get_analysis() == analysis
+
+
+if __name__ == '__main__':
+    test_run(main=True)
+    test_optimize(main=True)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import math
+import os.path
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+from backtrader.mathsupport import average, standarddev
+
+WINDOW = 10
+
+
+class RunStrategy(bt.Strategy):
+    params = (('period', 15),)
+
+    def __init__(self):
+        sma = btind.SMA(period=self.p.period)
+        self.cross = btind.CrossOver(self.data.close, sma)
+
+    def next(self):
+        if self.cross > 0.0:
+            self.buy()
+        elif self.cross < 0.0 and self.position:
+            self.close()
+
+
+def run():
+    cerebro = bt.Cerebro()
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            '2005-2006-day-001.txt')
+    cerebro.adddata(bt.feeds.BacktraderCSVData(dataname=datapath))
+    cerebro.addstrategy(RunStrategy)
+    kwargs = dict(timeframe=bt.TimeFrame.Weeks, window=WINDOW, factor=52)
+    cerebro.addanalyzer(bt.analyzers.RollingStats, _name='rolling', **kwargs)
+    cerebro.addanalyzer(bt.analyzers.RollingStats, _name='rollingnp',
+                        numpy=True, **kwargs)
+    cerebro.addanalyzer(bt.analyzers.TimeReturn, _name='timereturn',
+                        timeframe=bt.TimeFrame.Weeks)
+    return cerebro.run()[0]
+
+
+def close(a, b):
+    if math.isnan(a) or math.isnan(b):
+        return math.isnan(a) and math.isnan(b)
+    return abs(a - b) <= 1e-9 * max(1.0, abs(a), abs(b))
+
+
+def test_run(main=False):
+    strat = run()
+    rolling = strat.analyzers.rolling.get_analysis()
+    rollingnp = strat.analyzers.rollingnp.get_analysis()
+    timereturn = strat.analyzers.timereturn.get_analysis()
+
+    rets = list(timereturn.values())
+    nrows = len(rets)
+    if main:
+        print('periods', nrows)
+        for i in range(nrows - 3, nrows):
+            print(', '.join('%s: %.6f' % (c, rolling[c][i])
+                            for c in bt.analyzers.RollingStats.Columns))
+
+    for column in bt.analyzers.RollingStats.Columns:
+        assert len(rolling[column]) == len(rollingnp[column]) == nrows
+        assert all(close(a, b)
+                   for a, b in zip(rolling[column], rollingnp[column]))
+
+    assert [bt.num2date(x) for x in rolling['datetime']] == list(timereturn)
+    assert all(close(a, b) for a, b in zip(rolling['return'], rets))
+
+    assert all(math.isnan(x) for x in rolling['mean'][:WINDOW - 1])
+    window = rets[-WINDOW:]
+    assert close(rolling['mean'][-1], average(window))
+    assert close(rolling['volatility'][-1],
+                 standarddev(window) * math.sqrt(52))
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os.path
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+
+class RunStrategy(bt.Strategy):
+    params = (('period', 15),)
+
+    def __init__(self):
+        sma = btind.SMA(period=self.p.period)
+        self.cross = btind.CrossOver(self.data.close, sma)
+        self.sharpes = []
+
+    def next(self):
+        # streaming analyzers have a value during the run
+        self.sharpes.append(
+            self.analyzers.sharpe.get_analysis().get('sharperatio'))
+
+        if self.cross > 0.0:
+            self.buy()
+        elif self.cross < 0.0 and self.position:
+            self.close()
+
+
+ANALYZERS = [
+    ('sharpe', bt.analyzers.SharpeRatio, dict(timeframe=bt.TimeFrame.Days)),
+    ('sharpe_a', bt.analyzers.SharpeRatio_A,
+     dict(timeframe=bt.TimeFrame.Weeks, stddev_sample=True)),
+    ('sharpe_y', bt.analyzers.SharpeRatio,
+     dict(timeframe=bt.TimeFrame.Months, convertrate=False)),
+    ('sharpe_l', bt.analyzers.SharpeRatio, dict(legacyannual=True)),
+    ('periodstats', bt.analyzers.PeriodStats,
+     dict(timeframe=bt.TimeFrame.Weeks)),
+    ('sqn', bt.analyzers.SQN, dict()),
+    ('annual', bt.analyzers.AnnualReturn, dict()),
+    ('timereturn', bt.analyzers.TimeReturn,
+     dict(timeframe=bt.TimeFrame.Months)),
+]
+
+
+def run(streaming):
+    cerebro = bt.Cerebro()
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            '2005-2006-day-001.txt')
+    cerebro.adddata(bt.feeds.BacktraderCSVData(dataname=datapath))
+    cerebro.addstrategy(RunStrategy)
+    for name, analyzer, kwargs in ANALYZERS:
+        cerebro.addanalyzer(analyzer, _name=name, streaming=streaming,
+                            **kwargs)
+
+    return cerebro.run()[0]
+
+
+def close(a, b):
+    if isinstance(a, float) and isinstance(b, float):
+        return abs(a - b) <= 1e-9 * max(1.0, abs(a), abs(b))
+    return a == b
+
+
+def test_run(main=False):
+    strat, sstrat = run(False), run(True)
+    for name, _, _ in ANALYZERS:
+        analysis = strat.analyzers.getbyname(name).get_analysis()
+        sanalysis = sstrat.analyzers.getbyname(name).get_analysis()
+        if main:
+            print(name, dict(analysis))
+            print(name, 'streaming', dict(sanalysis))
+
+        if name == 'timereturn':  # only the current period is kept
+            assert len(sanalysis) == 1 < len(analysis)
+            assert list(sanalysis.items())[0] == list(analysis.items())[-1]
+            continue
+
+        assert list(analysis) == list(sanalysis)  # keys
+        assert all(close(analysis[k], sanalysis[k]) for k in analysis)
+
+    assert all(x is None for x in strat.sharpes)
+    # the strategy sees the value of the previous bar (analyzers run later)
+    assert None not in sstrat.sharpes[3:]
+    assert sstrat.sharpes[-1] != sstrat.analyzers.sharpe.ratio
+
+
+if __name__ == '__main__':
+    test_run(main=True)
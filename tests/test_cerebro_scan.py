@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import io
+import multiprocessing
+import os.path
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+SYMBOLS = ['2006-day-001', '2006-week-001', 'nosuchsymbol', '2005-2006-day-001']
+
+
+def getdata(dataname):
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            dataname + '.txt')
+    return bt.feeds.BacktraderCSVData(dataname=datapath)
+
+
+class RunStrategy(bt.Strategy):
+    params = (('period', 15),)
+
+    def __init__(self):
+        sma = btind.SMA(period=self.p.period)
+        self.cross = btind.CrossOver(self.data.close, sma)
+
+    def next(self):
+        if self.cross > 0.0:
+            self.buy()
+        elif self.cross < 0.0 and self.position:
+            self.close()
+
+
+class TimerStrategy(bt.Strategy):
+    def __init__(self):
+        self.timercount = 0
+        self.add_timer(when=bt.timer.SESSION_END)
+
+    def notify_timer(self, timer, when, *args, **kwargs):
+        self.timercount += 1
+
+
+class TimerCount(bt.Analyzer):
+    def get_analysis(self):
+        return dict(count=self.strategy.timercount)
+
+
+def template():
+    cerebro = bt.Cerebro()
+    cerebro.addstrategy(RunStrategy)
+    cerebro.addanalyzer(bt.analyzers.SQN, _name='sqn')
+    cerebro.addanalyzer(bt.analyzers.TimeReturn, _name='years',
+                        timeframe=bt.TimeFrame.Years)
+    return cerebro
+
+
+def test_run(main=False):
+    cerebro = template()
+    results = cerebro.scan(SYMBOLS, getdata, maxcpus=1)
+    presults = cerebro.scan(SYMBOLS, getdata, maxcpus=2)
+
+    assert [r.symbol for r in results] == SYMBOLS
+    for result, presult in zip(results, presults):
+        if main:
+            print(result.symbol, result.error, result.analyses)
+
+        assert result.symbol == presult.symbol
+        assert result.error == presult.error
+        assert result.analyses == presult.analyses
+
+        if result.symbol == 'nosuchsymbol':
+            assert result.error is not None and not result.analyses
+            continue
+
+        # same as a regular run of the symbol
+        single = template()
+        single.adddata(getdata(result.symbol))
+        strat = single.run()[0]
+        assert result.error is None
+        assert result.analyses[0]['sqn'] == strat.analyzers.sqn.get_analysis()
+        assert (result.analyses[0]['years'] ==
+                strat.analyzers.years.get_analysis())
+
+    out = io.StringIO()
+    bt.Cerebro.scantable(results, out)
+    lines = out.getvalue().splitlines()
+    if main:
+        print('\n'.join(lines))
+
+    assert len(lines) == 1 + len(SYMBOLS)
+    assert lines[0].startswith('symbol,strategy,error,sqn_sqn,sqn_trades')
+
+
+def test_timers(main=False):
+    # the timers added by the strategies must not pile up across symbols
+    cerebro = bt.Cerebro()
+    cerebro.addstrategy(TimerStrategy)
+    cerebro.addanalyzer(TimerCount, _name='timers')
+    cerebro.add_timer(when=bt.timer.SESSION_START, strats=True)
+
+    symbols = ['2006-day-001'] * 3
+    for maxcpus in [1, 2]:
+        results = cerebro.scan(symbols, getdata, maxcpus=maxcpus)
+        counts = [r.analyses[0]['timers']['count'] for r in results]
+        if main:
+            print('timer notifications', maxcpus, counts)
+
+        assert counts[0] > 0 and counts == counts[:1] * len(symbols)
+        assert len(cerebro._pretimers) == 1  # only the one of the template
+
+
+
+class CallbackError(Exception):
+    pass
+
+
+def test_callback_error(main=False):
+    # an error in the callback stops the scan and its worker processes
+    def callback(result):
+        raise CallbackError(result.symbol)
+
+    cerebro = template()
+    for maxcpus in [1, 2]:
+        try:
+            cerebro.scan(SYMBOLS * 4, getdata, maxcpus=maxcpus,
+                         callback=callback)
+        except CallbackError as e:
+            assert str(e) == SYMBOLS[0]
+        else:
+            assert False, 'the callback error was not raised'
+
+        assert not multiprocessing.active_children()
+
+
+if __name__ == '__main__':
+    test_run(main=True)
+    test_timers(main=True)
+    test_callback_error(main=True)
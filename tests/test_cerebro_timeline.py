@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os.path
+
+import testcommon
+
+import backtrader as bt
+
+
+class ShiftBar(object):
+    '''Moves the datetime of a bar half a day later: same length and same
+    first/last datetimes as the original data'''
+    def __init__(self, data, bar=100):
+        self.bar = bar
+        self.count = 0
+
+    def __call__(self, data):
+        self.count += 1
+        if self.count == self.bar:
+            data.datetime[0] += 0.5
+
+        return False  # the bar is kept
+
+
+class StepCounter(bt.Strategy):
+    def start(self):
+        self.steps = 0
+
+    def next(self):
+        self.steps += 1
+
+
+def getdata(shifted=False):
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            '2006-day-001.txt')
+    data = bt.feeds.BacktraderCSVData(dataname=datapath)
+    if shifted:
+        data.addfilter(ShiftBar)
+
+    return data
+
+
+def run(shifted, timeline=None):
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.adddata(getdata())
+    cerebro.adddata(getdata(shifted=shifted))
+    cerebro.addstrategy(StepCounter)
+    cerebro._timeline = timeline  # a timeline left over from other datas
+    strat = cerebro.run()[0]
+    return cerebro, strat.steps
+
+
+def test_run(main=False):
+    cerebro, steps = run(shifted=False)
+    _, ssteps = run(shifted=True)
+    # the shifted bar is delivered on its own step
+    _, rsteps = run(shifted=True, timeline=cerebro._timeline)
+    if main:
+        print('steps', steps, 'shifted', ssteps, 'with old timeline', rsteps)
+
+    assert ssteps == steps + 1
+    assert rsteps == ssteps
+
+
+
+class ClockStrategy(bt.Strategy):
+    '''Indicators clocked by each data, by a line of a data, by another
+    indicator and by a lines operation'''
+    def __init__(self):
+        d0, d1 = self.datas
+        sma = bt.ind.SMA(d0.close, period=5)
+        self.inds = [
+            sma, bt.ind.SMA(sma, period=3), bt.ind.SMA(d1, period=4),
+            bt.ind.SMA(d1.close - d1.open, period=2),
+        ]
+
+    def start(self):
+        self.values = list()
+
+    def next(self):
+        self.values.append([ind[0] for ind in self.inds])
+
+
+def runclocks(runonce):
+    cerebro = bt.Cerebro(stdstats=False, runonce=runonce)
+    cerebro.adddata(getdata())
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            '2006-week-001.txt')
+    cerebro.adddata(bt.feeds.BacktraderCSVData(dataname=datapath))
+    cerebro.addstrategy(ClockStrategy)
+    return cerebro.run()[0]
+
+
+def test_clocks(main=False):
+    strat = runclocks(runonce=True)
+    # all indicators are advanced when the data clocking them delivers
+    assert not strat._cindicators
+    assert sum(len(inds) for inds in strat._dindicators) == 5
+
+    values = runclocks(runonce=False).values
+    if main:
+        print(len(values), values[-1])
+
+    assert strat.values == values
+
+
+if __name__ == '__main__':
+    test_run(main=True)
+    test_clocks(main=True)
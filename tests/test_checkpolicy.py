@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os.path
+
+import testcommon
+
+import backtrader as bt
+
+
+class SwitchStrategy(bt.Strategy):
+    '''Switches the whole portfolio from one data to the other every 10 bars,
+    submitting the buy of the new data before the sell of the old one'''
+
+    def start(self):
+        self.margins = self.completed = 0
+        self.held = 0
+
+    def notify_order(self, order):
+        if order.status == order.Margin:
+            self.margins += 1
+        elif order.status == order.Completed:
+            self.completed += 1
+
+    def next(self):
+        if len(self) == 1:
+            self.order_target_percent(data=self.datas[0], target=0.90)
+
+        elif not len(self) % 10:
+            old, new = self.datas[self.held], self.datas[1 - self.held]
+            self.held = 1 - self.held
+            size = int(self.broker.getvalue() * 0.90 / new.close[0])
+            self.buy(data=new, size=size)
+            self.close(data=old)
+
+
+def run(checkpolicy=None):
+    cerebro = bt.Cerebro(stdstats=False)
+    for dataname in ['2006-day-001.txt', '2006-day-001.txt']:
+        datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                                dataname)
+        cerebro.adddata(bt.feeds.BacktraderCSVData(dataname=datapath))
+    cerebro.broker.set_checksubmit(True, checkpolicy)
+    cerebro.addstrategy(SwitchStrategy)
+    return cerebro.run()[0]
+
+
+def test_run(main=False):
+    strat = run()
+    if main:
+        print('submission order: margins', strat.margins,
+              'completed', strat.completed)
+    assert strat.margins > 0
+
+    for policy in ['sellsfirst', 'reducefirst', lambda order: order.isbuy()]:
+        strat = run(policy)
+        if main:
+            print(policy, ': margins', strat.margins,
+                  'completed', strat.completed)
+        assert not strat.margins
+
+
+
+def geterror(func, *args):
+    try:
+        func(*args)
+    except ValueError as e:
+        return str(e)
+
+    return None
+
+
+def test_badpolicy(main=False):
+    # an unknown policy is rejected when set and when the broker starts
+    broker = bt.brokers.BackBroker()
+    error = geterror(broker.set_checksubmit, True, 'buysfirst')
+    if main:
+        print(error)
+
+    assert "'buysfirst'" in error and "'sellsfirst'" in error
+    assert broker.p.checkpolicy is None  # not set
+
+    broker.p.checkpolicy = 'buysfirst'
+    error = geterror(broker.start)
+    assert error is not None and "'buysfirst'" in error
+
+
+if __name__ == '__main__':
+    test_run(main=True)
+    test_badpolicy(main=True)
@@ -81,9 +81,38 @@ def check_futures():
     assert ca == size * (newprice - price) * mult
 
 
+class HalfValue(bt.CommissionInfo):
+    def getvaluesize(self, size, price):
+        return size * price / 2.0
+
+
+def check_batch():
+    sizes = [100.0, -50.0, 25.0]
+    prices = [10.0, 12.5, 8.0]
+    newprices = [9.0, 13.0, 8.5]
+    positions = [Position(size=s, price=p) for s, p in zip(sizes, prices)]
+
+    comms = [
+        bt.CommissionInfo(commission=0.5),
+        bt.CommissionInfo(commission=0.5, mult=10.0, margin=10.0),
+        bt.CommissionInfo(commission=0.5, mult=10.0, automargin=-1),
+        HalfValue(commission=0.5),
+    ]
+    for comm in comms:
+        assert comm.getvaluesizes(sizes, prices) == \
+            list(map(comm.getvaluesize, sizes, prices))
+        assert comm.getvalues(positions, newprices) == \
+            list(map(comm.getvalue, positions, newprices))
+        assert comm.profitandlosses(sizes, prices, newprices) == \
+            list(map(comm.profitandloss, sizes, prices, newprices))
+        assert comm.cashadjusts(sizes, prices, newprices) == \
+            list(map(comm.cashadjust, sizes, prices, newprices))
+
+
 def test_run(main=False):
     check_stocks()
     check_futures()
+    check_batch()
 
 
 if __name__ == '__main__':
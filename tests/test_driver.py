@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+
+
+class ToggleDriver(bt.drivers.DriverBase):
+    __slots__ = ("calls",)
+
+    states = ["off", "on", "broken"]
+    initial_state = "off"
+
+    transitions = [
+        dict(trigger="push", source="off", dest="on",
+             unless=["is_stuck"], after=["record"]),
+        dict(trigger="push", source="on", dest="off",
+             conditions=["is_strong"], after=["record"]),
+        dict(trigger="push", source="on", dest="broken",
+             after=["record"]),
+        dict(trigger="reset", source="*", dest="off"),
+    ]
+
+    def __init__(self, strategy):
+        super(ToggleDriver, self).__init__(strategy)
+        self.calls = []
+
+    def is_stuck(self, event):
+        return event.kwargs.get("stuck", False)
+
+    def is_strong(self, event):
+        return event.args and event.args[0] > 1
+
+    def record(self, event):
+        self.calls.append((event.trigger, self.state))
+
+
+def test_run(main=False):
+    d = ToggleDriver(None)
+    assert d.state == "off"
+    assert not d.push(stuck=True)  # unless
+    assert d.push() and d.state == "on"
+    assert d.push(2) and d.state == "off"  # 1st candidate
+    assert d.push() and d.push(0) and d.state == "broken"  # 2nd candidate
+    assert not d.push()  # no transitions from broken
+    assert d.trigger("reset") and d.state == "off"
+    assert d.calls == [("push", "on"), ("push", "off"), ("push", "on"),
+                       ("push", "broken")]
+    if main:
+        print(d.calls)
+
+    try:
+        type(str("BadDriver"), (ToggleDriver,), dict(
+            transitions=[dict(trigger="push", source="off", dest="nowhere")]))
+    except ValueError:
+        pass
+    else:
+        assert False, "unknown state accepted"
+
+    for cls in [bt.drivers.BreakoutDriver, bt.drivers.ReversalDriver]:
+        d = cls(None)
+        assert d.state == cls.initial_state == "idle"
+        assert not d.notify_order(order=None)  # nothing to do when idle
+        assert not d.next(entry_signal=0, protect_price=1.0, close_signal=0)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
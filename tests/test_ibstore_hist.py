@@ -0,0 +1,265 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import calendar
+import datetime
+import shutil
+import sys
+import tempfile
+import threading
+import types
+
+import testcommon
+
+import backtrader as bt
+
+
+class FakeConn(object):
+    '''Stands in for the ibpy connection: records the historical requests'''
+    def __init__(self, *args, **kwargs):
+        self.hist = list()
+
+    def register(self, *args, **kwargs):
+        pass
+
+    def registerAll(self, *args, **kwargs):
+        pass
+
+    def reqHistoricalData(self, tickerId, *args):
+        self.hist.append(tickerId)
+
+    def cancelHistoricalData(self, tickerId):
+        pass
+
+
+class Contract(object):
+    def __init__(self, symbol='AAPL'):
+        self.m_symbol = symbol
+        self.m_secType = 'STK'
+
+
+def _importibstore():
+    # The store only needs ib.opt/ib.ext.Contract. Stub them if ibpy is not
+    # installed, just for the time of the import
+    try:
+        import ib.opt
+        import ib.ext.Contract
+    except ImportError:
+        pass
+    else:
+        from backtrader.stores import ibstore
+        return ibstore
+
+    class Message(object):
+        def __getattr__(self, name):
+            return name
+
+    stubs = dict((name, types.ModuleType(str(name)))
+                 for name in ['ib', 'ib.opt', 'ib.ext', 'ib.ext.Contract'])
+    stubs['ib.opt'].ibConnection = FakeConn
+    stubs['ib.opt'].message = Message()
+    stubs['ib'].opt = stubs['ib.opt']
+    stubs['ib'].ext = stubs['ib.ext']
+    stubs['ib.ext.Contract'].Contract = Contract
+    saved = dict((name, sys.modules.get(name)) for name in stubs)
+    sys.modules.update(stubs)
+    try:
+        from backtrader.stores import ibstore
+    finally:
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+
+    return ibstore
+
+
+ibstore = _importibstore()
+
+BEGIN = datetime.datetime(2017, 1, 2)
+HOUR = datetime.timedelta(hours=1)
+
+
+def getstore(**kwargs):
+    ibstore.IBStore._singleton = None  # a fresh store with these params
+    store = ibstore.IBStore(**kwargs)
+    ibstore.IBStore._singleton = None
+    store.conn = FakeConn()
+    return store
+
+
+def request(store, begin, end, symbol='AAPL'):
+    return store.reqHistoricalDataEx(
+        Contract(symbol), end, begin, bt.TimeFrame.Minutes, 60)
+
+
+class Msg(object):
+    def __init__(self, reqId, date, close=0.0):
+        self.reqId = reqId
+        self.date = date
+        self.open = self.high = self.low = self.close = close
+        self.volume = self.count = 1
+        self.WAP = close
+        self.hasGaps = False
+
+
+def answer(store, tickerId, dts, finish=True):
+    for dt in dts:
+        tstamp = calendar.timegm(dt.timetuple())
+        store.historicalData(Msg(tickerId, str(tstamp), close=dt.hour))
+
+    if finish:
+        store.historicalData(Msg(tickerId, 'finished-x-y'))
+
+
+def delivered(q):
+    '''Returns the dates delivered to ``q`` and if the end was signaled'''
+    dts, end = list(), False
+    while not q.empty():
+        msg = q.get()
+        if msg is None or getattr(msg, 'date', None) is None:
+            end = True
+        else:
+            dts.append(msg.date)
+
+    return dts, end
+
+
+def test_pacing(main=False):
+    store = getstore(histpacing=(2, 600.0), histmaxreqs=0)
+    for symbol in ['A', 'B', 'C']:
+        request(store, BEGIN, BEGIN + 10 * HOUR, symbol=symbol)
+
+    # the 3rd request waits for the pacing window to move
+    assert len(store.conn.hist) == 2
+    assert len(store.histpending) == 1 and store.histtimer is not None
+    store.histtimer.cancel()
+
+    store = getstore(histpacing=None, histmaxreqs=1)
+    request(store, BEGIN, BEGIN + 10 * HOUR, symbol='A')
+    request(store, BEGIN, BEGIN + 10 * HOUR, symbol='B')
+    assert len(store.conn.hist) == 1
+    answer(store, store.conn.hist[0], [BEGIN + HOUR])
+    assert len(store.conn.hist) == 2  # sent when the 1st one finished
+
+
+def test_follower(main=False):
+    store = getstore(histpacing=None)
+    dts = [BEGIN + i * HOUR for i in range(1, 6)]
+
+    q = request(store, BEGIN, BEGIN + 10 * HOUR)
+    tickerId = store.conn.hist[0]
+    answer(store, tickerId, dts[:2], finish=False)
+
+    # an identical request joins the one in flight
+    fq = request(store, BEGIN, BEGIN + 10 * HOUR)
+    assert fq is not q and len(store.conn.hist) == 1
+
+    answer(store, tickerId, dts[2:])
+    for qq in [q, fq]:
+        assert delivered(qq) == (dts, True)
+
+
+class Interleaved(list):
+    '''Messages delivered by a request: when a follower replays them, the
+    rest of the answer is delivered from another thread'''
+    def __init__(self, messages, deliver):
+        super(Interleaved, self).__init__(messages)
+        self.deliver = deliver
+
+    def __iter__(self):
+        messages = list(super(Interleaved, self).__iter__())
+        self.thread = threading.Thread(target=self.deliver)
+        self.thread.start()
+        self.thread.join(0.5)  # blocked by the store if the replay is safe
+        return iter(messages)
+
+
+def test_follower_race(main=False):
+    store = getstore(histpacing=None)
+    dts = [BEGIN + i * HOUR for i in range(1, 6)]
+
+    q = request(store, BEGIN, BEGIN + 10 * HOUR)
+    tickerId = store.conn.hist[0]
+    answer(store, tickerId, dts[:2], finish=False)
+
+    # the request finishes while the follower replays what was delivered
+    msgs = store.histmsgs[q] = Interleaved(
+        store.histmsgs[q], lambda: answer(store, tickerId, dts[2:]))
+    fq = request(store, BEGIN, BEGIN + 10 * HOUR)
+    msgs.thread.join()
+
+    assert len(store.conn.hist) == 1
+    for qq in [q, fq]:
+        assert delivered(qq) == (dts, True)
+
+
+def test_cache(main=False):
+    cachedir = tempfile.mkdtemp()
+    try:
+        dts = [BEGIN + i * HOUR for i in range(10, 21)]
+
+        # fill the cache from hour 10 onwards (the last bar is not kept)
+        store = getstore(histpacing=None, histcache=cachedir)
+        q = request(store, dts[0], dts[-1])
+        answer(store, store.conn.hist[0], dts)
+        assert delivered(q) == (dts, True)
+
+        # starting earlier than the cache: all must be downloaded
+        store = getstore(histpacing=None, histcache=cachedir)
+        q = request(store, BEGIN, dts[-1])
+        assert delivered(q) == ([], False)  # nothing from the cache
+        head = [BEGIN + i * HOUR for i in range(1, 10)]
+        answer(store, store.conn.hist[0], head + dts)
+        assert delivered(q) == (head + dts, True)
+
+        # a begin date in the cache: cached bars and the rest downloaded
+        store = getstore(histpacing=None, histcache=cachedir)
+        end = BEGIN + 30 * HOUR
+        q = request(store, BEGIN + 5 * HOUR, end)
+        cached, _ = delivered(q)
+        if main:
+            print('from cache', cached[0], '->', cached[-1])
+
+        assert cached == head[4:] + dts[:-1]
+        tail = [BEGIN + i * HOUR for i in range(19, 31)]  # overlapping
+        answer(store, store.conn.hist[0], tail)
+        assert delivered(q) == (tail[1:], True)
+
+        # everything in the cache: no download
+        store = getstore(histpacing=None, histcache=cachedir)
+        q = request(store, BEGIN + 2 * HOUR, BEGIN + 25 * HOUR)
+        assert not store.conn.hist
+        assert delivered(q) == (
+            [BEGIN + i * HOUR for i in range(2, 26)], True)
+
+    finally:
+        shutil.rmtree(cachedir)
+
+
+if __name__ == '__main__':
+    test_pacing(main=True)
+    test_follower(main=True)
+    test_follower_race(main=True)
+    test_cache(main=True)
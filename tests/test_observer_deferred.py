@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os.path
+
+import testcommon
+
+import backtrader as bt
+
+
+class SmaCross(bt.Strategy):
+    params = (('record', True),)
+
+    def __init__(self):
+        self.cross = bt.ind.CrossOver(bt.ind.SMA(period=10),
+                                      bt.ind.SMA(period=30))
+
+    def next(self):
+        if self.cross > 0:
+            self.buy()
+        elif self.cross < 0:
+            self.close()
+
+    def stop(self):
+        # the deferred lines are complete when the strategy stops
+        if not self.p.record:
+            return
+
+        self.lines_at_stop = dict(
+            (name, list(getattr(obs.lines, name).get(size=len(obs))))
+            for obs in self.observers
+            for name in obs.lines.getlinealiases())
+
+
+def run(deferred, runonce=True, exactbars=0):
+    cerebro = bt.Cerebro(stdstats=False, runonce=runonce, exactbars=exactbars)
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            '2006-day-001.txt')
+    cerebro.adddata(bt.feeds.BacktraderCSVData(dataname=datapath))
+    cerebro.addstrategy(SmaCross, record=not exactbars)
+    cerebro.addobserver(bt.observers.Broker, deferred=deferred)
+    cerebro.addobserver(bt.observers.DrawDown, deferred=deferred)
+    cerebro.addobserver(bt.observers.DrawDownLength, deferred=deferred)
+    return cerebro.run()[0]
+
+
+def getbroker(strat):
+    return [obs for obs in strat.observers
+            if isinstance(obs, bt.observers.Broker)][0]
+
+
+def test_run(main=False):
+    for runonce in [True, False]:
+        strat = run(deferred=False, runonce=runonce)
+        dstrat = run(deferred=True, runonce=runonce)
+        assert all(obs._deferred for obs in dstrat.observers)
+        if main:
+            print('runonce', runonce, 'maxdrawdown',
+                  dstrat.lines_at_stop['maxdrawdown'][-1],
+                  'maxlen', dstrat.lines_at_stop['maxlen'][-1])
+
+        assert dstrat.lines_at_stop == strat.lines_at_stop
+        assert dstrat.lines_at_stop['maxdrawdown'][-1] > 0.0
+
+    # memory saving: lines cannot be calculated at the end
+    strat = run(deferred=True, exactbars=1)
+    assert not any(obs._deferred for obs in strat.observers)
+
+
+def test_default(main=False):
+    # the broker of stdstats defers unless a csv writer reads the lines
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            '2006-day-001.txt')
+    brokers = list()
+    for writer in [False, True]:
+        cerebro = bt.Cerebro()
+        cerebro.adddata(bt.feeds.BacktraderCSVData(dataname=datapath))
+        cerebro.addstrategy(SmaCross)
+        if writer:
+            cerebro.addwriter(bt.WriterStringIO, csv=True)
+
+        brokers.append(getbroker(cerebro.run()[0]))
+
+    assert brokers[0]._deferred and not brokers[1]._deferred
+    for name in ['value', 'cash']:
+        lines = [getattr(b.lines, name).get(size=len(b)) for b in brokers]
+        if main:
+            print(name, lines[0][-1])
+
+        assert list(lines[0]) == list(lines[1])
+
+
+if __name__ == '__main__':
+    test_run(main=True)
+    test_default(main=True)
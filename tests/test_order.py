@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+
+
+class FakeData(object):
+    '''
+    Minimal interface to avoid errors when the order tries to get information
+    from the data during the test
+    '''
+    def __len__(self):
+        return 0
+
+    @property
+    def datetime(self):
+        return [0.0]
+
+    @property
+    def close(self):
+        return [0.0]
+
+
+def test_run(main=False):
+    order = bt.BuyOrder(data=FakeData(),
+                        size=10, price=1.0,
+                        exectype=bt.Order.Market,
+                        simulated=True)
+
+    order.submit()
+    s1 = order.snapshot()
+    order.accept()
+    s2 = order.snapshot()
+
+    # status at the time of the snapshot, unchanged executed is shared
+    assert s1.status == bt.Order.Submitted
+    assert s2.status == bt.Order.Accepted
+    assert s1.executed is s2.executed
+    assert not s2.executed.getpending()
+
+    notified = []
+    for size, price in [(3, 10.0), (3, 11.0), (4, 12.0)]:
+        order.execute(0.0, size, price, 0, 0.0, 0.0,
+                      size, size * price, 0.0, 0.0, 0.0, size, price)
+
+        snap = order.snapshot()
+        assert snap.executed is not order.executed
+        # only the execution bits not yet notified are pending
+        pending = snap.executed.getpending()
+        assert len(pending) == 1
+        assert pending[0].size == size
+        notified.append(snap)
+
+    assert sum(x.executed.getpending()[0].size for x in notified) == 10
+    assert [x.status for x in notified] == [bt.Order.Partial] * 2 + \
+        [bt.Order.Completed]
+    assert notified[0].executed.remsize == 7
+    assert order.executed.remsize == 0
+
+    # a clone does not consume the pending bits of the notifications
+    order.clone()
+    assert not order.snapshot().executed.getpending()
+
+    if main:
+        print('snapshots ok')
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os.path
+
+import testcommon
+
+import backtrader as bt
+from backtrader.brokers.bbroker import OrderBook
+
+
+class FullBook(OrderBook):
+    '''Evaluates all pending orders with each bar (no indexing)'''
+    def due(self, prices):
+        return list(self)
+
+
+class AmendStrategy(bt.Strategy):
+    '''Protects each long position with a stop (or a trailing stop) which is
+    moved in place every few bars'''
+    params = dict(fullbook=False)
+
+    def start(self):
+        if self.p.fullbook:
+            self.broker.pending = FullBook()
+
+        self.events = []
+        self.amended = self.rejected = 0
+        self.protect = None
+
+    def notify_order(self, order):
+        self.events.append((len(self), order.ref, order.status,
+                            order.executed.size, order.executed.price))
+        if not order.alive() and order == self.protect:
+            self.protect = None
+
+    def next(self):
+        if not self.position:
+            if self.protect is None and not self.broker.get_orders_open():
+                o = self.buy()
+                self.rejected += self.amend(o, price=1.0)  # market: no
+            return
+
+        if self.protect is None:
+            if len(self) % 2:
+                self.protect = self.sell(exectype=bt.Order.Stop,
+                                      price=self.data.low[-1] * 0.99)
+            else:
+                self.protect = self.sell(exectype=bt.Order.StopTrail,
+                                      trailpercent=0.03)
+
+        elif not len(self) % 3:
+            if self.protect.exectype == bt.Order.Stop:
+                price = max(self.data.low.get(size=3)) * 0.995
+                self.amended += self.amend(self.protect, price=price)
+                assert self.protect.created.price == price
+            else:
+                self.amended += self.amend(self.protect, trailpercent=0.01)
+
+
+def test_run(main=False):
+    events = []
+    for fullbook in [False, True]:
+        cerebro = bt.Cerebro(stdstats=False)
+        datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                                '2006-day-001.txt')
+        cerebro.adddata(bt.feeds.BacktraderCSVData(dataname=datapath))
+        cerebro.addstrategy(AmendStrategy, fullbook=fullbook)
+        strat = cerebro.run()[0]
+        # refs are global: rebase them to the 1st ref of the run
+        ref0 = min(e[1] for e in strat.events)
+        events.append([(e[0], e[1] - ref0) + e[2:] for e in strat.events])
+        if main:
+            print('fullbook', fullbook, 'events', len(strat.events),
+                  'amended', strat.amended)
+
+        assert strat.amended > 10
+        assert not strat.rejected
+        # amending does not cancel or notify
+        assert all(e[2] != bt.Order.Cancelled for e in strat.events)
+
+    assert events[0] == events[1]
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import os.path
+import random
+
+import testcommon
+
+import backtrader as bt
+from backtrader.brokers.bbroker import OrderBook
+
+
+class FullBook(OrderBook):
+    '''Evaluates all pending orders with each bar (no indexing)'''
+    def due(self, prices):
+        return list(self)
+
+
+class RandomOrders(bt.Strategy):
+    params = dict(fullbook=False, seed=0)
+
+    def start(self):
+        if self.p.fullbook:
+            self.broker.pending = FullBook()
+
+        self.rng = random.Random(self.p.seed)
+        self.events = []
+
+    def notify_order(self, order):
+        self.events.append((len(self), order.ref, order.status,
+                            order.executed.size, order.executed.price))
+
+    def next(self):
+        rng = self.rng
+        for d in self.datas:
+            close = d.close[0]
+            action = self.buy if rng.random() < 0.5 else self.sell
+            price = close * rng.uniform(0.95, 1.05)
+            valid = None
+            if rng.random() < 0.3:
+                valid = d.datetime.datetime() + datetime.timedelta(days=3)
+
+            k = rng.random()
+            if k < 0.3:
+                action(data=d, exectype=bt.Order.Limit, price=price,
+                       valid=valid)
+            elif k < 0.5:
+                action(data=d, exectype=bt.Order.Stop, price=price,
+                       valid=valid)
+            elif k < 0.6:
+                action(data=d, exectype=bt.Order.StopLimit, price=price,
+                       plimit=price * rng.uniform(0.98, 1.02), valid=valid)
+            elif k < 0.7:
+                o = action(data=d, exectype=bt.Order.Limit, price=close * 0.98)
+                action(data=d, exectype=bt.Order.Limit, price=close * 1.02,
+                       oco=o)
+            elif k < 0.8:
+                self.buy_bracket(data=d, price=close, stopprice=close * 0.97,
+                                 limitprice=close * 1.03,
+                                 exectype=bt.Order.Limit)
+            elif k < 0.85:
+                action(data=d, exectype=bt.Order.StopTrail, trailpercent=0.02)
+            elif k < 0.9:
+                for o in self.broker.get_orders_open()[:2]:
+                    self.cancel(o)
+            else:
+                action(data=d)
+
+
+def test_run(main=False):
+    events = []
+    for fullbook in [False, True]:
+        cerebro = bt.Cerebro(stdstats=False)
+        for dataname in ['2006-day-001.txt', '2006-day-002.txt']:
+            datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                                    dataname)
+            cerebro.adddata(bt.feeds.BacktraderCSVData(dataname=datapath))
+
+        cerebro.broker.setcash(1000000.0)
+        cerebro.addstrategy(RandomOrders, fullbook=fullbook, seed=17)
+        strat = cerebro.run()[0]
+        # refs are global: rebase them to the 1st ref of the run
+        ref0 = min(e[1] for e in strat.events)
+        events.append([(e[0], e[1] - ref0) + e[2:] for e in strat.events])
+        if main:
+            print('fullbook', fullbook, 'events', len(strat.events),
+                  'value', cerebro.broker.getvalue())
+
+    assert len(events[0]) > 1000
+    assert events[0] == events[1]
+
+
+if __name__ == '__main__':
+    test_run(main=True)
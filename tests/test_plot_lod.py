@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import math
+import os.path
+
+import testcommon
+
+import backtrader as bt
+
+
+def _loadlod():
+    # lod only needs numpy: it is loaded from its file to avoid importing
+    # the plotting package (and with it matplotlib and a gui backend)
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return None
+
+    import importlib.util
+    path = os.path.join(os.path.dirname(bt.__file__), 'plot', 'lod.py')
+    spec = importlib.util.spec_from_file_location('_lod', path)
+    lod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(lod)
+    return lod
+
+
+lod = _loadlod()
+NaN = float('NaN')
+
+
+def isnan(value):
+    return isinstance(value, float) and math.isnan(value)
+
+
+def test_decimate(main=False):
+    if lod is None:
+        return  # numpy is missing
+
+    x = list(range(12))
+    y = [5.0, 1.0, 9.0, 3.0,  # min before max
+         8.0, 2.0, 2.0, 7.0,  # max before min, repeated min
+         4.0, 6.0, 6.0, 4.0]  # repeated min and max
+    dx, dy = lod.decimate(x, y, 4)
+    if main:
+        print(list(dx), list(dy))
+
+    # min and max of each bucket in order of appearance (1st occurrence)
+    assert list(dx) == [1, 2, 4, 5, 8, 9]
+    assert list(dy) == [1.0, 9.0, 8.0, 2.0, 4.0, 6.0]
+
+    # buckets are aligned to multiples of size: 10 and 11 are alone
+    dx, dy = lod.decimate([0, 1, 2, 3, 10, 11], [1, 2, 3, 4, 5, 6], 4)
+    assert list(dx) == [0, 3, 10, 11] and list(dy) == [1, 4, 5, 6]
+
+    # nothing to reduce
+    dx, dy = lod.decimate(x, y, 1)
+    assert list(dx) == x and list(dy) == y
+
+
+def test_decimate_nan(main=False):
+    if lod is None:
+        return  # numpy is missing
+
+    x = list(range(8))
+    y = [1.0, NaN, 3.0, 2.0,  # NaN ignored for min/max
+         NaN, NaN, NaN, NaN]  # all NaN: a gap
+    dx, dy = lod.decimate(x, y, 4)
+    if main:
+        print(list(dx), list(dy))
+
+    assert list(dx) == [0, 2, 4, 4]
+    assert list(dy[:2]) == [1.0, 3.0]
+    assert all(isnan(v) for v in dy[2:])
+
+
+def test_aggregate(main=False):
+    if lod is None:
+        return  # numpy is missing
+
+    x = [0, 1, 2, 3, 4, 5, 9]  # the last bucket has a single bar
+    opens = [1, 2, 3, 4, 5, 6, 7]
+    highs = [5, 9, 6, 4, 8, 7, 9]
+    lows = [0, 1, -1, 2, 3, 2, 5]
+    closes = [2, 3, 4, 5, 6, 7, 8]
+    volumes = [10, 30, 20, 5, 1, 2, 3]
+    ax, o, h, l, c, v = lod.aggregate(x, 4, opens, highs, lows, closes,
+                                      volumes)
+    if main:
+        print(list(ax), list(o), list(h), list(l), list(c), list(v))
+
+    assert list(ax) == [1.5, 5.5, 9.5]  # center of the buckets
+    assert list(o) == [1, 5, 7]  # 1st open
+    assert list(h) == [9, 8, 9]  # highest high
+    assert list(l) == [-1, 2, 5]  # lowest low
+    assert list(c) == [5, 7, 8]  # last close
+    assert list(v) == [30, 2, 3]  # largest volume
+
+    # no volume
+    assert lod.aggregate(x, 4, opens, highs, lows, closes)[-1] is None
+
+    # nothing to aggregate
+    ax, o, h, l, c, v = lod.aggregate(x, 1, opens, highs, lows, closes)
+    assert list(ax) == x and list(c) == closes and v is None
+
+
+class FakeAxes(object):
+    class Box(object):
+        width = 100.0
+
+    class Figure(object):
+        dpi = 100.0
+
+    bbox = Box()
+    figure = Figure()
+
+
+def test_bucketsize(main=False):
+    if lod is None:
+        return  # numpy is missing
+
+    ax = FakeAxes()
+    level = lod.LevelOfDetail()
+    assert level.buckets(ax) == 100  # 1 pixel per bucket
+    assert level.bucketsize(ax, 100) == 1  # fits
+    assert level.bucketsize(ax, 150, points=2) == 1  # 2 points per bucket
+    assert level.bucketsize(ax, 150) == 2
+    assert level.bucketsize(ax, 1000) == 10
+
+    level = lod.LevelOfDetail(pixels=4)
+    assert level.buckets(ax) == 25
+    assert level.bucketsize(ax, 1000) == 40
+
+    # saving with a larger dpi gives more pixels
+    level = lod.LevelOfDetail()
+    level.dpi = 200.0
+    assert level.buckets(ax) == 200
+    assert level.bucketsize(ax, 1000) == 5
+
+
+if __name__ == '__main__':
+    test_decimate(main=True)
+    test_decimate_nan(main=True)
+    test_aggregate(main=True)
+    test_bucketsize(main=True)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os.path
+
+import testcommon
+
+import backtrader as bt
+
+NDATAS = 4
+
+
+class RebalanceStrategy(bt.Strategy):
+    params = (
+        ('bulk', True),
+        ('sequence', None),
+    )
+
+    def start(self):
+        self.events = []
+
+    def notify_order(self, order):
+        self.events.append((order.data._id, order.status,
+                            order.executed.size, order.executed.price))
+
+    def next(self):
+        if len(self) % 10:
+            return
+
+        # rotate the weights (96% invested) across the datas
+        weights = [((i + len(self) // 10) % NDATAS) * 0.16
+                   for i in range(NDATAS)]
+        if self.p.bulk:
+            self.rebalance(zip(self.datas, weights),
+                           sequence=self.p.sequence)
+        else:
+            for data, weight in zip(self.datas, weights):
+                self.order_target_percent(data=data, target=weight)
+
+
+def run(**kwargs):
+    cerebro = bt.Cerebro(stdstats=False)
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            '2006-day-001.txt')
+    for i in range(NDATAS):
+        cerebro.adddata(bt.feeds.BacktraderCSVData(dataname=datapath))
+
+    cerebro.broker.setcash(1000000.0)
+    cerebro.addstrategy(RebalanceStrategy, **kwargs)
+    return cerebro.run()[0]
+
+
+def test_run(main=False):
+    # without sequencing the orders are those of order_target_percent
+    events = run(bulk=False).events
+    assert run(bulk=True, sequence=None).events == events
+
+    margins = [e for e in events if e[1] == bt.Order.Margin]
+    sellsfirst = run(bulk=True, sequence='sellsfirst').events
+    smargins = [e for e in sellsfirst if e[1] == bt.Order.Margin]
+    if main:
+        print('events', len(events), 'margins', len(margins))
+        print('sellsfirst events', len(sellsfirst), 'margins', len(smargins))
+
+    assert margins and not smargins
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os
+import tempfile
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+KEEP = 2
+
+
+class RunStrategy(bt.Strategy):
+    params = (('period', 15),)
+
+    def __init__(self):
+        sma = btind.SMA(period=self.p.period)
+        self.cross = btind.CrossOver(self.data.close, sma)
+        self.events = []
+        self.closed = []
+        self.created = []
+        self.maxorders = self.maxtrades = self.maxbroker = 0
+        self.maxalive = 0
+
+    def notify_order(self, order):
+        self.events.append((order.ref, order.status,
+                            order.executed.size, order.executed.price))
+
+    def notify_trade(self, trade):
+        if trade.isclosed:
+            self.closed.append((trade.ref, trade.pnl, len(trade.history)))
+
+    def next(self):
+        self.maxorders = max(self.maxorders, len(self._orders))
+        self.maxtrades = max(self.maxtrades,
+                             len(self._trades[self.data][0]))
+        # only finished orders leave the broker, the open ones are kept
+        border = self.broker.orders
+        self.maxbroker = max(self.maxbroker,
+                             sum(not o.alive() for o in border))
+
+        if self.cross > 0.0:
+            if self.position:
+                self.close()
+            o = self.buy(exectype=bt.Order.Limit, price=self.data.close[0])
+            o2 = self.buy(exectype=bt.Order.Stop, price=self.data.high[0],
+                          oco=o)
+            self.created.extend([o, o2])
+
+        elif self.cross < 0.0 and self.position:
+            self.close()
+
+        alive = set(o.ref for o in self.created if o.alive())
+        assert alive <= set(o.ref for o in self.broker.orders)
+        self.maxalive = max(self.maxalive, len(alive))
+
+
+def run(logfile=None, keep=KEEP):
+    cerebro = bt.Cerebro(tradehistory=True)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(RunStrategy)
+    if logfile is not None:
+        cerebro.addretention(keep=keep, logfile=logfile)
+
+    return cerebro.run()[0]
+
+
+def test_run(main=False):
+    fd, logfile = tempfile.mkstemp(suffix='.csv')
+    os.close(fd)
+    try:
+        strat0 = run()
+        strat1 = run(logfile=logfile)
+
+        # refs are global: rebase them to the 1st ref of each run
+        events = []
+        for strat in [strat0, strat1]:
+            ref0 = min(e[0] for e in strat.events)
+            events.append([(e[0] - ref0,) + e[1:] for e in strat.events])
+
+        assert events[0] == events[1]
+        assert [c[1:] for c in strat0.closed] == [c[1:] for c in strat1.closed]
+
+        assert strat0.maxorders > KEEP + 1
+        assert strat1.maxorders <= KEEP
+        assert strat1.maxtrades <= KEEP + 1  # closed ones and current
+        assert strat1.maxbroker <= KEEP
+
+        trades = list(bt.Retention.readlog(logfile, kind='trade'))
+        orders = list(bt.Retention.readlog(logfile, kind='order'))
+        if main:
+            print('events', len(events[0]), 'closed', len(strat1.closed))
+            print('logged trades', len(trades), 'logged orders', len(orders))
+
+        assert [t['ref'] for t in trades] == [c[0] for c in strat1.closed]
+        assert all(t['owner'] == 'RunStrategy' for t in trades)
+        finished = [e for e in strat1.events
+                    if e[1] not in [bt.Order.Submitted, bt.Order.Accepted,
+                                    bt.Order.Partial]]
+        assert [o['ref'] for o in orders] == [e[0] for e in finished]
+
+        # nothing finished is kept, the open orders are
+        strat2 = run(logfile=logfile, keep=0)
+        assert strat2.maxbroker == 0
+        assert strat2.maxalive > 0
+    finally:
+        os.remove(logfile)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
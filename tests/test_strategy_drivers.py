@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os.path
+
+import testcommon
+
+import backtrader as bt
+from backtrader.strategies.adbreakout import (STADTDBreakoutStrategy,
+                                              IADTDBreakoutStrategy)
+from backtrader.strategies.tdreversal import TDReversalStrategy
+
+
+def recorder(strategycls):
+    class Recorder(strategycls):
+        def start(self):
+            self.events, self.orders = [], []
+
+        def next(self):
+            super(Recorder, self).next()
+            self.events.append((len(self), self.driver.state) + tuple(
+                line[0] for line in self.lines[1:]))  # skip datetime
+
+        def notify_order(self, order):
+            self.orders.append((len(self), order.status, order.price,
+                                order.executed.price))
+            super(Recorder, self).notify_order(order)
+
+    return Recorder
+
+
+def test_run(main=False):
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            'orcl-2003-2005.txt')
+    for strategycls, kwargs in [(STADTDBreakoutStrategy, {}),
+                                (IADTDBreakoutStrategy, dict(entry_td_max=2)),
+                                (TDReversalStrategy, {})]:
+        events = []
+        for runonce in [True, False]:
+            cerebro = bt.Cerebro(stdstats=False, runonce=runonce)
+            cerebro.adddata(bt.feeds.YahooFinanceCSVData(dataname=datapath))
+            cerebro.addstrategy(recorder(strategycls), **kwargs)
+            strat = cerebro.run()[0]
+            # as strings: nan == nan
+            events.append((str(strat.events), strat.orders))
+            if main:
+                print(strategycls.__name__, 'runonce', runonce,
+                      'bars', len(strat), 'orders', len(strat.orders))
+
+        # the signals are calculated in once mode in runonce
+        assert events[0][1]
+        assert events[0] == events[1]
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import os.path
+
+import testcommon
+
+import backtrader as bt
+
+
+TIMERS = [
+    dict(when=datetime.time(10, 0)),
+    dict(when=datetime.time(10, 0), repeat=datetime.timedelta(minutes=35)),
+    dict(when=bt.timer.SESSION_START, offset=datetime.timedelta(minutes=20)),
+    dict(when=bt.timer.SESSION_END, cheat=True),
+    dict(when=datetime.time(12, 0), weekdays=[2, 4], weekcarry=True),
+    dict(when=datetime.time(9, 30), monthdays=[1, 8, 15, 22], monthcarry=True),
+    dict(when=datetime.time(11, 0), allow=lambda d: d.day % 2),
+]
+
+
+class TimerStrategy(bt.Strategy):
+    params = dict(main=False)
+
+    def __init__(self):
+        self.fired = []
+        self.expected = []
+        for kwargs in TIMERS:
+            self.add_timer(**kwargs)
+
+    def start(self):
+        # Reference timers checked on each and every bar
+        self.reftimers = []
+        for i, kwargs in enumerate(TIMERS):
+            t = bt.timer.Timer(tid=i, owner=self, **kwargs)
+            t.start(self.data)
+            self.reftimers.append(t)
+
+    def notify_timer(self, timer, when, *args, **kwargs):
+        self.fired.append((timer.p.tid, self.data.datetime[0], when))
+        if self.p.main:
+            print('timer', timer.p.tid, self.data.datetime.datetime(), when)
+
+    def prenext(self):
+        self.next()
+
+    def next(self):
+        dt = self.data.datetime[0]
+        for t in self.reftimers:
+            if t.check(dt):
+                self.expected.append((t.p.tid, dt, t.lastwhen))
+
+
+def test_run(main=False):
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            '2006-min-005.txt')
+
+    for runonce in [True, False]:
+        cerebro = bt.Cerebro(runonce=runonce, stdstats=False)
+        data = bt.feeds.BacktraderCSVData(
+            dataname=datapath,
+            timeframe=bt.TimeFrame.Minutes, compression=5,
+            sessionstart=datetime.time(9, 0),
+            sessionend=datetime.time(17, 30))
+
+        cerebro.adddata(data)
+        cerebro.addstrategy(TimerStrategy, main=main)
+        strat = cerebro.run()[0]
+
+        assert strat.fired
+        assert set(x[0] for x in strat.fired) == set(range(len(TIMERS)))
+        assert sorted(strat.fired) == sorted(strat.expected)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+
+import testcommon
+
+import backtrader as bt
+
+
+def test_run(main=False):
+    holidays = [datetime.date(2017, 1, 2), datetime.date(2017, 4, 14)]
+    earlydays = [(datetime.date(2017, 11, 24),
+                  datetime.time(9, 30), datetime.time(13, 0))]
+
+    cal = bt.TradingCalendar(holidays=holidays, earlydays=earlydays,
+                             open=datetime.time(9, 30),
+                             close=datetime.time(16, 0))
+
+    # Friday -> Monday is a holiday -> Tuesday
+    nday = cal.nextday(datetime.date(2016, 12, 30))
+    if main:
+        print('nextday', nday)
+
+    assert nday == datetime.date(2017, 1, 3)
+    assert not cal.istradingday(datetime.date(2017, 1, 2))
+    assert cal.istradingday(datetime.date(2017, 1, 3))
+
+    # Thursday before Good Friday is the last day of the week
+    assert cal.last_weekday(datetime.date(2017, 4, 13))
+    assert not cal.last_weekday(datetime.date(2017, 4, 12))
+    assert cal.last_monthday(datetime.date(2017, 3, 31))
+    assert cal.last_yearday(datetime.date(2017, 12, 29))
+
+    # Lookups before the compiled range restart the index
+    assert cal.nextday(datetime.date(2015, 12, 31)) == datetime.date(2016, 1, 1)
+
+    # Early close and wrap over to a later session after the session end.
+    # schedule assumes it is given trading days and does not skip the
+    # weekend, hence only the regular times of the session are checked
+    opening, closing = cal.schedule(datetime.datetime(2017, 11, 24, 12, 0))
+    assert closing == datetime.datetime(2017, 11, 24, 13, 0)
+    opening, closing = cal.schedule(datetime.datetime(2017, 11, 24, 14, 0))
+    assert opening > datetime.datetime(2017, 11, 24, 14, 0)
+    assert opening.time() == datetime.time(9, 30)
+    assert closing.time() == datetime.time(16, 0)
+
+    # Replacing the params invalidates the compiled index
+    cal.p.holidays = []
+    assert cal.nextday(datetime.date(2016, 12, 30)) == datetime.date(2017, 1, 2)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
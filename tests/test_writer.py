@@ -21,6 +21,9 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import os.path
+import shutil
+import tempfile
 import time
 
 import testcommon
@@ -69,5 +72,75 @@ def test_run(main=False):
             assert count == 256  # header + 256 lines data
 
 
+class RunStrategy(bt.Strategy):
+    def __init__(self):
+        self.sma = btind.SMA(period=15)
+        self.sma.csv = True
+
+    def next(self):
+        if self.data.close[0] > self.sma[0]:
+            self.buy()
+        elif self.position:
+            self.close()
+
+
+def run(**kwargs):
+    cerebro = bt.Cerebro()
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            '2006-day-001.txt')
+    cerebro.adddata(bt.feeds.BacktraderCSVData(dataname=datapath),
+                    name='data')
+    cerebro.addstrategy(RunStrategy)
+    cerebro.addwriter(bt.WriterStringIO, csv=True, **kwargs)
+    cerebro.run()
+    return cerebro.runwriters[0], cerebro.datas[0]
+
+
+def test_buffered(main=False):
+    text = run()[0].out.getvalue()
+    assert run(csv_bufsize=7)[0].out.getvalue() == text
+
+
+def test_threaded(main=False):
+    text = run()[0].out.getvalue()
+    assert run(csv_bufsize=7, csv_thread=True)[0].out.getvalue() == text
+
+
+def test_npy(main=False):
+    try:
+        import numpy as np
+    except ImportError:
+        return  # the npy format needs numpy: nothing to test
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        writer, data = run(csv_format='npy', csv_out=tmpdir, csv_bufsize=50,
+                           csv_thread=True)
+        columns = sorted(os.listdir(tmpdir))
+        if main:
+            print(columns)
+
+        assert all(c.endswith('.npy') for c in columns)  # no raw files left
+        ids = np.load(os.path.join(tmpdir, 'Id.npy'))
+        assert list(ids) == list(range(1, len(data) + 1))
+
+        close = np.load(os.path.join(tmpdir, 'data.close.npy'))
+        assert list(close) == list(data.close.array)
+        dts = np.load(os.path.join(tmpdir, 'data.datetime.npy'))
+        assert list(dts) == list(data.datetime.array)
+
+        sma = np.load(os.path.join(tmpdir, 'SMA.sma.npy'))
+        assert np.isnan(sma[:14]).all() and not np.isnan(sma[14:]).any()
+
+        # the text part (no csv lines) is still written to out
+        assert 'Strategies:' in writer.out.getvalue()
+        assert '\ndata,' not in writer.out.getvalue()
+    finally:
+        shutil.rmtree(tmpdir)
+
+
 if __name__ == '__main__':
     test_run(main=True)
+    test_buffered(main=True)
+    test_threaded(main=True)
+    test_npy(main=True)